@@ -1,41 +1,28 @@
 import streamlit as st
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-import calendar
-import base64
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import os
+
+from rainfall.assets import background_css, landing_background
 
 # Configure page
 st.set_page_config(page_title="Bhutan Rainfall Explorer", layout="wide")
 
-# Function to encode image as base64
-@st.cache_data
-def get_base64_image(image_path):
-    try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except FileNotFoundError:
-        st.error(f"Image file not found: {image_path}")
-        return None
-
 # Session state
 if "show_dashboard" not in st.session_state:
     st.session_state.show_dashboard = False
 
 # ---------- FULL SCREEN BHUTAN IMAGE PAGE ----------
 if not st.session_state.show_dashboard:
-    # Get base64 encoded image
-    bhutan_image_b64 = get_base64_image("bhutan_image.jpg")
+    # Resized WebP variants served from static/ (built on first use, or by
+    # python -m rainfall.assets); the browser fetches and caches only the one
+    # that fits its viewport
+    background_variants = landing_background()
     
-    if bhutan_image_b64:
+    if background_variants:
         st.markdown(
             f"""
             <style>
+            {background_css(background_variants)}
             .stApp {{
-                background-image: linear-gradient(rgba(0,0,0,0.4), rgba(0,0,0,0.4)), url('data:image/jpeg;base64,{bhutan_image_b64}');
                 background-size: cover;
                 background-position: center;
                 background-attachment: fixed;
@@ -116,737 +103,613 @@ if not st.session_state.show_dashboard:
     st.stop()
 
 # ---------- DASHBOARD ----------
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/cleaned_btn_rainfall.csv", parse_dates=["date"])
-    df["month_name"] = df["date"].dt.month_name()
-    return df
-
-df = load_data()
-
-# Sidebar
-st.sidebar.header(" Filter Options")
-st.sidebar.markdown("*Select regions and year range to explore rainfall data*")
-
-regions = st.sidebar.multiselect(
-    "Select Regions", 
-    df["ADM2_PCODE"].unique(),
-    default=[],  # Start with no regions selected
-    help="Choose one or more regions to analyze rainfall patterns"
-)
-
-year_range = st.sidebar.slider(
-    "Year Range", 
-    int(df["year"].min()), 
-    int(df["year"].max()), 
-    (2021, 2025),
-    help="Select the time period for analysis"
-)
-
-# Add some helpful info in sidebar
-if len(regions) == 0:
-    st.sidebar.info(" Select regions above to start exploring data")
-else:
-    st.sidebar.success(f" {len(regions)} region(s) selected")
-    
-st.sidebar.markdown("---")
-st.sidebar.markdown("###  Quick Stats")
-st.sidebar.metric("Total Regions Available", len(df["ADM2_PCODE"].unique()))
-st.sidebar.metric("Data Time Span", f"{df['year'].min()}-{df['year'].max()}")
-st.sidebar.metric("Total Records", f"{len(df):,}")
-
-# Forecast Analysis in Sidebar
-st.sidebar.markdown("---")
-st.sidebar.markdown("### 🔮 Forecast Analysis")
-show_forecast = st.sidebar.button(" View Rainfall Forecast", help="Access detailed rainfall predictions and analysis")
-
-if show_forecast:
-    # Store in session state to persist the view
-    st.session_state.show_forecast = True
-
-# Reset forecast view option
-if st.sidebar.button(" Close Forecast"):
-    st.session_state.show_forecast = False
-
-# Forecast section - independent of region selection
-if hasattr(st.session_state, 'show_forecast') and st.session_state.show_forecast:
-    st.markdown("---")
-    st.subheader(" Rainfall Forecast Analysis")
-    st.markdown("*Access comprehensive rainfall predictions and analysis from the sidebar*")
+# Imported past the landing page so a new visitor's first render only pays for
+# Streamlit; Plotly is loaded further down, where the charts are first drawn
+import pandas as pd
+
+from rainfall.backtest import BACKTEST_METRICS_CSV
+from rainfall.cube import RainfallCube, build_cube, cube_path
+from rainfall.clustering import cluster_tables_mtime, load_cluster_summary
+from rainfall.decomposition import Decomposition, build_decomposition, decomposition_path
+from rainfall.diskcache import DiskCache, result_cache_backend
+from rainfall.fileio import load_or_build
+from rainfall.forecast import REGION_FORECASTS_CSV, load_region_forecasts
+from rainfall.paths import CLUSTER_MODEL, CLUSTER_SCORES_CSV, CLUSTER_SUMMARY_CSV, FORECAST_CSV
+from rainfall.profiling import profiled_rerun, profiling_enabled, stage
+from rainfall.queries import LRUCache, canonical_query, dashboard_frames, query_backend
+from rainfall.rollup import Rollup, build_rollup, rollup_path
+from rainfall.store import MONTH_NAMES, dataset_version, ensure_store, load_rainfall
+
+# Opt-in rerun profiling (RAINFALL_PROFILE=1, or RAINFALL_PROFILE=url and ?profile=1);
+# tracing stops when the rerun ends, even if it raised before show_profile()
+with profiled_rerun(profiling_enabled(os.environ, st.query_params)) as profiler:
+    @st.cache_resource(max_entries=2)
+    def load_data(version):
+        # Served from the Parquet store; keyed on the dataset version so an
+        # incremental ingest (python -m rainfall.ingest) is picked up on the next rerun.
+        # A cached resource: every session shares this one compact frame instead of
+        # unpickling its own copy per rerun, so it must never be modified in place
+        return load_rainfall()
+
+    @st.cache_resource(max_entries=2)
+    def load_cube(version):
+        # Region x year x month statistics, persisted in the store and shared read-only;
+        # the frame itself is only loaded when the cube has to be rebuilt
+        return load_or_build(cube_path(), version, lambda: build_cube(load_data(version)),
+                             RainfallCube.load)
+
+    @st.cache_resource(max_entries=2)
+    def load_sql_engine(version):
+        # RAINFALL_QUERY_BACKEND=duckdb: every chart aggregation is one SQL query
+        # over the Parquet store, so the archive is never loaded into memory
+        from rainfall.sql import DuckDBQueries
+        return DuckDBQueries(manifest=ensure_store())
+
+    @st.cache_resource(max_entries=2)
+    def load_decomposition(version):
+        # Trend/seasonal/residual of every region at dekadal resolution, persisted
+        # next to the cube and only recomputed when the dataset version changes
+        return load_or_build(decomposition_path(), version,
+                             lambda: build_decomposition(load_data(version)), Decomposition.load)
+
+    @st.cache_resource(max_entries=2)
+    def load_spi(version):
+        # 1/3/6-month SPI of every region, fitted in one batched pass and only
+        # recomputed when the dataset version changes
+        from rainfall.spi import SPI, build_spi, spi_path
+        return load_or_build(spi_path(), version, lambda: build_spi(load_data(version)), SPI.load)
+
+    @st.cache_resource(max_entries=2)
+    def load_extreme_index(version):
+        # Per (region, year) sorted rfh/rfq values: top-k and threshold counts for
+        # any selection without sorting its rows
+        from rainfall.extremes import ExtremeIndex, build_extreme_index, extremes_path
+        return load_or_build(extremes_path(), version,
+                             lambda: build_extreme_index(load_data(version)), ExtremeIndex.load)
+
+    @st.cache_resource(max_entries=2)
+    def load_return_periods(version):
+        # GEV/Gumbel fits to every region's annual maxima, by L-moments in one
+        # batched pass and only refitted when the dataset version changes
+        from rainfall.return_periods import ReturnPeriods, build_return_periods, return_periods_path
+        return load_or_build(return_periods_path(), version,
+                             lambda: build_return_periods(load_data(version)), ReturnPeriods.load)
+
+    @st.cache_resource(max_entries=2)
+    def load_rollup(version):
+        # Per-region dekad/month/season/year sums, persisted next to the cube and
+        # updated by ingest; switching granularity only sums precomputed rows
+        return load_or_build(rollup_path(), version, lambda: build_rollup(load_data(version)),
+                             Rollup.load)
+
+    @st.cache_data(max_entries=4)
+    def get_cluster_labels(mtimes):
+        # Region -> cluster; keyed on the mtimes of the fitted table and the
+        # ingest's assignments, so refits and incremental assignments show up
+        return load_cluster_summary()["Cluster"].to_dict()
+
+    @st.cache_data(max_entries=4)
+    def get_cluster_model(path, mtime_ns):
+        from rainfall.clustering import ClusterModel
+        model = ClusterModel.load(path)
+        scores = pd.read_csv(CLUSTER_SCORES_CSV) if os.path.exists(CLUSTER_SCORES_CSV) else None
+        return model.profiles(), scores
+
+    @st.cache_resource(max_entries=2)
+    def load_similarity_index(version, _engine):
+        # Standardised monthly profiles of every region, built once per dataset
+        # version from the query engine; each lookup is then one matrix-vector product
+        from rainfall.similarity import build_similarity_index
+        return build_similarity_index(_engine.month_profiles())
+
+    @st.cache_resource
+    def get_query_cache():
+        # Shared by every session; by default a SQLite file under .cache/ that every
+        # worker on the host reads and fills, and that survives restarts
+        # (RAINFALL_RESULT_CACHE=memory: one in-process LRU per worker instead).
+        # Namespaced by query backend: workers on either backend can share the file
+        if result_cache_backend() == "memory":
+            return LRUCache(max_entries=256, ttl=60 * 60)
+        return DiskCache(namespace=query_backend())
+
+    @st.cache_data(max_entries=4)
+    def get_forecast_bundle(path, mtime_ns):
+        # Keyed on the file's mtime so a regenerated forecast.csv invalidates it
+        from rainfall.charts import forecast_bundle
+        return forecast_bundle(path)
+
+    @st.cache_data(max_entries=4)
+    def get_backtest_metrics(path, mtime_ns):
+        # Per (series, horizon) backtest scores, reloaded when the backtest is rerun
+        from rainfall.backtest import load_backtest_metrics
+        return load_backtest_metrics(path)
+
+    # Most regions drawn on one regional forecast chart
+    MAX_FORECAST_REGIONS = 12
+    # ... and on the return-level chart
+    MAX_RETURN_REGIONS = 12
+
+    @st.cache_data(max_entries=64)
+    def get_region_forecast_figure(path, mtime_ns, regions):
+        from rainfall.charts import region_forecast_figure
+        return region_forecast_figure(load_region_forecasts(path), list(regions))
+
+    with stage("dataset version"):
+        data_version = dataset_version()
+    with stage("load query engine"):
+        if query_backend() == "duckdb":
+            engine = load_sql_engine(data_version)
+        else:
+            engine = load_cube(data_version)
+    query_cache = get_query_cache()
+
+    # Sidebar
+    st.sidebar.header(" Filter Options")
+    st.sidebar.markdown("*Select regions and year range to explore rainfall data*")
+
+    regions = st.sidebar.multiselect(
+        "Select Regions", 
+        list(engine.regions),
+        default=[],  # Start with no regions selected
+        help="Choose one or more regions to analyze rainfall patterns"
+    )
+
+    year_range = st.sidebar.slider(
+        "Year Range", 
+        int(engine.years.min()), 
+        int(engine.years.max()), 
+        (2021, 2025),
+        help="Select the time period for analysis"
+    )
+
+    # Add some helpful info in sidebar
+    if len(regions) == 0:
+        st.sidebar.info(" Select regions above to start exploring data")
+    else:
+        st.sidebar.success(f" {len(regions)} region(s) selected")
     
-    try:
-        # Try to load forecast data
-        forecast_df = pd.read_csv("outputs/forecast.csv", parse_dates=["ds"])
-        
-        st.markdown("###  Future Rainfall Predictions")
-        st.markdown("*This forecast uses Prophet time series modeling to predict future rainfall patterns.*")
-        
-        # Display forecast metrics
-        col1, col2, col3, col4 = st.columns(4)
-        
-        # Calculate forecast period
-        forecast_start = forecast_df['ds'].min()
-        forecast_end = forecast_df['ds'].max()
-        forecast_days = (forecast_end - forecast_start).days
-        
-        with col1:
-            st.metric(" Forecast Period", f"{forecast_days} days")
-        with col2:
-            avg_forecast = forecast_df['yhat'].mean()
-            st.metric(" Avg Predicted Rainfall", f"{avg_forecast:.1f} mm")
-        with col3:
-            max_forecast = forecast_df['yhat'].max()
-            st.metric(" Peak Forecast", f"{max_forecast:.1f} mm")
-        with col4:
-            min_forecast = forecast_df['yhat'].min()
-            st.metric(" Lowest Forecast", f"{min_forecast:.1f} mm")
-        
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("###  Quick Stats")
+    first_year, last_year = int(engine.years.min()), int(engine.years.max())
+    st.sidebar.metric("Total Regions Available", len(engine.regions))
+    st.sidebar.metric("Data Time Span", f"{first_year}-{last_year}")
+    st.sidebar.metric("Total Records", f"{engine.row_count(engine.regions, (first_year, last_year)):,}")
+    cache_stats_slot = st.sidebar.empty()
+
+    def show_cache_stats():
+        stats = query_cache.stats()
+        cache_stats_slot.metric(
+            "Query Cache (hits / misses)",
+            f"{stats['hits']} / {stats['misses']}",
+            help=f"{stats['entries']} cached results"
+                 + (f" ({stats['bytes'] / 1024 / 1024:.1f} MB on disk)" if "bytes" in stats else "")
+                 + f" · hit rate {stats['hit_rate']:.0%}"
+        )
+
+    show_cache_stats()
+    profile_slot = st.sidebar.empty()
+
+    def show_profile(view):
+        # Close this rerun's profile, log it and show it in the sidebar (profiling only)
+        if profiler is None:
+            return
+        summary = profiler.finish(view=view, regions=len(regions), year_range=list(year_range))
+        stages = pd.DataFrame(summary["stages"])
+        stages["stage"] = ["· " * depth + name for depth, name in zip(stages["depth"], stages["stage"])]
+        columns = [c for c in ["stage", "ms", "peak_kb", "figure_kb"] if c in stages.columns]
+        with profile_slot.container():
+            with st.expander(f"⏱️ Rerun Profile ({summary['total_ms']:,.0f} ms)"):
+                st.dataframe(stages[columns], hide_index=True, use_container_width=True)
+                st.caption("Also logged as JSON lines to `.cache/profile.jsonl`")
+
+    def cached_figure(key, build):
+        # Figures depend only on the dataset version and the query in ``key``, so
+        # they are built once and shared through the query cache (as JSON on disk)
+        return query_cache.get_or_compute(("figure", data_version) + tuple(key), build)
+
+    def render_chart(fig, name):
+        # st.plotly_chart serialises the figure here; timed and sized when profiling
+        with stage(f"render: {name}", figure=fig):
+            st.plotly_chart(fig, use_container_width=True)
+
+    # Forecast Analysis in Sidebar
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### 🔮 Forecast Analysis")
+    show_forecast = st.sidebar.button(" View Rainfall Forecast", help="Access detailed rainfall predictions and analysis")
+
+    if show_forecast:
+        # Store in session state to persist the view
+        st.session_state.show_forecast = True
+
+    # Reset forecast view option
+    if st.sidebar.button(" Close Forecast"):
+        st.session_state.show_forecast = False
+
+    # Forecast section - independent of region selection
+    if hasattr(st.session_state, 'show_forecast') and st.session_state.show_forecast:
         st.markdown("---")
-        
-        # Main forecast visualization
-        st.markdown("###  Forecast Visualization")
-        
-        # Create forecast plot with confidence intervals
-        fig_forecast = go.Figure()
-        
-        # Add forecast line
-        fig_forecast.add_trace(go.Scatter(
-            x=forecast_df['ds'],
-            y=forecast_df['yhat'],
-            mode='lines',
-            name='Forecast',
-            line=dict(color='#2E86AB', width=3),
-            hovertemplate='<b>Date:</b> %{x}<br><b>Forecast:</b> %{y:.1f} mm<extra></extra>'
-        ))
-        
-        # Add confidence intervals if available
-        if 'yhat_lower' in forecast_df.columns and 'yhat_upper' in forecast_df.columns:
-            # Upper bound
-            fig_forecast.add_trace(go.Scatter(
-                x=forecast_df['ds'],
-                y=forecast_df['yhat_upper'],
-                mode='lines',
-                line=dict(width=0),
-                showlegend=False,
-                hoverinfo='skip'
-            ))
-            
-            # Lower bound with fill
-            fig_forecast.add_trace(go.Scatter(
-                x=forecast_df['ds'],
-                y=forecast_df['yhat_lower'],
-                mode='lines',
-                line=dict(width=0),
-                fill='tonexty',
-                fillcolor='rgba(46, 134, 171, 0.2)',
-                name='Confidence Interval',
-                hovertemplate='<b>Date:</b> %{x}<br><b>Lower:</b> %{y:.1f} mm<extra></extra>'
-            ))
-        
-        # Add actual data if available (historical part)
-        if 'y' in forecast_df.columns:
-            actual_data = forecast_df[forecast_df['y'].notna()]
-            if len(actual_data) > 0:
-                fig_forecast.add_trace(go.Scatter(
-                    x=actual_data['ds'],
-                    y=actual_data['y'],
-                    mode='markers+lines',
-                    name='Historical Data',
-                    line=dict(color='#A23B72', width=2),
-                    marker=dict(size=6, color='#A23B72'),
-                    hovertemplate='<b>Date:</b> %{x}<br><b>Actual:</b> %{y:.1f} mm<extra></extra>'
-                ))
-        
-        fig_forecast.update_layout(
-            title='Rainfall Forecast with Confidence Intervals',
-            title_font_size=16,
-            title_x=0.5,
-            xaxis_title='Date',
-            yaxis_title='Rainfall (mm)',
-            hovermode='x unified',
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
+        st.subheader(" Rainfall Forecast Analysis")
+        st.markdown("*Access comprehensive rainfall predictions and analysis from the sidebar*")
+    
+        try:
+            # Cached on the forecast file's mtime: no disk I/O or figure rebuild per rerun
+            with stage("forecast bundle"):
+                forecast = get_forecast_bundle(str(FORECAST_CSV), os.stat(FORECAST_CSV).st_mtime_ns)
+            metrics = forecast["metrics"]
+        
+            st.markdown("###  Future Rainfall Predictions")
+            st.markdown("*This forecast uses Prophet time series modeling to predict future rainfall patterns.*")
+        
+            # Display forecast metrics
+            col1, col2, col3, col4 = st.columns(4)
+        
+            with col1:
+                st.metric(" Forecast Period", f"{metrics['days']} days")
+            with col2:
+                st.metric(" Avg Predicted Rainfall", f"{metrics['mean']:.1f} mm")
+            with col3:
+                st.metric(" Peak Forecast", f"{metrics['max']:.1f} mm")
+            with col4:
+                st.metric(" Lowest Forecast", f"{metrics['min']:.1f} mm")
+        
+            st.markdown("---")
+        
+            # Main forecast visualization
+            st.markdown("###  Forecast Visualization")
+            render_chart(forecast["fig_forecast"], "forecast")
+        
+            # Monthly forecast breakdown
+            st.markdown("### 📅 Monthly Forecast Breakdown")
+            render_chart(forecast["fig_monthly"], "monthly forecast")
+        
+            # Seasonal analysis
+            st.markdown("###  Seasonal Forecast Analysis")
+            render_chart(forecast["fig_seasonal"], "seasonal forecast")
+        
+            # Data table
+            st.markdown("###  Forecast Data Table")
+            st.dataframe(forecast["table"].tail(30), use_container_width=True, height=300)
+        
+            # Download option
+            st.download_button(
+                label=" Download Forecast Data",
+                data=forecast["csv"],
+                file_name="bhutan_rainfall_forecast.csv",
+                mime="text/csv"
             )
-        )
-        
-        st.plotly_chart(fig_forecast, use_container_width=True)
-        
-        # Monthly forecast breakdown
-        st.markdown("### 📅 Monthly Forecast Breakdown")
-        
-        # Create monthly aggregation
-        forecast_df['month'] = forecast_df['ds'].dt.month
-        forecast_df['month_name'] = forecast_df['ds'].dt.month_name()
-        monthly_forecast = forecast_df.groupby(['month', 'month_name'])['yhat'].mean().reset_index()
-        
-        # Create monthly forecast bar chart
-        fig_monthly = px.bar(
-            monthly_forecast, 
-            x='month_name', 
-            y='yhat',
-            title='Average Monthly Forecast',
-            labels={'yhat': 'Predicted Rainfall (mm)', 'month_name': 'Month'},
-            color='yhat',
-            color_continuous_scale='Blues',
-            template="plotly_white"
-        )
         
-        fig_monthly.update_traces(
-            texttemplate='%{y:.1f}',
-            textposition='outside',
-            marker_line_color="#2E86AB",
-            marker_line_width=1.5
-        )
-        
-        fig_monthly.update_layout(
-            title_font_size=16,
-            title_x=0.5,
-            xaxis_title_font_size=14,
-            yaxis_title_font_size=14,
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            showlegend=False
-        )
-        
-        st.plotly_chart(fig_monthly, use_container_width=True)
-        
-        # Seasonal analysis
-        st.markdown("###  Seasonal Forecast Analysis")
-        
-        # Define seasons
-        def get_season(month):
-            if month in [12, 1, 2]:
-                return 'Winter'
-            elif month in [3, 4, 5]:
-                return 'Spring'
-            elif month in [6, 7, 8]:
-                return 'Summer'
+            # Per-region forecasts for the sidebar selection
+            st.markdown("###  Regional Forecasts")
+            if len(regions) == 0:
+                st.info("Select regions in the sidebar to compare their forecasts")
+            elif not REGION_FORECASTS_CSV.exists():
+                st.info("Per-region forecasts are not available yet. Run `python -m rainfall.forecast_engine` to generate `outputs/region_forecasts.csv`.")
             else:
-                return 'Autumn'
-        
-        forecast_df['season'] = forecast_df['month'].apply(get_season)
-        seasonal_forecast = forecast_df.groupby('season')['yhat'].agg(['mean', 'std']).reset_index()
-        seasonal_forecast.columns = ['Season', 'Average_Rainfall', 'Std_Deviation']
-        
-        # Create seasonal comparison
-        fig_seasonal = px.bar(
-            seasonal_forecast, 
-            x='Season', 
-            y='Average_Rainfall',
-            title='Seasonal Rainfall Forecast',
-            labels={'Average_Rainfall': 'Average Rainfall (mm)'},
-            color='Average_Rainfall',
-            color_continuous_scale='Viridis',
-            template="plotly_white"
-        )
-        
-        fig_seasonal.update_traces(
-            error_y=dict(type='data', array=seasonal_forecast['Std_Deviation'], visible=True),
-            texttemplate='%{y:.1f}',
-            textposition='outside',
-            marker_line_color="#2E86AB",
-            marker_line_width=1.5
-        )
-        
-        fig_seasonal.update_layout(
-            title_font_size=16,
-            title_x=0.5,
-            xaxis_title_font_size=14,
-            yaxis_title_font_size=14,
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            showlegend=False
-        )
-        
-        st.plotly_chart(fig_seasonal, use_container_width=True)
-        
-        # Data table
-        st.markdown("###  Forecast Data Table")
-        
-        # Show recent forecast data
-        display_forecast = forecast_df[['ds', 'yhat']].copy()
-        display_forecast.columns = ['Date', 'Predicted_Rainfall_mm']
-        display_forecast['Predicted_Rainfall_mm'] = display_forecast['Predicted_Rainfall_mm'].round(2)
-        
-        # Add confidence intervals if available
-        if 'yhat_lower' in forecast_df.columns and 'yhat_upper' in forecast_df.columns:
-            display_forecast['Lower_Bound'] = forecast_df['yhat_lower'].round(2)
-            display_forecast['Upper_Bound'] = forecast_df['yhat_upper'].round(2)
-        
-        st.dataframe(display_forecast.tail(30), use_container_width=True, height=300)
-        
-        # Download option
-        csv = display_forecast.to_csv(index=False)
-        st.download_button(
-            label=" Download Forecast Data",
-            data=csv,
-            file_name="bhutan_rainfall_forecast.csv",
-            mime="text/csv"
-        )
-        
-    except FileNotFoundError:
-        st.info("🔮 **Forecast data not available yet**")
-        st.markdown("""
-        **To generate forecast data:**
-        1.  Open the forecast notebook (`notebooks/forecast.ipynb`)
-        2.  Run the Prophet forecasting model
-        3.  This will generate `outputs/forecast.csv`
-        4.  Refresh this dashboard to see the forecast
-        """)
-        
-        # Show preview of what forecast would look like
-        st.markdown("**Preview of forecast features:**")
-        
-        col1, col2 = st.columns(2)
-        with col1:
+                shown = sorted(regions)[:MAX_FORECAST_REGIONS]
+                if len(regions) > MAX_FORECAST_REGIONS:
+                    st.caption(f"Showing the first {MAX_FORECAST_REGIONS} of {len(regions)} selected regions")
+                with stage("regional forecast figure"):
+                    fig_regions = get_region_forecast_figure(
+                        str(REGION_FORECASTS_CSV), os.stat(REGION_FORECASTS_CSV).st_mtime_ns, tuple(shown)
+                    )
+                render_chart(fig_regions, "regional forecasts")
+        
+            # Rolling-origin backtest: how far off past forecasts were, by months ahead
+            st.markdown("###  Forecast Accuracy (Backtest)")
+            if not BACKTEST_METRICS_CSV.exists():
+                st.info("Backtest results are not available yet. Run `python -m rainfall.backtest` to generate `outputs/backtest_metrics.csv`.")
+            else:
+                from rainfall.backtest import NATIONAL, summarize
+                backtest = get_backtest_metrics(str(BACKTEST_METRICS_CSV), os.stat(BACKTEST_METRICS_CSV).st_mtime_ns)
+                st.markdown("*Models refitted at several past cutoffs and scored on the following months. MAPE skips months under 5 mm; coverage is the share of actual values inside the 80% interval.*")
+            
+                national = summarize(backtest, [NATIONAL], by="series")
+                if len(national):
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric(" National MAE", f"{national['mae'].iloc[0]:.1f} mm")
+                    with col2:
+                        st.metric(" National MAPE", f"{national['mape'].iloc[0]:.0f}%")
+                    with col3:
+                        st.metric(" Interval Coverage", f"{national['coverage'].iloc[0]:.0%}")
+            
+                labels = {"mae": "MAE (mm)", "mape": "MAPE (%)", "coverage": "Coverage"}
+                by_horizon = summarize(backtest, [NATIONAL]).rename(columns=labels).merge(
+                    summarize(backtest).rename(columns=labels), on="horizon", how="outer",
+                    suffixes=(" · national", " · all regions")
+                ).drop(columns=["n · national", "n · all regions"])
+                st.dataframe(by_horizon.rename(columns={"horizon": "Months Ahead"}).round(2),
+                             use_container_width=True, hide_index=True)
+            
+                if len(regions) > 0:
+                    selected = summarize(backtest, regions, by="series")
+                    if len(selected):
+                        st.markdown("**Selected regions** (all horizons)")
+                        selected = selected.rename(columns={**labels, "series": "Region", "n": "Forecasts"})
+                        st.dataframe(selected.round(2), use_container_width=True, hide_index=True)
+        
+        except FileNotFoundError:
+            st.info("🔮 **Forecast data not available yet**")
             st.markdown("""
-            ** Visualizations:**
-            - Time series forecast with confidence intervals
-            - Monthly breakdown predictions
-            - Seasonal analysis
-            - Interactive Plotly charts
+            **To generate forecast data:**
+            1.  Open the forecast notebook (`notebooks/forecast.ipynb`)
+            2.  Run the Prophet forecasting model
+            3.  This will generate `outputs/forecast.csv`
+            4.  Refresh this dashboard to see the forecast
             """)
         
-        with col2:
-            st.markdown("""
-            ** Metrics:**
-            - Forecast period duration
-            - Average predicted rainfall
-            - Peak and minimum forecasts
-            - Seasonal comparisons
-            """)
+            # Show preview of what forecast would look like
+            st.markdown("**Preview of forecast features:**")
+        
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("""
+                ** Visualizations:**
+                - Time series forecast with confidence intervals
+                - Monthly breakdown predictions
+                - Seasonal analysis
+                - Interactive Plotly charts
+                """)
+        
+            with col2:
+                st.markdown("""
+                ** Metrics:**
+                - Forecast period duration
+                - Average predicted rainfall
+                - Peak and minimum forecasts
+                - Seasonal comparisons
+                """)
     
-    except Exception as e:
-        st.error(f" **Error loading forecast data:** {str(e)}")
-        st.markdown("Please check if the forecast analysis has been run successfully.")
-        st.markdown("**Debug info:**")
-        st.code(f"Error details: {type(e).__name__}: {str(e)}")
+        except Exception as e:
+            st.error(f" **Error loading forecast data:** {str(e)}")
+            st.markdown("Please check if the forecast analysis has been run successfully.")
+            st.markdown("**Debug info:**")
+            st.code(f"Error details: {type(e).__name__}: {str(e)}")
     
-    # Stop here if forecast is shown - don't show the main dashboard
-    st.stop()
+        # Stop here if forecast is shown - don't show the main dashboard
+        show_profile("forecast")
+        st.stop()
 
-filtered_df = df[
-    df["ADM2_PCODE"].isin(regions) &
-    df["year"].between(year_range[0], year_range[1])
-]
-
-# Dashboard content
-# Check if regions are selected
-if len(regions) == 0:
-    # Show full-screen Bhutan image when no regions are selected
-    bhutan_image_b64 = get_base64_image("bhutan_image.jpg")
+    # Dashboard content
+    # Check if regions are selected
+    if len(regions) == 0:
+        # Show full-screen Bhutan image when no regions are selected
+        background_variants = landing_background()
     
-    if bhutan_image_b64:
-        st.markdown(
-            f"""
-            <style>
-            .stApp {{
-                background-image: linear-gradient(rgba(0,0,0,0.2), rgba(0,0,0,0.2)), url('data:image/jpeg;base64,{bhutan_image_b64}');
-                background-size: cover;
-                background-position: center;
-                background-attachment: fixed;
-                background-repeat: no-repeat;
-                min-height: 100vh;
-            }}
-            .main-content {{
-                background: transparent !important;
-            }}
-            
-            /* Animated title styles */
-            .animated-title {{
-                position: fixed;
-                top: 40%;
-                left: 50%;
-                transform: translate(-50%, -50%);
-                text-align: center;
-                z-index: 10;
-            }}
-            
-            .animated-title h1 {{
-                color: #ffffff;
-                font-size: 4rem;
-                font-weight: bold;
-                text-shadow: 3px 3px 8px rgba(0,0,0,0.9);
-                letter-spacing: 2px;
-                margin: 0;
-                animation: fadeInScale 2s ease-in-out, glow 3s ease-in-out infinite alternate;
-            }}
-            
-            .animated-title .subtitle {{
-                color: #FFD700;
-                font-size: 1.8rem;
-                font-style: italic;
-                text-shadow: 2px 2px 6px rgba(0,0,0,0.8);
-                margin-top: 1rem;
-                animation: fadeInUp 2s ease-in-out 0.5s both;
-            }}
-            
-            /* Animations */
-            @keyframes fadeInScale {{
-                0% {{
-                    opacity: 0;
-                    transform: scale(0.8);
+        if background_variants:
+            st.markdown(
+                f"""
+                <style>
+                {background_css(background_variants, overlay="linear-gradient(rgba(0,0,0,0.2), rgba(0,0,0,0.2))")}
+                .stApp {{
+                    background-size: cover;
+                    background-position: center;
+                    background-attachment: fixed;
+                    background-repeat: no-repeat;
+                    min-height: 100vh;
                 }}
-                100% {{
-                    opacity: 1;
-                    transform: scale(1);
+                .main-content {{
+                    background: transparent !important;
                 }}
-            }}
             
-            @keyframes fadeInUp {{
-                0% {{
-                    opacity: 0;
-                    transform: translateY(30px);
+                /* Animated title styles */
+                .animated-title {{
+                    position: fixed;
+                    top: 40%;
+                    left: 50%;
+                    transform: translate(-50%, -50%);
+                    text-align: center;
+                    z-index: 10;
                 }}
-                100% {{
-                    opacity: 1;
-                    transform: translateY(0);
+            
+                .animated-title h1 {{
+                    color: #ffffff;
+                    font-size: 4rem;
+                    font-weight: bold;
+                    text-shadow: 3px 3px 8px rgba(0,0,0,0.9);
+                    letter-spacing: 2px;
+                    margin: 0;
+                    animation: fadeInScale 2s ease-in-out, glow 3s ease-in-out infinite alternate;
                 }}
-            }}
             
-            @keyframes glow {{
-                0% {{
-                    text-shadow: 3px 3px 8px rgba(0,0,0,0.9), 0 0 10px rgba(255,255,255,0.3);
+                .animated-title .subtitle {{
+                    color: #FFD700;
+                    font-size: 1.8rem;
+                    font-style: italic;
+                    text-shadow: 2px 2px 6px rgba(0,0,0,0.8);
+                    margin-top: 1rem;
+                    animation: fadeInUp 2s ease-in-out 0.5s both;
                 }}
-                100% {{
-                    text-shadow: 3px 3px 8px rgba(0,0,0,0.9), 0 0 20px rgba(255,255,255,0.6), 0 0 30px rgba(255,215,0,0.4);
+            
+                /* Animations */
+                @keyframes fadeInScale {{
+                    0% {{
+                        opacity: 0;
+                        transform: scale(0.8);
+                    }}
+                    100% {{
+                        opacity: 1;
+                        transform: scale(1);
+                    }}
                 }}
-            }}
             
-            /* Floating animation for dragon emoji */
-            .dragon-float {{
-                animation: float 4s ease-in-out infinite;
-                display: inline-block;
-            }}
+                @keyframes fadeInUp {{
+                    0% {{
+                        opacity: 0;
+                        transform: translateY(30px);
+                    }}
+                    100% {{
+                        opacity: 1;
+                        transform: translateY(0);
+                    }}
+                }}
             
-            @keyframes float {{
-                0%, 100% {{
-                    transform: translateY(0px);
+                @keyframes glow {{
+                    0% {{
+                        text-shadow: 3px 3px 8px rgba(0,0,0,0.9), 0 0 10px rgba(255,255,255,0.3);
+                    }}
+                    100% {{
+                        text-shadow: 3px 3px 8px rgba(0,0,0,0.9), 0 0 20px rgba(255,255,255,0.6), 0 0 30px rgba(255,215,0,0.4);
+                    }}
                 }}
-                50% {{
-                    transform: translateY(-10px);
+            
+                /* Floating animation for dragon emoji */
+                .dragon-float {{
+                    animation: float 4s ease-in-out infinite;
+                    display: inline-block;
                 }}
-            }}
-            </style>
-            <div class="animated-title">
-                <h1> Bhutan Rainfall Explorer</h1>
-                <div class="subtitle">
-                    <span class="dragon-float">🐉</span> The Land of the Thunder Dragon <span class="dragon-float">🐉</span>
+            
+                @keyframes float {{
+                    0%, 100% {{
+                        transform: translateY(0px);
+                    }}
+                    50% {{
+                        transform: translateY(-10px);
+                    }}
+                }}
+                </style>
+                <div class="animated-title">
+                    <h1> Bhutan Rainfall Explorer</h1>
+                    <div class="subtitle">
+                        <span class="dragon-float">🐉</span> The Land of the Thunder Dragon <span class="dragon-float">🐉</span>
+                    </div>
                 </div>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-    else:
-        st.markdown(
-            """
-            <style>
-            .stApp {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-            }
-            </style>
-            """,
-            unsafe_allow_html=True
-        )
-        st.info(" **Please select regions from the sidebar to start exploring rainfall data**")
-        st.markdown("""
-        ###  Features Available:
-        -  **Monthly rainfall trends** over time
-        -  **Rainfall distribution** analysis  
-        -  **Seasonal patterns** by month
-        -  **Regional comparisons** across selected areas
-        -  **Machine learning clusters** (when available)
-        """)
+                """,
+                unsafe_allow_html=True
+            )
+        else:
+            st.markdown(
+                """
+                <style>
+                .stApp {
+                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                    min-height: 100vh;
+                }
+                </style>
+                """,
+                unsafe_allow_html=True
+            )
+            st.info(" **Please select regions from the sidebar to start exploring rainfall data**")
+            st.markdown("""
+            ###  Features Available:
+            -  **Rainfall trends** by dekad, month, season or year
+            -  **Rainfall distribution** analysis  
+            -  **Seasonal patterns** by month
+            -  **Regional comparisons** across selected areas
+            -  **Machine learning clusters** (when available)
+            """)
     
-    st.stop()
+        show_profile("no selection")
+        st.stop()
 
-# Show dashboard title only when regions are selected
-st.title(" Bhutan Rainfall Dashboard")
+    # Show dashboard title only when regions are selected
+    st.title(" Bhutan Rainfall Dashboard")
 
-# Show selected regions info
-st.markdown(f"Showing **{len(regions)}** regions from **{year_range[0]}–{year_range[1]}**")
+    # Show selected regions info
+    st.markdown(f"Showing **{len(regions)}** regions from **{year_range[0]}–{year_range[1]}**")
 
-# Filter data
-filtered_df = df[
-    df["ADM2_PCODE"].isin(regions) &
-    df["year"].between(year_range[0], year_range[1])
-]
+    # Filter and aggregate (memoized per canonical region set and year range)
+    with stage("filter + aggregate"):
+        frames = dashboard_frames(query_cache, engine, regions, year_range, data_version)
+    query = canonical_query(regions, year_range)
+    show_cache_stats()
 
-# Check if filtered data is empty
-if len(filtered_df) == 0:
-    st.warning(" No data available for the selected regions and year range. Please adjust your selections.")
-    st.stop()
+    # Check if filtered data is empty
+    if frames["row_count"] == 0:
+        st.warning(" No data available for the selected regions and year range. Please adjust your selections.")
+        show_profile("empty selection")
+        st.stop()
 
-# Monthly trend
-st.subheader(" Monthly Average Rainfall")
-monthly_avg = filtered_df.groupby(filtered_df["date"].dt.to_period("M"))["rfh"].mean().reset_index()
-monthly_avg["date"] = monthly_avg["date"].dt.to_timestamp()
-
-# Create interactive Plotly line chart
-fig1 = px.line(monthly_avg, x="date", y="rfh", 
-               title="Monthly Average Rainfall Trends",
-               labels={"rfh": "Rainfall (mm)", "date": "Date"},
-               template="plotly_white")
-
-fig1.update_traces(
-    line=dict(color="#2E86AB", width=3),
-    mode="lines+markers",
-    marker=dict(size=8, color="#A23B72", line=dict(width=2, color="white"))
-)
-
-fig1.update_layout(
-    title_font_size=16,
-    title_x=0.5,
-    xaxis_title_font_size=14,
-    yaxis_title_font_size=14,
-    hovermode='x unified',
-    plot_bgcolor="rgba(0,0,0,0)",
-    paper_bgcolor="rgba(0,0,0,0)"
-)
-
-st.plotly_chart(fig1, use_container_width=True)
-
-# Histogram
-st.subheader(" Rainfall Distribution")
-
-# Create interactive Plotly histogram
-fig2 = px.histogram(filtered_df, x="rfh", nbins=30,
-                    title="Rainfall Distribution Across Selected Regions",
-                    labels={"rfh": "Rainfall (mm)", "count": "Frequency"},
-                    template="plotly_white",
-                    marginal="box")  # Add box plot on top
-
-fig2.update_traces(
-    marker_color="#4ECDC4",
-    marker_line_color="#2E86AB",
-    marker_line_width=1.5,
-    opacity=0.7
-)
-
-fig2.update_layout(
-    title_font_size=16,
-    title_x=0.5,
-    xaxis_title_font_size=14,
-    yaxis_title_font_size=14,
-    plot_bgcolor="rgba(0,0,0,0)",
-    paper_bgcolor="rgba(0,0,0,0)",
-    showlegend=False
-)
-
-st.plotly_chart(fig2, use_container_width=True)
-
-# Boxplot
-st.subheader(" Rainfall by Month")
-
-# Create interactive Plotly box plot
-fig3 = px.box(filtered_df, x="month_name", y="rfh",
-              title="Monthly Rainfall Distribution Patterns",
-              labels={"rfh": "Rainfall (mm)", "month_name": "Month"},
-              template="plotly_white",
-              category_orders={"month_name": list(calendar.month_name)[1:]})
-
-fig3.update_traces(
-    marker_color="#FF6B6B",
-    line_color="#2E86AB",
-    fillcolor="rgba(255, 107, 107, 0.3)",
-    marker_size=4
-)
-
-fig3.update_layout(
-    title_font_size=16,
-    title_x=0.5,
-    xaxis_title_font_size=14,
-    yaxis_title_font_size=14,
-    xaxis_tickangle=45,
-    plot_bgcolor="rgba(0,0,0,0)",
-    paper_bgcolor="rgba(0,0,0,0)"
-)
-
-st.plotly_chart(fig3, use_container_width=True)
-
-# Regional Comparison
-st.subheader(" Regional Rainfall Comparison")
-if len(regions) > 1:
-    # Create regional comparison chart
-    regional_avg = filtered_df.groupby('ADM2_PCODE')['rfh'].agg(['mean', 'std']).reset_index()
-    regional_avg.columns = ['Region', 'Average_Rainfall', 'Std_Deviation']
-    
-    # Create interactive bar chart with error bars
-    fig4 = px.bar(regional_avg, x='Region', y='Average_Rainfall',
-                  title="Average Rainfall by Region (with Standard Deviation)",
-                  labels={"Average_Rainfall": "Average Rainfall (mm)", "Region": "Region Code"},
-                  template="plotly_white",
-                  color='Average_Rainfall',
-                  color_continuous_scale="Blues")
-    
-    # Add error bars
-    fig4.update_traces(
-        error_y=dict(type='data', array=regional_avg['Std_Deviation'], visible=True),
-        marker_line_color="#2E86AB",
-        marker_line_width=1.5,
-        texttemplate='%{y:.1f}',
-        textposition='outside'
-    )
-    
-    fig4.update_layout(
-        title_font_size=16,
-        title_x=0.5,
-        xaxis_title_font_size=14,
-        yaxis_title_font_size=14,
-        xaxis_tickangle=45,
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        showlegend=False
+    # Plotting backend, first needed here
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    from rainfall.downsample import decimate_frame
+
+    # Rainfall over time, at the chosen granularity, straight from the rollup
+    st.subheader(" Average Rainfall Over Time")
+    TREND_TITLES = {"Dekad": "Dekadal", "Month": "Monthly", "Season": "Seasonal", "Year": "Yearly"}
+    granularity = st.radio(
+        "Time granularity", list(TREND_TITLES), index=1, horizontal=True,
+        help="Seasons: Winter (Dec–Feb), Spring (Mar–May), Monsoon (Jun–Sep), Autumn (Oct–Nov)"
     )
-    
-    st.plotly_chart(fig4, use_container_width=True)
-else:
-    st.info("Select multiple regions to see regional comparison")
 
-# Forecast section - independent of region selection
-if hasattr(st.session_state, 'show_forecast') and st.session_state.show_forecast:
-    st.markdown("---")
-    st.subheader("🔮 Rainfall Forecast Analysis")
-    st.markdown("*Access comprehensive rainfall predictions and analysis from the sidebar*")
-    
-    try:
-        # Try to load forecast data
-        forecast_df = pd.read_csv("outputs/forecast.csv", parse_dates=["ds"])
-        
-        st.markdown("###  Future Rainfall Predictions")
-        st.markdown("*This forecast uses Prophet time series modeling to predict future rainfall patterns.*")
-        
-        # Display forecast metrics
-        col1, col2, col3, col4 = st.columns(4)
-        
-        # Calculate forecast period
-        forecast_start = forecast_df['ds'].min()
-        forecast_end = forecast_df['ds'].max()
-        forecast_days = (forecast_end - forecast_start).days
-        
-        with col1:
-            st.metric(" Forecast Period", f"{forecast_days} days")
-        with col2:
-            avg_forecast = forecast_df['yhat'].mean()
-            st.metric(" Avg Predicted Rainfall", f"{avg_forecast:.1f} mm")
-        with col3:
-            max_forecast = forecast_df['yhat'].max()
-            st.metric(" Peak Forecast", f"{max_forecast:.1f} mm")
-        with col4:
-            min_forecast = forecast_df['yhat'].min()
-            st.metric(" Lowest Forecast", f"{min_forecast:.1f} mm")
-        
-        st.markdown("---")
-        
-        # Main forecast visualization
-        st.markdown("###  Forecast Visualization")
-        
-        # Create forecast plot with confidence intervals
-        fig_forecast = go.Figure()
-        
-        # Add forecast line
-        fig_forecast.add_trace(go.Scatter(
-            x=forecast_df['ds'],
-            y=forecast_df['yhat'],
-            mode='lines',
-            name='Forecast',
-            line=dict(color='#2E86AB', width=3),
-            hovertemplate='<b>Date:</b> %{x}<br><b>Forecast:</b> %{y:.1f} mm<extra></extra>'
+    def build_trend_figure():
+        with stage("rollup series"):
+            rollup = load_rollup(data_version)
+            level = granularity.lower()
+            trend = decimate_frame(rollup.series(level, regions, year_range), "date", "rfh")
+            national = decimate_frame(rollup.series(level, None, year_range), "date", "rfh")
+
+        # Create interactive Plotly line chart
+        fig1 = px.line(trend, x="date", y="rfh", 
+                       title=f"{TREND_TITLES[granularity]} Average Rainfall Trends",
+                       labels={"rfh": "Rainfall (mm)", "date": "Date"},
+                       hover_data={"period": True, "date": False},
+                       template="plotly_white")
+
+        fig1.update_traces(
+            name="Selected regions", showlegend=True,
+            line=dict(color="#2E86AB", width=3),
+            mode="lines+markers",
+            marker=dict(size=8, color="#A23B72", line=dict(width=2, color="white"))
+        )
+        fig1.add_trace(go.Scatter(
+            x=national["date"], y=national["rfh"], name="Bhutan (all regions)",
+            mode="lines", line=dict(color="#8D99AE", width=2, dash="dash"),
+            customdata=national["period"], hovertemplate="%{customdata}: %{y:.1f} mm<extra></extra>"
         ))
-        
-        # Add confidence intervals if available
-        if 'yhat_lower' in forecast_df.columns and 'yhat_upper' in forecast_df.columns:
-            # Upper bound
-            fig_forecast.add_trace(go.Scatter(
-                x=forecast_df['ds'],
-                y=forecast_df['yhat_upper'],
-                mode='lines',
-                line=dict(width=0),
-                showlegend=False,
-                hoverinfo='skip'
-            ))
-            
-            # Lower bound with fill
-            fig_forecast.add_trace(go.Scatter(
-                x=forecast_df['ds'],
-                y=forecast_df['yhat_lower'],
-                mode='lines',
-                line=dict(width=0),
-                fill='tonexty',
-                fillcolor='rgba(46, 134, 171, 0.2)',
-                name='Confidence Interval',
-                hovertemplate='<b>Date:</b> %{x}<br><b>Lower:</b> %{y:.1f} mm<extra></extra>'
-            ))
-        
-        # Add actual data if available (historical part)
-        if 'y' in forecast_df.columns:
-            actual_data = forecast_df[forecast_df['y'].notna()]
-            if len(actual_data) > 0:
-                fig_forecast.add_trace(go.Scatter(
-                    x=actual_data['ds'],
-                    y=actual_data['y'],
-                    mode='markers+lines',
-                    name='Historical Data',
-                    line=dict(color='#A23B72', width=2),
-                    marker=dict(size=6, color='#A23B72'),
-                    hovertemplate='<b>Date:</b> %{x}<br><b>Actual:</b> %{y:.1f} mm<extra></extra>'
-                ))
-        
-        fig_forecast.update_layout(
-            title='Rainfall Forecast with Confidence Intervals',
+
+        fig1.update_layout(
             title_font_size=16,
             title_x=0.5,
-            xaxis_title='Date',
-            yaxis_title='Rainfall (mm)',
+            xaxis_title_font_size=14,
+            yaxis_title_font_size=14,
             hovermode='x unified',
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
             plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            )
+            paper_bgcolor="rgba(0,0,0,0)"
         )
-        
-        st.plotly_chart(fig_forecast, use_container_width=True)
-        
-        # Monthly forecast breakdown
-        st.markdown("### 📅 Monthly Forecast Breakdown")
-        
-        # Create monthly aggregation
-        forecast_df['month'] = forecast_df['ds'].dt.month
-        forecast_df['month_name'] = forecast_df['ds'].dt.month_name()
-        monthly_forecast = forecast_df.groupby(['month', 'month_name'])['yhat'].mean().reset_index()
-        
-        # Create monthly forecast bar chart
-        fig_monthly = px.bar(
-            monthly_forecast, 
-            x='month_name', 
-            y='yhat',
-            title='Average Monthly Forecast',
-            labels={'yhat': 'Predicted Rainfall (mm)', 'month_name': 'Month'},
-            color='yhat',
-            color_continuous_scale='Blues',
-            template="plotly_white"
-        )
-        
-        fig_monthly.update_traces(
-            texttemplate='%{y:.1f}',
-            textposition='outside',
+        return fig1
+
+    with stage("figure: rainfall trend"):
+        fig1 = cached_figure(("rainfall trend", query, granularity), build_trend_figure)
+
+    render_chart(fig1, "rainfall trend")
+
+    # Histogram
+    st.subheader(" Rainfall Distribution")
+
+    # Histogram from precomputed bins, with the marginal box from precomputed quartiles
+    def build_distribution_figure():
+        hist = frames["histogram"]
+        dist = frames["distribution"]
+        fig2 = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.02)
+        fig2.add_trace(go.Box(
+            q1=[dist["q1"]], median=[dist["median"]], q3=[dist["q3"]],
+            lowerfence=[dist["lowerfence"]], upperfence=[dist["upperfence"]],
+            mean=[dist["mean"]], y=["rfh"], orientation="h", name="Rainfall",
+            marker_color="#4ECDC4", line_color="#2E86AB"
+        ), row=1, col=1)
+        fig2.add_trace(go.Bar(
+            x=(hist["edges"][:-1] + hist["edges"][1:]) / 2,
+            y=hist["counts"],
+            width=hist["edges"][1:] - hist["edges"][:-1],
+            name="Frequency",
+            marker_color="#4ECDC4",
             marker_line_color="#2E86AB",
-            marker_line_width=1.5
-        )
-        
-        fig_monthly.update_layout(
+            marker_line_width=1.5,
+            opacity=0.7,
+            hovertemplate="<b>Rainfall:</b> %{x:.1f} mm<br><b>Frequency:</b> %{y:.0f}<extra></extra>"
+        ), row=2, col=1)
+        fig2.update_yaxes(showticklabels=False, row=1, col=1)
+        fig2.update_xaxes(title_text="Rainfall (mm)", row=2, col=1)
+        fig2.update_yaxes(title_text="Frequency", row=2, col=1)
+
+        fig2.update_layout(
+            title="Rainfall Distribution Across Selected Regions",
+            template="plotly_white",
+            bargap=0,
             title_font_size=16,
             title_x=0.5,
             xaxis_title_font_size=14,
@@ -855,258 +718,421 @@ if hasattr(st.session_state, 'show_forecast') and st.session_state.show_forecast
             paper_bgcolor="rgba(0,0,0,0)",
             showlegend=False
         )
-        
-        st.plotly_chart(fig_monthly, use_container_width=True)
-        
-        # Seasonal analysis
-        st.markdown("### 🌤️ Seasonal Forecast Analysis")
-        
-        # Define seasons
-        def get_season(month):
-            if month in [12, 1, 2]:
-                return 'Winter'
-            elif month in [3, 4, 5]:
-                return 'Spring'
-            elif month in [6, 7, 8]:
-                return 'Summer'
-            else:
-                return 'Autumn'
-        
-        forecast_df['season'] = forecast_df['month'].apply(get_season)
-        seasonal_forecast = forecast_df.groupby('season')['yhat'].agg(['mean', 'std']).reset_index()
-        seasonal_forecast.columns = ['Season', 'Average_Rainfall', 'Std_Deviation']
-        
-        # Create seasonal comparison
-        fig_seasonal = px.bar(
-            seasonal_forecast, 
-            x='Season', 
-            y='Average_Rainfall',
-            title='Seasonal Rainfall Forecast',
-            labels={'Average_Rainfall': 'Average Rainfall (mm)'},
-            color='Average_Rainfall',
-            color_continuous_scale='Viridis',
-            template="plotly_white"
-        )
-        
-        fig_seasonal.update_traces(
-            error_y=dict(type='data', array=seasonal_forecast['Std_Deviation'], visible=True),
-            texttemplate='%{y:.1f}',
-            textposition='outside',
-            marker_line_color="#2E86AB",
-            marker_line_width=1.5
+        return fig2
+
+    with stage("figure: distribution"):
+        fig2 = cached_figure(("distribution", query), build_distribution_figure)
+
+    render_chart(fig2, "distribution")
+
+    # Boxplot
+    st.subheader(" Rainfall by Month")
+
+    # Box plot from precomputed quartiles/whiskers (merged cube sketches)
+    def build_month_figure():
+        month_stats = frames["month_stats"]
+        fig3 = go.Figure(go.Box(
+            x=month_stats["month_name"],
+            q1=month_stats["q1"],
+            median=month_stats["median"],
+            q3=month_stats["q3"],
+            lowerfence=month_stats["lowerfence"],
+            upperfence=month_stats["upperfence"],
+            mean=month_stats["mean"],
+            name="Rainfall"
+        ))
+
+        fig3.update_traces(
+            marker_color="#FF6B6B",
+            line_color="#2E86AB",
+            fillcolor="rgba(255, 107, 107, 0.3)",
+            marker_size=4
         )
-        
-        fig_seasonal.update_layout(
+
+        fig3.update_layout(
+            title="Monthly Rainfall Distribution Patterns",
+            xaxis_title="Month",
+            yaxis_title="Rainfall (mm)",
+            template="plotly_white",
+            xaxis={"categoryorder": "array", "categoryarray": MONTH_NAMES},
             title_font_size=16,
             title_x=0.5,
             xaxis_title_font_size=14,
             yaxis_title_font_size=14,
+            xaxis_tickangle=45,
             plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            showlegend=False
+            paper_bgcolor="rgba(0,0,0,0)"
         )
-        
-        st.plotly_chart(fig_seasonal, use_container_width=True)
-        
-        # Data table
-        st.markdown("### 📋 Forecast Data Table")
-        
-        # Show recent forecast data
-        display_forecast = forecast_df[['ds', 'yhat']].copy()
-        display_forecast.columns = ['Date', 'Predicted_Rainfall_mm']
-        display_forecast['Predicted_Rainfall_mm'] = display_forecast['Predicted_Rainfall_mm'].round(2)
-        
-        # Add confidence intervals if available
-        if 'yhat_lower' in forecast_df.columns and 'yhat_upper' in forecast_df.columns:
-            display_forecast['Lower_Bound'] = forecast_df['yhat_lower'].round(2)
-            display_forecast['Upper_Bound'] = forecast_df['yhat_upper'].round(2)
-        
-        st.dataframe(display_forecast.tail(30), use_container_width=True, height=300)
-        
-        # Download option
-        csv = display_forecast.to_csv(index=False)
-        st.download_button(
-            label="📥 Download Forecast Data",
-            data=csv,
-            file_name="bhutan_rainfall_forecast.csv",
-            mime="text/csv"
+        return fig3
+
+    with stage("figure: rainfall by month"):
+        fig3 = cached_figure(("rainfall by month", query), build_month_figure)
+
+    render_chart(fig3, "rainfall by month")
+
+    # Regional Comparison
+    st.subheader(" Regional Rainfall Comparison")
+    if len(regions) > 1:
+        # Recolor the bars by rainfall-pattern cluster on demand
+        color_by_cluster = st.toggle(
+            "Color by cluster",
+            value=False,
+            disabled=not os.path.exists(CLUSTER_SUMMARY_CSV),
+            help="Color each region by its rainfall-pattern cluster instead of its average"
         )
-        
-    except FileNotFoundError:
-        st.info("🔮 **Forecast data not available yet**")
-        st.markdown("""
-        **To generate forecast data:**
-        1. 📔 Open the forecast notebook (`notebooks/forecast.ipynb`)
-        2. ▶️ Run the Prophet forecasting model
-        3. 💾 This will generate `outputs/forecast.csv`
-        4. 🔄 Refresh this dashboard to see the forecast
-        """)
-        
-        # Show preview of what forecast would look like
-        st.markdown("**Preview of forecast features:**")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("""
-            **📊 Visualizations:**
-            - Time series forecast with confidence intervals
-            - Monthly breakdown predictions
-            - Seasonal analysis
-            - Interactive Plotly charts
-            """)
-        
-        with col2:
-            st.markdown("""
-            **📈 Metrics:**
-            - Forecast period duration
-            - Average predicted rainfall
-            - Peak and minimum forecasts
-            - Seasonal comparisons
-            """)
-    
-    except Exception as e:
-        st.error(f"❌ **Error loading forecast data:** {str(e)}")
-        st.markdown("Please check if the forecast analysis has been run successfully.")
-        st.markdown("**Debug info:**")
-        st.code(f"Error details: {type(e).__name__}: {str(e)}")
-
-# Cluster summary
-st.subheader(" Cluster Analysis")
-with st.expander(" View Cluster Summary", expanded=False):
-    try:
-        cluster_df = pd.read_csv("outputs/cluster_summary.csv", index_col=0)
-        
-        # Add some styling and information
-        st.markdown("###  Rainfall Pattern Clusters")
-        st.markdown("*This analysis groups regions with similar rainfall patterns using machine learning clustering.*")
-        
-        # Check what columns are available
-        st.write("**Available columns:**", list(cluster_df.columns))
-        
-        # Display metrics in columns - make it flexible based on available columns
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric(" Total Clusters", len(cluster_df))
-        
-        with col2:
-            # Try different possible column names for average rainfall
-            avg_rainfall_col = None
-            for col in ['avg_rainfall', 'mean_rainfall', 'average_rainfall', 'rfh_mean', 'mean']:
-                if col in cluster_df.columns:
-                    avg_rainfall_col = col
-                    break
+
+        # Create regional comparison chart
+        def build_regional_figure():
+            regional_avg = frames["regional_avg"]
+            color_args = dict(color='Average_Rainfall', color_continuous_scale="Blues")
+            if color_by_cluster:
+                labels = get_cluster_labels(clusters_mtime)
+                cluster = regional_avg['Region'].map(labels)
+                regional_avg = regional_avg.assign(
+                    Cluster=["Unassigned" if pd.isna(c) else f"Cluster {int(c)}" for c in cluster]
+                )
+                color_args = dict(color='Cluster',
+                                  category_orders={"Region": list(regional_avg['Region']),
+                                                   "Cluster": sorted(regional_avg['Cluster'].unique())},
+                                  color_discrete_sequence=px.colors.qualitative.Set2)
+
+            # Create interactive bar chart with error bars
+            fig4 = px.bar(regional_avg, x='Region', y='Average_Rainfall',
+                          title="Average Rainfall by Region (with Standard Deviation)",
+                          labels={"Average_Rainfall": "Average Rainfall (mm)", "Region": "Region Code"},
+                          template="plotly_white",
+                          **color_args)
+
+            # Add error bars
+            fig4.update_traces(
+                error_y=dict(type='data', array=regional_avg['Std_Deviation'], visible=True),
+                marker_line_color="#2E86AB",
+                marker_line_width=1.5,
+                texttemplate='%{y:.1f}',
+                textposition='outside'
+            )
+
+            fig4.update_layout(
+                title_font_size=16,
+                title_x=0.5,
+                xaxis_title_font_size=14,
+                yaxis_title_font_size=14,
+                xaxis_tickangle=45,
+                plot_bgcolor="rgba(0,0,0,0)",
+                paper_bgcolor="rgba(0,0,0,0)",
+                showlegend=color_by_cluster
+            )
+            return fig4
+
+        clusters_mtime = cluster_tables_mtime() if color_by_cluster else None
+        with stage("figure: regional comparison"):
+            fig4 = cached_figure(("regional comparison", query, clusters_mtime), build_regional_figure)
+
+        render_chart(fig4, "regional comparison")
+    else:
+        st.info("Select multiple regions to see regional comparison")
+
+    # Seasonal decomposition
+    st.subheader(" Seasonal Decomposition")
+    def build_decomposition_figure():
+        from rainfall.charts import decomposition_figure
+        with stage("load decomposition"):
+            decomposition = load_decomposition(data_version)
+        return decomposition_figure(decomposition.components(regions, year_range))
+
+    with stage("figure: decomposition"):
+        fig_decomposition = cached_figure(("decomposition", query), build_decomposition_figure)
+    render_chart(fig_decomposition, "decomposition")
+    st.caption("Average of the selected regions' additive decompositions at dekadal "
+               "resolution: a centred one-year moving-average trend, the mean "
+               "deviation for each of the 36 dekads of the year, and what remains.")
+
+    # Drought / wetness index
+    st.subheader(" Drought & Wetness Index (SPI)")
+    spi_window = st.radio("Accumulation period", [1, 3, 6], index=1, horizontal=True,
+                          format_func=lambda months: f"{months} month{'s' if months > 1 else ''}")
+    with stage("load spi"):
+        spi = load_spi(data_version)
+    with stage("figure: spi"):
+        from rainfall.charts import spi_figure
+        fig_spi = cached_figure(("spi", query, spi_window),
+                                lambda: spi_figure(spi.series(spi_window, regions, year_range), spi_window))
+        spi_latest = spi.latest(spi_window, regions, year_range)
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        render_chart(fig_spi, "spi")
+    with col2:
+        st.markdown("**Latest index by region**")
+        st.dataframe(spi_latest.round({"SPI": 2}), use_container_width=True, hide_index=True,
+                     column_config={"Date": st.column_config.DateColumn(format="YYYY-MM-DD")})
+    st.caption("Rainfall summed over the trailing period, compared with the same time of year in "
+               "other years through a gamma distribution fitted per region and dekad, and "
+               "expressed in standard deviations. Below -1 is a moderate drought, below -2 an "
+               "extreme one. The chart averages the selected regions' indices.")
+
+    # Extreme events
+    st.subheader(" Extreme Events")
+    EXTREME_MEASURES = {"Rainfall (mm)": "rfh", "Anomaly (% of normal)": "rfq"}
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        extreme_label = st.selectbox("Measure", list(EXTREME_MEASURES), index=1)
+        extreme_col = EXTREME_MEASURES[extreme_label]
+    with col2:
+        wettest = st.radio("Show", ["Wettest", "Driest"], horizontal=True) == "Wettest"
+    with col3:
+        n_events = st.slider("Number of dekads", 5, 50, 10)
+    with col4:
+        threshold = st.number_input(f"Alert threshold ({'%' if extreme_col == 'rfq' else 'mm'})",
+                                    min_value=0.0, value=200.0 if extreme_col == "rfq" else 100.0, step=10.0)
+
+    with stage("extreme events"):
+        extremes = load_extreme_index(data_version)
+        events = extremes.top_k(extreme_col, regions, year_range, n_events, largest=wettest)
+        exceedances = extremes.exceedance_counts(extreme_col, threshold, regions, year_range)
+
+    event_names = {"Region": "Region", "Date": "Dekad", "rfh": "Rainfall (mm)", "rfh_avg": "Average (mm)",
+                   "rfq": "% of Normal", "r1q": "1-Month % of Normal", "r3q": "3-Month % of Normal"}
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.dataframe(events.round({col: 1 for col in event_names if col not in ("Region", "Date")})
+                     .rename(columns=event_names), use_container_width=True, hide_index=True,
+                     column_config={"Dekad": st.column_config.DateColumn(format="YYYY-MM-DD")})
+    with col2:
+        st.metric(f"Dekads above {threshold:g}{'%' if extreme_col == 'rfq' else ' mm'}",
+                  f"{int(exceedances['Count'].sum()):,}")
+        st.dataframe(exceedances[exceedances["Count"] > 0], use_container_width=True, hide_index=True)
+
+    # Drill-down: the event's region over its whole year
+    if len(events):
+        event_choice = st.selectbox(
+            "Inspect event", range(len(events)),
+            format_func=lambda i: f"{events['Region'].iloc[i]} · {events['Date'].iloc[i]:%d %b %Y} · "
+                                  f"{events[extreme_col].iloc[i]:.1f}{'%' if extreme_col == 'rfq' else ' mm'}"
+        )
+        event = events.iloc[event_choice]
+        with stage("figure: extreme event"):
+            from rainfall.charts import event_figure
+            fig_event = cached_figure(
+                ("extreme event", event["Region"], str(event["Date"].date())),
+                lambda: event_figure(extremes.cell_rows(event["Region"], event["Date"].year), event)
+            )
+        render_chart(fig_event, "extreme event")
+
+    # Return periods
+    st.subheader(" Return Periods")
+    distribution = st.radio("Distribution", ["Gumbel", "GEV"], horizontal=True,
+                            help="GEV adds a shape parameter, which a few years of maxima pin down poorly")
+    with stage("return periods"):
+        from rainfall.return_periods import RETURN_PERIODS
+        return_periods = load_return_periods(data_version)
+        return_levels = return_periods.levels(regions, RETURN_PERIODS, distribution.lower())
+        return_levels.columns = [f"{t}-year (mm)" for t in return_levels.columns]
+        return_levels.insert(0, "Years", return_periods.n_years(return_levels.index))
+    return_shown = sorted(regions)[:MAX_RETURN_REGIONS]
+    with stage("figure: return levels"):
+        from rainfall.charts import return_level_figure
+        fig_return = cached_figure(
+            ("return levels", tuple(return_shown), distribution),
+            lambda: return_level_figure(return_periods.curves(return_shown, distribution.lower()),
+                                        return_periods.observed(return_shown), distribution)
+        )
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        if len(regions) > MAX_RETURN_REGIONS:
+            st.caption(f"Showing the first {MAX_RETURN_REGIONS} of {len(regions)} selected regions")
+        render_chart(fig_return, "return levels")
+    with col2:
+        st.dataframe(return_levels.round(1).reset_index(), use_container_width=True, hide_index=True)
+    st.caption(f"Dekadal rainfall expected to be exceeded on average once every T years, from a "
+               f"{distribution} distribution fitted to each region's largest dekad of every complete "
+               f"year ({return_periods.years[0]}–{return_periods.years[-1]} data, independent of the "
+               f"year filter). Dots are the observed annual maxima. With a few years of record, "
+               f"long return periods are rough extrapolations.")
+
+    # Similar regions
+    st.subheader(" Similar Regions")
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        similar_to = st.selectbox(
+            "Find regions with a rainfall pattern like",
+            regions,
+            help="Nearest regions by cosine similarity of standardised monthly rainfall profiles"
+        )
+    with col2:
+        n_similar = st.slider("Number of similar regions", 1, 10, 5)
+
+    with stage("similarity search"):
+        similarity_index = load_similarity_index(data_version, engine)
+        similar = similarity_index.similar(similar_to, n_similar)
+    with stage("figure: similar regions"):
+        from rainfall.charts import similar_profiles_figure
+        fig_similar = cached_figure(
+            ("similar regions", similar_to, tuple(similar["Region"])),
+            lambda: similar_profiles_figure(similarity_index.profiles, similar_to, list(similar["Region"]))
+        )
+
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        st.dataframe(similar.round({"Similarity": 3}), use_container_width=True, hide_index=True)
+    with col2:
+        render_chart(fig_similar, "similar regions")
+
+    # Cluster summary
+    st.subheader(" Cluster Analysis")
+    with st.expander(" View Cluster Summary", expanded=False):
+        try:
+            with stage("load clusters"):
+                cluster_df = load_cluster_summary()
+        
+            # Add some styling and information
+            st.markdown("###  Rainfall Pattern Clusters")
+            st.markdown("*This analysis groups regions with similar rainfall patterns using machine learning clustering.*")
+        
+            # Check what columns are available
+            st.write("**Available columns:**", list(cluster_df.columns))
+        
+            # Display metrics in columns - make it flexible based on available columns
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric(" Total Clusters", len(cluster_df))
+        
+            with col2:
+                # Try different possible column names for average rainfall
+                avg_rainfall_col = None
+                for col in ['avg_rainfall', 'mean_rainfall', 'average_rainfall', 'rfh_mean', 'mean']:
+                    if col in cluster_df.columns:
+                        avg_rainfall_col = col
+                        break
             
-            if avg_rainfall_col:
-                st.metric(" Avg Rainfall (mm)", f"{cluster_df[avg_rainfall_col].mean():.1f}")
-            else:
-                st.metric(" Avg Rainfall", "N/A")
-        
-        with col3:
-            # Try different possible column names for count
-            count_col = None
-            for col in ['count', 'size', 'n_regions', 'regions']:
-                if col in cluster_df.columns:
-                    count_col = col
-                    break
+                if avg_rainfall_col:
+                    st.metric(" Avg Rainfall (mm)", f"{cluster_df[avg_rainfall_col].mean():.1f}")
+                else:
+                    st.metric(" Avg Rainfall", "N/A")
+        
+            with col3:
+                # Try different possible column names for count
+                count_col = None
+                for col in ['count', 'size', 'n_regions', 'regions']:
+                    if col in cluster_df.columns:
+                        count_col = col
+                        break
             
-            if count_col:
-                st.metric("Regions Analyzed", int(cluster_df[count_col].sum()))
-            else:
-                st.metric(" Total Rows", len(cluster_df))
+                if count_col:
+                    st.metric("Regions Analyzed", int(cluster_df[count_col].sum()))
+                else:
+                    st.metric(" Total Rows", len(cluster_df))
         
-        st.markdown("---")
+            st.markdown("---")
         
-        # Style the dataframe
-        st.markdown("###  Detailed Cluster Information")
+            # Style the dataframe
+            st.markdown("###  Detailed Cluster Information")
         
-        # Format the dataframe for better display
-        display_df = cluster_df.copy()
+            # Format the dataframe for better display
+            display_df = cluster_df.copy()
         
-        # Round numeric columns
-        for col in display_df.columns:
-            if display_df[col].dtype in ['float64', 'float32']:
-                display_df[col] = display_df[col].round(2)
+            # Round numeric columns
+            for col in display_df.columns:
+                if display_df[col].dtype in ['float64', 'float32']:
+                    display_df[col] = display_df[col].round(2)
         
-        # Display with basic styling (remove column_config that might cause issues)
-        st.dataframe(display_df, use_container_width=True)
+            # Display with basic styling (remove column_config that might cause issues)
+            st.dataframe(display_df, use_container_width=True)
         
-        # Add visualization if possible
-        if len(cluster_df) > 1:
-            st.markdown("###  Cluster Visualization")
-              # Find a suitable column for plotting
-            plot_col = None
-            numeric_cols = cluster_df.select_dtypes(include=['float64', 'int64', 'float32', 'int32']).columns
+            # Add visualization if possible
+            if len(cluster_df) > 1:
+                st.markdown("###  Cluster Visualization")
+                  # Find a suitable column for plotting
+                plot_col = None
+                numeric_cols = cluster_df.select_dtypes(include=['float64', 'int64', 'float32', 'int32']).columns
             
-            # First try specific rainfall column names
-            for col in ['avg_rainfall', 'mean_rainfall', 'average_rainfall', 'rfh_mean', 'mean']:
-                if col in cluster_df.columns:
-                    plot_col = col
-                    break
+                # First try specific rainfall column names
+                for col in ['avg_rainfall', 'mean_rainfall', 'average_rainfall', 'rfh_mean', 'mean']:
+                    if col in cluster_df.columns:
+                        plot_col = col
+                        break
             
-            # If no specific column found, use the first numeric column
-            if plot_col is None and len(numeric_cols) > 0:
-                plot_col = numeric_cols[0]
+                # If no specific column found, use the first numeric column
+                if plot_col is None and len(numeric_cols) > 0:
+                    plot_col = numeric_cols[0]
             
-            if plot_col:
-                # Create interactive Plotly bar chart
-                fig_cluster = px.bar(
-                    x=cluster_df.index,
-                    y=cluster_df[plot_col],
-                    title=f'{plot_col.replace("_", " ").title()} by Cluster',
-                    labels={"x": "Cluster", "y": f'{plot_col.replace("_", " ").title()}'},
-                    template="plotly_white",
-                    color=cluster_df[plot_col],
-                    color_continuous_scale="viridis"
-                )
+                if plot_col:
+                    # Create interactive Plotly bar chart
+                    fig_cluster = px.bar(
+                        x=cluster_df.index,
+                        y=cluster_df[plot_col],
+                        title=f'{plot_col.replace("_", " ").title()} by Cluster',
+                        labels={"x": "Cluster", "y": f'{plot_col.replace("_", " ").title()}'},
+                        template="plotly_white",
+                        color=cluster_df[plot_col],
+                        color_continuous_scale="viridis"
+                    )
                 
-                fig_cluster.update_traces(
-                    marker_line_color="#2E86AB",
-                    marker_line_width=2,
-                    texttemplate='%{y:.1f}',
-                    textposition='outside'
-                )
+                    fig_cluster.update_traces(
+                        marker_line_color="#2E86AB",
+                        marker_line_width=2,
+                        texttemplate='%{y:.1f}',
+                        textposition='outside'
+                    )
                 
-                fig_cluster.update_layout(
-                    title_font_size=16,
-                    title_x=0.5,
-                    xaxis_title_font_size=14,
-                    yaxis_title_font_size=14,
-                    plot_bgcolor="rgba(0,0,0,0)",
-                    paper_bgcolor="rgba(0,0,0,0)",
-                    showlegend=False
-                )
+                    fig_cluster.update_layout(
+                        title_font_size=16,
+                        title_x=0.5,
+                        xaxis_title_font_size=14,
+                        yaxis_title_font_size=14,
+                        plot_bgcolor="rgba(0,0,0,0)",
+                        paper_bgcolor="rgba(0,0,0,0)",
+                        showlegend=False
+                    )
                 
-                st.plotly_chart(fig_cluster, use_container_width=True)
-            else:
-                st.info(" No numeric columns available for visualization. The cluster data appears to contain only categorical information.")
-        
-    except FileNotFoundError:
-        st.info("🔬 **Cluster analysis not available yet**")
-        st.markdown("""
-        **To generate cluster analysis:**
-        1.  Open the EDA notebook (`notebooks/Bhutan_Rainfall_EDA.ipynb`)
-        2.  Run the clustering analysis section
-        3.  This will generate `outputs/cluster_summary.csv`
-        4.  Refresh this dashboard to see the results
-        """)
+                    render_chart(fig_cluster, "clusters")
+                else:
+                    st.info(" No numeric columns available for visualization. The cluster data appears to contain only categorical information.")
+
+            # Centroid profiles and the k scan from the clusters stage
+            if os.path.exists(CLUSTER_MODEL):
+                st.markdown("###  Cluster Profiles")
+                with stage("figure: cluster profiles"):
+                    from rainfall.charts import cluster_profile_figure
+                    profiles, k_scores = get_cluster_model(CLUSTER_MODEL, os.stat(CLUSTER_MODEL).st_mtime_ns)
+                    fig_profiles = cluster_profile_figure(profiles)
+                render_chart(fig_profiles, "cluster profiles")
+                if k_scores is not None:
+                    st.markdown(f"**Choice of k** (higher silhouette = better separated clusters). "
+                                f"Advisory only: the clusters above are fitted with k = {len(profiles)}.")
+                    st.dataframe(k_scores.round(3), use_container_width=True, hide_index=True)
+        
+        except FileNotFoundError:
+            st.info("🔬 **Cluster analysis not available yet**")
+            st.markdown("""
+            **To generate cluster analysis:**
+            1.  Open the EDA notebook (`notebooks/Bhutan_Rainfall_EDA.ipynb`)
+            2.  Run the clustering analysis section
+            3.  This will generate `outputs/cluster_summary.csv`
+            4.  Refresh this dashboard to see the results
+            """)
         
-        # Show a sample of what it would look like
-        st.markdown("**Preview of cluster analysis format:**")
-        sample_data = {
-            'Cluster': ['High Rainfall', 'Moderate Rainfall', 'Low Rainfall'],
-            'Avg Rainfall (mm)': [150.5, 89.2, 45.8],
-            'Regions Count': [12, 18, 8],
-            'Pattern': ['Monsoon-heavy', 'Seasonal', 'Arid']
-        }
-        sample_df = pd.DataFrame(sample_data)
-        st.dataframe(sample_df, use_container_width=True)
+            # Show a sample of what it would look like
+            st.markdown("**Preview of cluster analysis format:**")
+            sample_data = {
+                'Cluster': ['High Rainfall', 'Moderate Rainfall', 'Low Rainfall'],
+                'Avg Rainfall (mm)': [150.5, 89.2, 45.8],
+                'Regions Count': [12, 18, 8],
+                'Pattern': ['Monsoon-heavy', 'Seasonal', 'Arid']
+            }
+            sample_df = pd.DataFrame(sample_data)
+            st.dataframe(sample_df, use_container_width=True)
     
-    except Exception as e:
-        st.error(f" **Error loading cluster data:** {str(e)}")
-        st.markdown("Please check if the cluster analysis has been run successfully.")
-        st.markdown("**Debug info:**")
-        st.code(f"Error details: {type(e).__name__}: {str(e)}")
-
-# Footer
-st.markdown("---")
-st.markdown("Built by **Sangam Paudel** · Project: Bhutan Rainfall Explorer")
+        except Exception as e:
+            st.error(f" **Error loading cluster data:** {str(e)}")
+            st.markdown("Please check if the cluster analysis has been run successfully.")
+            st.markdown("**Debug info:**")
+            st.code(f"Error details: {type(e).__name__}: {str(e)}")
+
+    # Footer
+    st.markdown("---")
+    st.markdown("Built by **Sangam Paudel** · Project: Bhutan Rainfall Explorer")
+
+    show_cache_stats()
+    show_profile("dashboard")
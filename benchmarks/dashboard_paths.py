@@ -0,0 +1,271 @@
+"""Benchmark the dashboard's data paths on 1x, 10x and 100x synthetic data.
+
+Times the functions app.py's cached wrappers call, outside Streamlit:
+
+* ``load_data`` - cold (CSV parse + Parquet store build) and warm (store read),
+  plus ``dataset_version``, the aggregate cube build/load and the seasonal
+  decomposition and the region similarity index;
+* the dekad/month/season/year rollup build and a trend query per level, and
+  the SPI fit (all regions, 1/3/6-month windows) and its queries, and the
+  extreme-event index build with top-k / threshold-count queries, and the
+  GEV/Gumbel return-period fit with its return-level queries;
+* the region/year filter and each chart aggregation (regional stats,
+  histogram, box stats) for a few, half and all regions,
+  from the cube and - when duckdb is installed - as SQL over the store,
+  and the cached result from memory and from the shared disk cache;
+* forecast loading (the forecast panel bundle and a regional forecast chart)
+  and cluster loading.
+
+Datasets are generated once under ``.cache/benchmarks/`` (see synthetic.py).
+Results go to JSON; ``--compare`` reports the median-time ratio against an
+earlier run and exits non-zero when a path slowed down by more than
+``--threshold``.
+
+Usage::
+
+    python benchmarks/dashboard_paths.py                       # all scales
+    python benchmarks/dashboard_paths.py --scales 1 10 --repeats 3
+    python benchmarks/dashboard_paths.py --compare benchmarks/results/abc1234.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from rainfall.charts import forecast_bundle, region_forecast_figure  # noqa: E402
+from rainfall.clustering import cluster_regions, load_cluster_summary, monthly_profiles  # noqa: E402
+from rainfall.cube import RainfallCube, build_cube  # noqa: E402
+from rainfall.decomposition import build_decomposition  # noqa: E402
+from rainfall.diskcache import DiskCache  # noqa: E402
+from rainfall.extremes import build_extreme_index  # noqa: E402
+from rainfall.forecast import load_region_forecasts  # noqa: E402
+from rainfall.forecast_engine import forecast_regions, write_region_forecasts  # noqa: E402
+from rainfall.paths import FORECAST_CSV, ROOT  # noqa: E402
+from rainfall.queries import LRUCache, compute_dashboard_frames, dashboard_frames  # noqa: E402
+from rainfall.return_periods import build_return_periods  # noqa: E402
+from rainfall.rollup import LEVELS, build_rollup  # noqa: E402
+from rainfall.similarity import build_similarity_index  # noqa: E402
+from rainfall.spi import build_spi  # noqa: E402
+from rainfall.store import dataset_version, load_rainfall, read_manifest  # noqa: E402
+from synthetic import SCALES, ensure_dataset  # noqa: E402
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+HAS_DUCKDB = importlib.util.find_spec("duckdb") is not None
+
+
+def timed(fn, repeats):
+    """Run ``fn`` ``repeats`` times; return ``(last result, timing dict)``."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return result, {
+        "median_ms": statistics.median(times),
+        "min_ms": min(times),
+        "repeats": repeats,
+    }
+
+
+def selections(cube):
+    """Region/year selections covering small, medium and full queries."""
+    regions = [str(r) for r in cube.regions]
+    years = (int(cube.years.min()), int(cube.years.max()))
+    recent = (max(years[0], years[1] - 2), years[1])
+    return {
+        "few": (regions[:3], years),
+        "half": (regions[: len(regions) // 2], recent),
+        "all": (regions, years),
+    }
+
+
+def bench_scale(scale, repeats, log=print):
+    csv_path = ensure_dataset(scale, log=log)
+    work_dir = os.path.dirname(csv_path)
+    store_dir = os.path.join(work_dir, "store")
+    timings = {}
+
+    def record(name, fn, n=repeats):
+        result, timings[name] = timed(fn, n)
+        return result
+
+    shutil.rmtree(store_dir, ignore_errors=True)
+    df = record("load_data.cold", lambda: load_rainfall(csv_path, store_dir), n=1)
+    df = record("load_data.warm", lambda: load_rainfall(csv_path, store_dir))
+    version = record("dataset_version", lambda: dataset_version(csv_path, store_dir))
+    cube = record("cube.build", lambda: build_cube(df))
+    cube_file = os.path.join(store_dir, "cube.npz")
+    cube.save(cube_file, version)
+    cube = record("cube.load", lambda: RainfallCube.load(cube_file)[0])
+
+    for label, (regions, year_range) in selections(cube).items():
+        prefix = f"query.{label}"
+        record(f"{prefix}.filter", lambda: cube.row_count(regions, year_range))
+        record(f"{prefix}.regional", lambda: cube.region_stats(regions, year_range))
+        record(f"{prefix}.histogram", lambda: cube.histogram(regions, year_range))
+        record(f"{prefix}.box_by_month", lambda: cube.month_distribution(regions, year_range))
+        record(f"{prefix}.box", lambda: cube.distribution(regions, year_range))
+        record(f"{prefix}.dashboard_frames", lambda: compute_dashboard_frames(cube, regions, year_range))
+        cache = LRUCache()
+        dashboard_frames(cache, cube, regions, year_range, version)
+        record(f"{prefix}.dashboard_frames.cached",
+               lambda: dashboard_frames(cache, cube, regions, year_range, version))
+        # Another worker's (or a restarted worker's) lookup: from the SQLite file
+        disk_cache = DiskCache(os.path.join(work_dir, "results.sqlite"), memory_entries=0,
+                               namespace="cube")
+        dashboard_frames(disk_cache, cube, regions, year_range, version)
+        record(f"{prefix}.dashboard_frames.disk",
+               lambda: dashboard_frames(disk_cache, cube, regions, year_range, version))
+
+    if HAS_DUCKDB:
+        from rainfall.sql import DuckDBQueries
+
+        engine = record("sql.open", lambda: DuckDBQueries(store_dir, read_manifest(store_dir)))
+        for label, (regions, year_range) in selections(cube).items():
+            prefix = f"sql.{label}"
+            record(f"{prefix}.filter", lambda: engine.row_count(regions, year_range))
+            record(f"{prefix}.regional", lambda: engine.region_stats(regions, year_range))
+            record(f"{prefix}.histogram", lambda: engine.histogram(regions, year_range))
+            record(f"{prefix}.box_by_month", lambda: engine.month_distribution(regions, year_range))
+            record(f"{prefix}.box", lambda: engine.distribution(regions, year_range))
+            record(f"{prefix}.dashboard_frames",
+                   lambda: compute_dashboard_frames(engine, regions, year_range))
+
+    decomposition = record("decomposition.build", lambda: build_decomposition(df))
+    shown = [str(r) for r in cube.regions[:3]]
+    record("decomposition.components",
+           lambda: decomposition.components(shown, (int(cube.years.min()), int(cube.years.max()))))
+
+    years = (int(cube.years.min()), int(cube.years.max()))
+    extremes = record("extremes.build", lambda: build_extreme_index(df))
+    for label, (regions, year_range) in selections(cube).items():
+        record(f"extremes.{label}.top_k",
+               lambda: extremes.top_k("rfq", regions, year_range, 10))
+        record(f"extremes.{label}.exceedance_counts",
+               lambda: extremes.exceedance_counts("rfq", 200.0, regions, year_range))
+
+    spi = record("spi.build", lambda: build_spi(df))
+    record("spi.series", lambda: spi.series(3, shown, years))
+    record("spi.latest", lambda: spi.latest(3, shown, years))
+
+    return_periods = record("return_periods.build", lambda: build_return_periods(df))
+    record("return_periods.levels", lambda: return_periods.levels(shown))
+    record("return_periods.curves", lambda: return_periods.curves(shown))
+
+    rollup = record("rollup.build", lambda: build_rollup(df))
+    for level in LEVELS:
+        record(f"rollup.{level}", lambda: rollup.series(level, shown))
+        record(f"rollup.{level}.national", lambda: rollup.series(level))
+
+    index = record("similarity.build", lambda: build_similarity_index(cube.month_profiles()))
+    record("similarity.query", lambda: index.similar(shown[0]))
+
+    record("forecast.bundle", lambda: forecast_bundle(FORECAST_CSV))
+    forecasts = record("forecast.regions_fit_fourier",
+                       lambda: forecast_regions(df, backend="fourier", log=lambda *_: None))
+    forecasts_csv = os.path.join(work_dir, "region_forecasts.csv")
+    write_region_forecasts(forecasts, forecasts_csv)
+    region_forecasts = record("forecast.regions_load", lambda: load_region_forecasts(forecasts_csv))
+    record("forecast.regions_figure", lambda: region_forecast_figure(region_forecasts, shown))
+
+    clusters = record("clusters.fit", lambda: cluster_regions(monthly_profiles(df)))
+    summary_csv = os.path.join(work_dir, "cluster_summary.csv")
+    clusters.to_csv(summary_csv)
+    record("clusters.load", lambda: load_cluster_summary(summary_csv))
+
+    return {
+        "rows": len(df),
+        "regions": len(cube.regions),
+        "years": len(cube.years),
+        "timings": timings,
+    }
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print median-time ratios against ``baseline``; return the regressed paths."""
+    regressions = []
+    print(f"\n{'path':<44}{'before':>10}{'after':>10}{'ratio':>8}")
+    for scale, current in results["scales"].items():
+        previous = baseline.get("scales", {}).get(scale)
+        if not previous:
+            continue
+        for name, timing in current["timings"].items():
+            before = previous["timings"].get(name)
+            if not before:
+                continue
+            ratio = timing["median_ms"] / max(before["median_ms"], 1e-6)
+            flag = " ⚠️" if ratio > threshold else ""
+            print(f"{scale + 'x ' + name:<44}{before['median_ms']:>10.2f}"
+                  f"{timing['median_ms']:>10.2f}{ratio:>8.2f}{flag}")
+            if ratio > threshold:
+                regressions.append(f"{scale}x {name}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard data paths.")
+    parser.add_argument("--scales", nargs="+", type=int, default=sorted(SCALES),
+                        choices=sorted(SCALES), help="dataset multiples to run")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per warm path")
+    parser.add_argument("--output", help="results JSON (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="median-time ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    commit = _git_commit()
+    results = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "cpus": os.cpu_count(),
+        "scales": {},
+    }
+    for scale in args.scales:
+        print(f"\n== {scale}x ==")
+        result = bench_scale(scale, args.repeats)
+        results["scales"][str(scale)] = result
+        print(f"{result['rows']:,} rows, {result['regions']} regions, {result['years']} years")
+        for name, timing in result["timings"].items():
+            print(f"  {name:<40}{timing['median_ms']:>10.2f} ms")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'results'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as fh:
+        json.dump(results, fh, indent=2)
+    print(f"\n✅ results saved to '{output}'")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(results, json.load(fh), args.threshold)
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} path(s) slower than {args.threshold}x the baseline")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Fit time and holdout accuracy: Prophet vs the vectorised Fourier backend.
+
+The last ``--holdout`` months of every region's monthly series are held out;
+both backends are fitted on the rest and scored on MAE, RMSE and the share of
+held-out months inside the 80% interval. Prophet is fitted serially on a
+sample of regions (it is the slow one); the Fourier backend fits all regions
+in one batch and is scored on the same sample.
+
+Usage::
+
+    python benchmarks/forecast_backends.py
+    python benchmarks/forecast_backends.py --prophet-regions 40 --output bench.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rainfall import fourier  # noqa: E402
+from rainfall.forecast_engine import PROPHET_PARAMS, fit_prophet, monthly_series  # noqa: E402
+from rainfall.store import load_rainfall  # noqa: E402
+
+
+def split(series, holdout):
+    train = {k: s.iloc[:-holdout] for k, s in series.items() if len(s) > holdout + 12}
+    test = {k: series[k].iloc[-holdout:] for k in train}
+    return train, test
+
+
+def score(forecasts, test):
+    errors, covered = [], []
+    for key, actual in test.items():
+        fc = forecasts[key].set_index("ds").reindex(actual["ds"])
+        y = actual["y"].to_numpy()
+        errors.append(fc["yhat"].to_numpy() - y)
+        covered.append((y >= fc["yhat_lower"].to_numpy()) & (y <= fc["yhat_upper"].to_numpy()))
+    errors, covered = np.concatenate(errors), np.concatenate(covered)
+    return {
+        "mae": float(np.abs(errors).mean()),
+        "rmse": float(np.sqrt((errors ** 2).mean())),
+        "coverage_80": float(covered.mean()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--holdout", type=int, default=12, help="months held out per region")
+    parser.add_argument("--prophet-regions", type=int, default=20,
+                        help="regions fitted with Prophet (0 to skip Prophet)")
+    parser.add_argument("--order", type=int, default=fourier.DEFAULT_ORDER,
+                        help="Fourier harmonics")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    train, test = split(monthly_series(load_rainfall()), args.holdout)
+    sample = sorted(train)[:args.prophet_regions]
+    results = {"regions": len(train), "holdout_months": args.holdout, "backends": {}}
+
+    start = time.perf_counter()
+    fourier_fc = fourier.forecast_series(train, periods=args.holdout, order=args.order)
+    elapsed = time.perf_counter() - start
+    results["backends"]["fourier"] = {
+        "regions_fitted": len(train),
+        "fit_seconds": elapsed,
+        "seconds_per_region": elapsed / len(train),
+        **score(fourier_fc, test),
+    }
+    if sample:
+        results["backends"]["fourier"]["sample"] = score(fourier_fc, {k: test[k] for k in sample})
+
+        prophet_fc = {}
+        start = time.perf_counter()
+        for key in sample:
+            prophet_fc[key] = fit_prophet(train[key], args.holdout, PROPHET_PARAMS)[0]
+        elapsed = time.perf_counter() - start
+        results["backends"]["prophet"] = {
+            "regions_fitted": len(sample),
+            "fit_seconds": elapsed,
+            "seconds_per_region": elapsed / len(sample),
+            "sample": score(prophet_fc, {k: test[k] for k in sample}),
+        }
+
+    print(f"{'backend':<10}{'regions':>8}{'s/region':>12}{'MAE':>9}{'RMSE':>9}{'cov80':>8}")
+    for name, r in results["backends"].items():
+        s = r.get("sample", r)
+        print(f"{name:<10}{r['regions_fitted']:>8}{r['seconds_per_region']:>12.5f}"
+              f"{s['mae']:>9.2f}{s['rmse']:>9.2f}{s['coverage_80']:>8.2f}")
+    if "prophet" in results["backends"]:
+        speedup = (results["backends"]["prophet"]["seconds_per_region"]
+                   / results["backends"]["fourier"]["seconds_per_region"])
+        print(f"(accuracy on the {len(sample)}-region sample; Fourier is {speedup:,.0f}× faster per region)")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
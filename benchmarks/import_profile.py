@@ -0,0 +1,124 @@
+"""Import-time profile of the dashboard's cold start (``python -X importtime``).
+
+Streamlit runs app.py in a fresh interpreter for each new worker, so every
+module imported before the first page renders is paid on every cold start.
+This script collects the import statements of app.py, replays them in a
+clean interpreter under ``-X importtime`` and reports the slowest top-level
+packages for two paths:
+
+* ``landing`` - imports at module level, before the landing page's
+  ``st.stop()`` (what a new visitor's first render pays);
+* ``full`` - every import in app.py, including the lazy ones done when the
+  dashboard, charts and forecast panel are first shown.
+
+Usage::
+
+    python benchmarks/import_profile.py
+    python benchmarks/import_profile.py --top 25 --output imports.json
+    python benchmarks/import_profile.py --modules seaborn matplotlib.pyplot
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+
+
+def _is_stop(node):
+    """True for a top-level ``if``/``else`` block that ends in ``st.stop()``."""
+    if not isinstance(node, ast.If):
+        return False
+    for stmt in ast.walk(node):
+        if (isinstance(stmt, ast.Call) and isinstance(stmt.func, ast.Attribute)
+                and stmt.func.attr == "stop"):
+            return True
+    return False
+
+
+def app_imports(path=APP):
+    """``(landing, full)`` lists of import statements found in app.py."""
+    with open(path) as fh:
+        tree = ast.parse(fh.read())
+    landing, full = [], []
+    reached_stop = False
+    for node in tree.body:
+        if not reached_stop and isinstance(node, (ast.Import, ast.ImportFrom)):
+            landing.append(ast.unparse(node))
+        if _is_stop(node):
+            reached_stop = True
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            full.append(ast.unparse(node))
+    return landing, list(dict.fromkeys(full))
+
+
+def profile(statements):
+    """Run ``statements`` under ``-X importtime``; return ``{module: (self_us, cumulative_us)}``."""
+    env = {**os.environ, "PYTHONPATH": ROOT + os.pathsep + os.environ.get("PYTHONPATH", "")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "\n".join(statements)],
+        capture_output=True, text=True, cwd=ROOT, env=env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if name not in times:
+            times[name] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def summarise(times, top):
+    """Total import time and the ``top`` slowest top-level packages."""
+    packages = {name: cum for name, (_, cum) in times.items() if "." not in name}
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "total_ms": sum(self_us for self_us, _ in times.values()) / 1000,
+        "modules": len(times),
+        "top": [{"package": name, "cumulative_ms": cum / 1000} for name, cum in ranked],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile app.py import time.")
+    parser.add_argument("--top", type=int, default=15, help="packages to list per path")
+    parser.add_argument("--modules", nargs="+", metavar="MODULE",
+                        help="also report the standalone import cost of these modules")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    landing, full = app_imports()
+    results = {}
+    for label, statements in [("landing", landing), ("full", full)]:
+        results[label] = summarise(profile(statements), args.top)
+        print(f"\n{label}: {results[label]['total_ms']:,.0f} ms, "
+              f"{results[label]['modules']} modules")
+        for row in results[label]["top"]:
+            print(f"  {row['cumulative_ms']:>9,.1f} ms  {row['package']}")
+
+    if args.modules:
+        baseline = profile(landing)
+        results["modules"] = {}
+        print("\nextra cost on top of the landing path:")
+        for module in args.modules:
+            times = profile(landing + [f"import {module}"])
+            extra = sum(s for name, (s, _) in times.items() if name not in baseline) / 1000
+            results["modules"][module] = extra
+            print(f"  {extra:>9,.1f} ms  {module}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
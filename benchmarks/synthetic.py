@@ -0,0 +1,66 @@
+"""Synthetic cleaned datasets at multiples of the real one.
+
+The real ``cleaned_btn_rainfall.csv`` (198 regions x 5 years of dekads) is
+tiled: each extra region copy gets new codes and ids, each extra year block
+is shifted back by five years, and every tile is scaled by its own
+log-normal factor so the copies are not identical. The output has exactly
+the cleaned CSV's columns, so it goes through the same store, cube and
+chart code as the real file.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from rainfall.paths import CLEANED_CSV, ROOT
+from rainfall.store import INDICATOR_COLS
+
+CACHE_DIR = ROOT / ".cache" / "benchmarks"
+
+# scale -> (region multiplier, year multiplier)
+SCALES = {1: (1, 1), 10: (5, 2), 100: (10, 10)}
+
+BASE_YEARS = 5
+SEED = 2021
+
+
+def scaled_frame(base, region_copies, year_blocks, seed=SEED):
+    """Tile ``base`` (a cleaned frame) ``region_copies`` x ``year_blocks`` times."""
+    rng = np.random.default_rng(seed)
+    date = pd.to_datetime(base["date"])
+    tiles = []
+    for r in range(region_copies):
+        for y in range(year_blocks):
+            tile = base.copy()
+            if r:
+                tile["ADM2_PCODE"] = tile["ADM2_PCODE"] + f"-{r:02d}"
+                tile["adm2_id"] = tile["adm2_id"] + 100_000 * r
+            if y:
+                shifted = date - pd.DateOffset(years=BASE_YEARS * y)
+                tile["date"] = shifted.dt.strftime("%Y-%m-%d")
+                tile["year"] = shifted.dt.year
+            if r or y:
+                factor = rng.lognormal(0.0, 0.15)
+                for col in INDICATOR_COLS[1:]:
+                    tile[col] = (tile[col] * factor).round(4)
+            tiles.append(tile)
+    return pd.concat(tiles, ignore_index=True).sort_values(["date", "ADM2_PCODE"], kind="stable")
+
+
+def dataset_path(scale, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"scale-{scale}", "cleaned.csv")
+
+
+def ensure_dataset(scale, source=CLEANED_CSV, cache_dir=CACHE_DIR, log=print):
+    """Path of the ``scale``x cleaned CSV, generating it on first use."""
+    path = dataset_path(scale, cache_dir)
+    if os.path.exists(path):
+        return path
+    region_copies, year_blocks = SCALES[scale]
+    base = pd.read_csv(source, dtype={"date": str})
+    frame = scaled_frame(base, region_copies, year_blocks)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    frame.to_csv(path, index=False)
+    log(f"🧪 generated {scale}x dataset: {len(frame):,} rows, "
+        f"{frame['ADM2_PCODE'].nunique()} regions, {frame['year'].nunique()} years")
+    return path
@@ -0,0 +1 @@
+"""Data and analysis helpers behind the Bhutan Rainfall Explorer dashboard."""
@@ -0,0 +1,164 @@
+"""Landing-page background, served as static, cacheable WebP variants.
+
+Inlining ``bhutan_image.jpg`` as a base64 data URI made every new session
+download ~1.33x the JPEG inside uncacheable HTML. Instead,
+``python -m rainfall.assets`` resizes it once into a few WebP widths under
+``static/``, which Streamlit serves at ``app/static/<file>`` (see
+``server.enableStaticServing`` in ``.streamlit/config.toml``) with
+ETag/Last-Modified validators. The landing-page CSS picks one variant per
+viewport width, and each URL carries a content hash so a regenerated image
+is never served stale.
+
+The dashboard builds the variants itself on first use when they are missing,
+and falls back to inlining the photo when they cannot be built (no Pillow,
+read-only checkout).
+
+Usage::
+
+    python -m rainfall.assets                  # bhutan_image.jpg -> static/bhutan-*.webp
+    python -m rainfall.assets photo.jpg --quality 75 --force
+"""
+import argparse
+import base64
+import functools
+import hashlib
+import io
+import json
+import os
+import sys
+
+from rainfall.fileio import atomic_write_bytes, file_hash
+from rainfall.paths import ROOT
+
+BACKGROUND_SOURCE = ROOT / "bhutan_image.jpg"
+STATIC_DIR = ROOT / "static"
+# URL prefix Streamlit serves STATIC_DIR under
+STATIC_URL = "app/static"
+
+BACKGROUND_STEM = "bhutan"
+BACKGROUND_WIDTHS = (640, 1280, 1920, 2560)
+WEBP_QUALITY = 80
+
+# Default dark overlay drawn over the photo so the page text stays readable
+OVERLAY = "linear-gradient(rgba(0,0,0,0.4), rgba(0,0,0,0.4))"
+
+
+def manifest_path(static_dir=STATIC_DIR):
+    return os.path.join(static_dir, f"{BACKGROUND_STEM}.json")
+
+
+def read_variants(static_dir=STATIC_DIR):
+    """Generated variants as ``{width: url}``; empty when none were generated."""
+    try:
+        with open(manifest_path(static_dir)) as fh:
+            manifest = json.load(fh)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    variants = {}
+    for width, entry in manifest["variants"].items():
+        if os.path.exists(os.path.join(static_dir, entry["file"])):
+            variants[int(width)] = f"{STATIC_URL}/{entry['file']}?v={entry['sha256'][:10]}"
+    return variants
+
+
+@functools.lru_cache(maxsize=4)
+def _inline_uri(path, mtime):
+    with open(path, "rb") as fh:
+        return "data:image/jpeg;base64," + base64.b64encode(fh.read()).decode()
+
+
+def landing_background(source=BACKGROUND_SOURCE, static_dir=STATIC_DIR, log=print):
+    """Background for :func:`background_css`, as ``{width: url}``.
+
+    Generates the variants when none exist yet. If that fails, the source
+    photo is returned inlined as a data URI (one entry); empty when there is
+    no source photo either.
+    """
+    variants = read_variants(static_dir)
+    if variants or not os.path.exists(source):
+        return variants
+    try:
+        generate_variants(source, static_dir, log=log)
+    except (ImportError, OSError) as e:
+        log(f"⚠️  could not generate background variants ({e}); inlining {os.path.basename(source)}")
+    variants = read_variants(static_dir)
+    if variants:
+        return variants
+    return {0: _inline_uri(os.fspath(source), os.path.getmtime(source))}
+
+
+def background_css(variants, overlay=OVERLAY, selector=".stApp"):
+    """CSS choosing the smallest variant that covers the viewport.
+
+    Browsers only fetch the ``background-image`` of the rule that applies,
+    so a phone never downloads the widest file. High-density screens get the
+    next size up at half the viewport width.
+    """
+    widths = sorted(variants)
+    rules = [f"{selector} {{ background-image: {overlay}, url('{variants[widths[0]]}'); }}"]
+    for smaller, width in zip(widths, widths[1:]):
+        rules.append(
+            f"@media (min-width: {smaller + 1}px), "
+            f"(min-resolution: 2dppx) and (min-width: {smaller // 2 + 1}px) {{ "
+            f"{selector} {{ background-image: {overlay}, url('{variants[width]}'); }} }}"
+        )
+    return "\n".join(rules)
+
+
+def generate_variants(source=BACKGROUND_SOURCE, static_dir=STATIC_DIR, widths=BACKGROUND_WIDTHS,
+                      quality=WEBP_QUALITY, force=False, log=print):
+    """Write resized WebP variants of ``source`` and their manifest.
+
+    Skipped when the manifest already records the same source, widths and
+    quality. Widths larger than the source are not upscaled.
+    """
+    from PIL import Image, ImageOps
+
+    source_sha256 = file_hash(source)
+    settings = {"source_sha256": source_sha256, "quality": quality, "widths": list(widths)}
+    try:
+        with open(manifest_path(static_dir)) as fh:
+            previous = json.load(fh)
+    except (FileNotFoundError, json.JSONDecodeError):
+        previous = None
+    if not force and previous and previous.get("settings") == settings:
+        log("✅ background variants are up to date")
+        return previous
+
+    os.makedirs(static_dir, exist_ok=True)
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        targets = [w for w in widths if w <= image.width] or [image.width]
+        variants = {}
+        for width in targets:
+            height = round(image.height * width / image.width)
+            buf = io.BytesIO()
+            image.resize((width, height), Image.Resampling.LANCZOS).save(
+                buf, "WEBP", quality=quality, method=6
+            )
+            name = f"{BACKGROUND_STEM}-{width}.webp"
+            data = buf.getvalue()
+            atomic_write_bytes(os.path.join(static_dir, name), data)
+            variants[str(width)] = {"file": name, "bytes": len(data),
+                                    "sha256": hashlib.sha256(data).hexdigest()}
+            log(f"🖼️  {name}: {len(data) / 1024:,.0f} KB")
+
+    manifest = {"settings": settings, "variants": variants}
+    atomic_write_bytes(manifest_path(static_dir), json.dumps(manifest, indent=2).encode())
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate resized WebP landing-page backgrounds.")
+    parser.add_argument("source", nargs="?", default=str(BACKGROUND_SOURCE), help="source photo")
+    parser.add_argument("--quality", type=int, default=WEBP_QUALITY, help="WebP quality (0-100)")
+    parser.add_argument("--force", action="store_true", help="regenerate even if up to date")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.source):
+        parser.error(f"source image not found: {args.source}")
+    generate_variants(args.source, quality=args.quality, force=args.force)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""Rolling-origin backtesting of the national and per-region forecasts.
+
+For each series (the notebook's national monthly mean plus every region's
+monthly mean) the model is refitted at several cutoffs - every ``step``
+months, ending ``horizon`` months before the last observation - and scored
+on the ``horizon`` months after each cutoff:
+
+* MAE: mean absolute error (mm);
+* MAPE: mean absolute percentage error, over months with at least
+  ``MAPE_MIN_Y`` mm (near-zero dry-season months would dominate it);
+* coverage: share of actual values inside the model's 80% interval.
+
+Every (series, cutoff, model config) fit is cached under a hash of the
+training data and configuration, so reruns and extended data only fit the
+new cutoffs. Prophet fits are spread over a process pool; the Fourier
+backend fits all series of one cutoff in a single batch.
+
+Usage::
+
+    python -m rainfall.backtest                       # Prophet, one worker per CPU
+    python -m rainfall.backtest --backend fourier --cutoffs 8 --step 2
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from rainfall.fileio import atomic_output, atomic_write_bytes
+from rainfall.forecast_engine import (BACKENDS, FORECAST_COLS, PROPHET_PARAMS, cache_key,
+                                      fit_prophet, monthly_series)
+from rainfall.paths import OUTPUTS_DIR, ROOT
+
+BACKTEST_CACHE_DIR = ROOT / ".cache" / "backtests"
+BACKTEST_METRICS_CSV = OUTPUTS_DIR / "backtest_metrics.csv"
+
+NATIONAL = "national"
+HORIZON = 12
+N_CUTOFFS = 6
+STEP = 3
+MIN_TRAIN = 24
+MAPE_MIN_Y = 5.0
+
+
+def national_series(df, value="rfh"):
+    """National monthly mean, as in ``notebooks/forecast.ipynb`` (``ds``, ``y``)."""
+    monthly = df.groupby(pd.Grouper(key="date", freq="MS"))[value].mean().dropna()
+    return pd.DataFrame({"ds": monthly.index, "y": monthly.to_numpy(dtype="float64")})
+
+
+def backtest_series(df, regions=None):
+    """``{key: DataFrame(ds, y)}`` for the national series and each region."""
+    series = {NATIONAL: national_series(df)}
+    for pcode, s in monthly_series(df).items():
+        if regions is None or pcode in set(regions):
+            series[pcode] = s
+    return series
+
+
+def cutoffs(ds, horizon=HORIZON, n_cutoffs=N_CUTOFFS, step=STEP, min_train=MIN_TRAIN):
+    """Last training month of each fold, oldest first."""
+    ds = pd.DatetimeIndex(ds).sort_values()
+    last = len(ds) - 1 - horizon
+    positions = [last - step * i for i in range(n_cutoffs)]
+    return [ds[p] for p in sorted(positions) if p + 1 >= min_train]
+
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def _read_cached(cache_dir, key):
+    try:
+        with open(_cache_path(cache_dir, key)) as fh:
+            return json.load(fh)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _entry(forecast):
+    """A forecast frame as the JSON-ready column dict stored in the cache."""
+    return {"ds": forecast["ds"].dt.strftime("%Y-%m-%d").tolist(),
+            **{col: forecast[col].tolist() for col in FORECAST_COLS[1:]}}
+
+
+def _fit_batch(backend, params, horizon, batch, cache_dir):
+    """Worker entry point: fit ``[(label, key, train), ...]`` and cache each forecast.
+
+    Returns ``{label: entry}`` with the ``horizon`` forecast rows of each fold.
+    """
+    results = {}
+    if backend == "fourier":
+        from rainfall.fourier import forecast_series
+        fitted = forecast_series({i: train for i, (_, _, train) in enumerate(batch)},
+                                 periods=horizon, **params)
+        for i, (label, _, _) in enumerate(batch):
+            results[label] = _entry(fitted[i].tail(horizon))
+    else:
+        for label, key, train in batch:
+            results[label] = _entry(fit_prophet(train, horizon, params)[0].tail(horizon))
+    for label, key, _ in batch:
+        atomic_write_bytes(_cache_path(cache_dir, key), json.dumps(results[label]).encode())
+    return results
+
+
+def run_backtest(series, backend="prophet", params=None, horizon=HORIZON, n_cutoffs=N_CUTOFFS,
+                 step=STEP, workers=None, cache_dir=BACKTEST_CACHE_DIR, log=print):
+    """Forecast every (series, cutoff) fold; return the scored forecasts.
+
+    The result has one row per (series, cutoff, month ahead): ``series``,
+    ``cutoff``, ``horizon`` (1 = first month after the cutoff), ``ds``, ``y``
+    and the forecast columns.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown forecast backend '{backend}' (choose from {', '.join(BACKENDS)})")
+    params = {**(PROPHET_PARAMS if backend == "prophet" else {}), **(params or {})}
+    config = {"backend": backend, **params}
+    os.makedirs(cache_dir, exist_ok=True)
+
+    forecasts, pending = {}, {}
+    for name, s in series.items():
+        for cutoff in cutoffs(s["ds"], horizon, n_cutoffs, step):
+            train = s[s["ds"] <= cutoff].reset_index(drop=True)
+            key = cache_key(train, horizon, config)
+            cached = _read_cached(cache_dir, key)
+            if cached is not None:
+                forecasts[(name, cutoff)] = cached
+            else:
+                pending.setdefault(cutoff, []).append(((name, cutoff), key, train))
+    n_pending = sum(len(batch) for batch in pending.values())
+    log(f"🔁 {len(forecasts)} folds cached, 🧮 {n_pending} to fit")
+
+    if backend == "fourier":
+        # One batched least-squares fit per cutoff
+        tasks = list(pending.values())
+    else:
+        tasks = [[fold] for batch in pending.values() for fold in batch]
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    if workers == 1:
+        for batch in tasks:
+            forecasts.update(_fit_batch(backend, params, horizon, batch, cache_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_fit_batch, backend, params, horizon, batch, cache_dir)
+                       for batch in tasks]
+            for future in futures:
+                forecasts.update(future.result())
+
+    columns = ["series", "cutoff", "horizon", "ds", "y"] + FORECAST_COLS[1:]
+    if not forecasts:
+        return pd.DataFrame(columns=columns)
+    folds = list(forecasts)
+    sizes = [len(forecasts[fold]["ds"]) for fold in folds]
+    results = pd.DataFrame({
+        "series": np.repeat([name for name, _ in folds], sizes),
+        "cutoff": np.repeat(pd.DatetimeIndex([cutoff for _, cutoff in folds]), sizes),
+        "horizon": np.concatenate([np.arange(1, n + 1) for n in sizes]),
+        "ds": pd.to_datetime(np.concatenate([forecasts[fold]["ds"] for fold in folds])),
+        **{col: np.concatenate([forecasts[fold][col] for fold in folds])
+           for col in FORECAST_COLS[1:]},
+    })
+    actuals = pd.concat(series, names=["series"])[["ds", "y"]].reset_index(level=0)
+    results = results.merge(actuals, on=["series", "ds"], how="inner")[columns]
+    return results.sort_values(["series", "cutoff", "horizon"], ignore_index=True)
+
+
+def score(results, by=("series", "horizon")):
+    """MAE, MAPE, interval coverage and forecast counts grouped by ``by``.
+
+    ``n`` counts the scored forecasts and ``n_mape`` those with an actual of
+    at least ``MAPE_MIN_Y`` mm.
+    """
+    error = (results["yhat"] - results["y"]).abs()
+    mape_ok = results["y"].abs() >= MAPE_MIN_Y
+    parts = pd.DataFrame({
+        **{col: results[col] for col in by},
+        "abs_error": error,
+        "ape": (error / results["y"].abs()).where(mape_ok) * 100,
+        "covered": ((results["y"] >= results["yhat_lower"])
+                    & (results["y"] <= results["yhat_upper"])).astype(float),
+    })
+    grouped = parts.groupby(list(by), sort=True)
+    return pd.DataFrame({
+        "mae": grouped["abs_error"].mean(),
+        "mape": grouped["ape"].mean(),
+        "coverage": grouped["covered"].mean(),
+        "n": grouped["abs_error"].size(),
+        "n_mape": grouped["ape"].count(),
+    }).reset_index()
+
+
+def load_backtest_metrics(path=BACKTEST_METRICS_CSV):
+    """Per (series, horizon) metrics written by ``python -m rainfall.backtest``."""
+    return pd.read_csv(path, dtype={"series": str})
+
+
+def summarize(metrics, series=None, by="horizon"):
+    """MAE/MAPE/coverage of ``series`` (all regions when None), pooled over folds.
+
+    Each row of ``metrics`` is weighted by its number of forecasts (by the
+    months that count towards MAPE, for MAPE).
+    """
+    if series is None:
+        metrics = metrics[metrics["series"] != NATIONAL]
+    else:
+        metrics = metrics[metrics["series"].isin(list(series))]
+    weighted = pd.DataFrame({
+        by: metrics[by],
+        "mae": metrics["mae"] * metrics["n"],
+        "mape": metrics["mape"].fillna(0) * metrics["n_mape"],
+        "coverage": metrics["coverage"] * metrics["n"],
+        "n": metrics["n"],
+        "n_mape": metrics["n_mape"],
+    })
+    totals = weighted.groupby(by).sum()
+    return pd.DataFrame({
+        "mae": totals["mae"] / totals["n"],
+        "mape": totals["mape"] / totals["n_mape"].where(totals["n_mape"] > 0),
+        "coverage": totals["coverage"] / totals["n"],
+        "n": totals["n"],
+    }).reset_index()
+
+
+def write_backtest_metrics(metrics, path=BACKTEST_METRICS_CSV):
+    with atomic_output(path) as tmp_path:
+        metrics.to_csv(tmp_path, index=False)
+
+
+def main(argv=None):
+    from rainfall.store import load_rainfall
+
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the forecasts.")
+    parser.add_argument("--backend", choices=BACKENDS, default="prophet",
+                        help="forecasting model (default: prophet)")
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="months scored after each cutoff")
+    parser.add_argument("--cutoffs", type=int, default=N_CUTOFFS, help="folds per series")
+    parser.add_argument("--step", type=int, default=STEP, help="months between cutoffs")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--regions", nargs="+", metavar="PCODE", help="only these regions")
+    parser.add_argument("--output", default=str(BACKTEST_METRICS_CSV))
+    args = parser.parse_args(argv)
+
+    series = backtest_series(load_rainfall(), args.regions)
+    results = run_backtest(series, backend=args.backend, horizon=args.horizon,
+                           n_cutoffs=args.cutoffs, step=args.step, workers=args.workers)
+    metrics = score(results)
+    write_backtest_metrics(metrics, args.output)
+
+    overall = score(results.assign(scope=np.where(results["series"] == NATIONAL,
+                                                  NATIONAL, "regions")), by=("scope",))
+    for row in overall.itertuples():
+        print(f"{row.scope:<10} MAE {row.mae:6.2f} mm   MAPE {row.mape:6.1f}%   "
+              f"coverage {row.coverage:5.1%}   ({row.n:,} forecasts)")
+    print(f"✅ Backtest metrics for {metrics['series'].nunique()} series saved to '{args.output}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
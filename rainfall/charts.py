@@ -0,0 +1,407 @@
+"""Plotly figure builders shared by the dashboard."""
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from rainfall.downsample import decimate_frame
+from rainfall.forecast import (forecast_metrics, forecast_table, has_interval, load_forecast,
+                               monthly_forecast, seasonal_forecast)
+from rainfall.paths import FORECAST_CSV
+from rainfall.store import MONTH_NAMES
+
+
+def forecast_figure(forecast_df):
+    """Forecast line with its confidence band (and history when present).
+
+    Long forecasts are decimated with LTTB on ``yhat``; the bounds share the
+    same rows so the band stays aligned.
+    """
+    forecast_df = decimate_frame(forecast_df, "ds", "yhat")
+    fig_forecast = go.Figure()
+
+    # Add forecast line
+    fig_forecast.add_trace(go.Scatter(
+        x=forecast_df['ds'],
+        y=forecast_df['yhat'],
+        mode='lines',
+        name='Forecast',
+        line=dict(color='#2E86AB', width=3),
+        hovertemplate='<b>Date:</b> %{x}<br><b>Forecast:</b> %{y:.1f} mm<extra></extra>'
+    ))
+
+    # Add confidence intervals if available
+    if has_interval(forecast_df):
+        # Upper bound
+        fig_forecast.add_trace(go.Scatter(
+            x=forecast_df['ds'],
+            y=forecast_df['yhat_upper'],
+            mode='lines',
+            line=dict(width=0),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+
+        # Lower bound with fill
+        fig_forecast.add_trace(go.Scatter(
+            x=forecast_df['ds'],
+            y=forecast_df['yhat_lower'],
+            mode='lines',
+            line=dict(width=0),
+            fill='tonexty',
+            fillcolor='rgba(46, 134, 171, 0.2)',
+            name='Confidence Interval',
+            hovertemplate='<b>Date:</b> %{x}<br><b>Lower:</b> %{y:.1f} mm<extra></extra>'
+        ))
+
+    # Add actual data if available (historical part)
+    if 'y' in forecast_df.columns:
+        actual_data = forecast_df[forecast_df['y'].notna()]
+        if len(actual_data) > 0:
+            fig_forecast.add_trace(go.Scatter(
+                x=actual_data['ds'],
+                y=actual_data['y'],
+                mode='markers+lines',
+                name='Historical Data',
+                line=dict(color='#A23B72', width=2),
+                marker=dict(size=6, color='#A23B72'),
+                hovertemplate='<b>Date:</b> %{x}<br><b>Actual:</b> %{y:.1f} mm<extra></extra>'
+            ))
+
+    fig_forecast.update_layout(
+        title='Rainfall Forecast with Confidence Intervals',
+        title_font_size=16,
+        title_x=0.5,
+        xaxis_title='Date',
+        yaxis_title='Rainfall (mm)',
+        hovermode='x unified',
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig_forecast
+
+
+def region_forecast_figure(forecasts, regions, show_bands=None):
+    """One forecast line per selected region; bands only for a few regions."""
+    forecasts = forecasts[forecasts['ADM2_PCODE'].isin(regions)]
+    if show_bands is None:
+        show_bands = len(regions) <= 3
+    palette = px.colors.qualitative.Plotly
+    fig = go.Figure()
+    for i, (pcode, group) in enumerate(forecasts.groupby('ADM2_PCODE', observed=True)):
+        color = palette[i % len(palette)]
+        if show_bands and has_interval(group):
+            fig.add_trace(go.Scatter(
+                x=pd.concat([group['ds'], group['ds'][::-1]]),
+                y=pd.concat([group['yhat_upper'], group['yhat_lower'][::-1]]),
+                fill='toself',
+                fillcolor=color,
+                opacity=0.15,
+                line=dict(width=0),
+                hoverinfo='skip',
+                showlegend=False,
+                legendgroup=str(pcode)
+            ))
+        fig.add_trace(go.Scatter(
+            x=group['ds'],
+            y=group['yhat'],
+            mode='lines',
+            name=str(pcode),
+            legendgroup=str(pcode),
+            line=dict(color=color, width=2),
+            hovertemplate=f'<b>{pcode}</b><br><b>Date:</b> %{{x}}<br><b>Forecast:</b> %{{y:.1f}} mm<extra></extra>'
+        ))
+
+    fig.update_layout(
+        title='Forecast by Region',
+        title_font_size=16,
+        title_x=0.5,
+        xaxis_title='Date',
+        yaxis_title='Rainfall (mm)',
+        hovermode='x unified',
+        template="plotly_white",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)"
+    )
+    return fig
+
+
+def monthly_forecast_figure(monthly_forecast):
+    fig_monthly = px.bar(
+        monthly_forecast,
+        x='month_name',
+        y='yhat',
+        title='Average Monthly Forecast',
+        labels={'yhat': 'Predicted Rainfall (mm)', 'month_name': 'Month'},
+        color='yhat',
+        color_continuous_scale='Blues',
+        template="plotly_white"
+    )
+
+    fig_monthly.update_traces(
+        texttemplate='%{y:.1f}',
+        textposition='outside',
+        marker_line_color="#2E86AB",
+        marker_line_width=1.5
+    )
+
+    fig_monthly.update_layout(
+        title_font_size=16,
+        title_x=0.5,
+        xaxis_title_font_size=14,
+        yaxis_title_font_size=14,
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        showlegend=False
+    )
+    return fig_monthly
+
+
+def seasonal_forecast_figure(seasonal_forecast):
+    fig_seasonal = px.bar(
+        seasonal_forecast,
+        x='Season',
+        y='Average_Rainfall',
+        title='Seasonal Rainfall Forecast',
+        labels={'Average_Rainfall': 'Average Rainfall (mm)'},
+        color='Average_Rainfall',
+        color_continuous_scale='Viridis',
+        template="plotly_white"
+    )
+
+    fig_seasonal.update_traces(
+        error_y=dict(type='data', array=seasonal_forecast['Std_Deviation'], visible=True),
+        texttemplate='%{y:.1f}',
+        textposition='outside',
+        marker_line_color="#2E86AB",
+        marker_line_width=1.5
+    )
+
+    fig_seasonal.update_layout(
+        title_font_size=16,
+        title_x=0.5,
+        xaxis_title_font_size=14,
+        yaxis_title_font_size=14,
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        showlegend=False
+    )
+    return fig_seasonal
+
+
+def decomposition_figure(components):
+    """Observed, trend, seasonal and residual panels sharing one date axis."""
+    panels = [
+        ('observed', 'Observed', '#2E86AB'),
+        ('trend', 'Trend', '#A23B72'),
+        ('seasonal', 'Seasonal', '#F18F01'),
+        ('resid', 'Residual', '#6C757D'),
+    ]
+    fig = make_subplots(rows=len(panels), cols=1, shared_xaxes=True, vertical_spacing=0.04,
+                        subplot_titles=[title for _, title, _ in panels])
+    for row, (column, title, color) in enumerate(panels, start=1):
+        fig.add_trace(go.Scatter(
+            x=components['date'],
+            y=components[column],
+            mode='lines',
+            name=title,
+            line=dict(color=color, width=2),
+            hovertemplate=f'<b>{title}:</b> %{{y:.1f}} mm<extra></extra>'
+        ), row=row, col=1)
+    fig.update_layout(
+        title='Dekadal Rainfall Decomposition (additive, 36 dekads per year)',
+        title_font_size=16,
+        title_x=0.5,
+        height=720,
+        showlegend=False,
+        hovermode='x unified',
+        template="plotly_white",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)"
+    )
+    return fig
+
+
+def cluster_profile_figure(profiles):
+    """Average monthly rainfall of each cluster centroid."""
+    palette = px.colors.qualitative.Set2
+    fig = go.Figure()
+    for cluster, row in profiles.iterrows():
+        fig.add_trace(go.Scatter(
+            x=[MONTH_NAMES[int(m) - 1][:3] for m in profiles.columns],
+            y=row.to_numpy(),
+            mode='lines+markers',
+            name=f'Cluster {cluster}',
+            line=dict(color=palette[int(cluster) % len(palette)], width=3),
+            hovertemplate=f'<b>Cluster {cluster}</b><br>%{{x}}: %{{y:.1f}} mm<extra></extra>'
+        ))
+    fig.update_layout(
+        title='Monthly Rainfall Profile by Cluster',
+        title_font_size=16,
+        title_x=0.5,
+        xaxis_title='Month',
+        yaxis_title='Average Rainfall (mm)',
+        hovermode='x unified',
+        template="plotly_white",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)"
+    )
+    return fig
+
+
+def similar_profiles_figure(profiles, target, similar):
+    """Monthly profile of ``target`` (bold) against its most similar regions."""
+    months = [MONTH_NAMES[int(m) - 1][:3] for m in profiles.columns]
+    palette = px.colors.qualitative.Pastel
+    fig = go.Figure()
+    for i, region in enumerate(similar):
+        fig.add_trace(go.Scatter(
+            x=months,
+            y=profiles.loc[region].to_numpy(),
+            mode='lines',
+            name=str(region),
+            line=dict(color=palette[i % len(palette)], width=2),
+            hovertemplate=f'<b>{region}</b><br>%{{x}}: %{{y:.1f}} mm<extra></extra>'
+        ))
+    fig.add_trace(go.Scatter(
+        x=months,
+        y=profiles.loc[target].to_numpy(),
+        mode='lines+markers',
+        name=f'{target} (selected)',
+        line=dict(color='#2E86AB', width=4),
+        marker=dict(size=8, color='#A23B72', line=dict(width=2, color='white')),
+        hovertemplate=f'<b>{target}</b><br>%{{x}}: %{{y:.1f}} mm<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f'Monthly Rainfall Profile: {target} and Similar Regions',
+        title_font_size=16,
+        title_x=0.5,
+        xaxis_title='Month',
+        yaxis_title='Average Rainfall (mm)',
+        hovermode='x unified',
+        template="plotly_white",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)"
+    )
+    return fig
+
+
+def spi_figure(series, window):
+    """SPI bars per dekad, brown when drier and blue when wetter than usual."""
+    fig = go.Figure(go.Bar(
+        x=series['date'],
+        y=series['spi'],
+        marker_color=['#A0522D' if v < 0 else '#2E86AB' for v in series['spi']],
+        hovertemplate='%{x|%d %b %Y}<br><b>SPI:</b> %{y:.2f}<extra></extra>'
+    ))
+    for level, label in [(-2, 'Extremely dry'), (-1, 'Moderately dry'), (1, 'Moderately wet'), (2, 'Extremely wet')]:
+        fig.add_hline(y=level, line=dict(color='#6C757D', width=1, dash='dot'),
+                      annotation_text=label, annotation_position='top left' if level > 0 else 'bottom left',
+                      annotation_font_size=10)
+    fig.update_layout(
+        title=f'{window}-Month Standardized Precipitation Index',
+        title_font_size=16,
+        title_x=0.5,
+        xaxis_title='Date',
+        yaxis_title='SPI',
+        bargap=0,
+        showlegend=False,
+        template="plotly_white",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)"
+    )
+    return fig
+
+
+def event_figure(rows, event):
+    """A region's dekadal rainfall for one year against its long-term average, with ``event`` marked."""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=rows['Date'],
+        y=rows['rfh'],
+        name='Rainfall',
+        marker_color=['#A23B72' if d == event['Date'] else '#2E86AB' for d in rows['Date']],
+        customdata=rows['rfq'],
+        hovertemplate='%{x|%d %b}<br><b>Rainfall:</b> %{y:.1f} mm<br><b>% of normal:</b> %{customdata:.0f}%<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=rows['Date'],
+        y=rows['rfh_avg'],
+        mode='lines',
+        name='Long-term average',
+        line=dict(color='#F18F01', width=3, dash='dash'),
+        hovertemplate='<b>Average:</b> %{y:.1f} mm<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f"{event['Region']}: Dekadal Rainfall in {event['Date'].year}",
+        title_font_size=16,
+        title_x=0.5,
+        xaxis_title='Dekad',
+        yaxis_title='Rainfall (mm)',
+        hovermode='x unified',
+        template="plotly_white",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)"
+    )
+    return fig
+
+
+def return_level_figure(curves, observed, distribution):
+    """Fitted return-level curve per region on a log period axis, with the observed annual maxima."""
+    palette = px.colors.qualitative.Plotly
+    fig = go.Figure()
+    for i, (pcode, curve) in enumerate(curves.groupby('Region', sort=True)):
+        color = palette[i % len(palette)]
+        fig.add_trace(go.Scatter(
+            x=curve['period'],
+            y=curve['level'],
+            mode='lines',
+            name=str(pcode),
+            legendgroup=str(pcode),
+            line=dict(color=color, width=2),
+            hovertemplate=f'<b>{pcode}</b><br>%{{x:.0f}}-year: %{{y:.1f}} mm<extra></extra>'
+        ))
+        points = observed[observed['Region'] == pcode]
+        fig.add_trace(go.Scatter(
+            x=points['period'],
+            y=points['level'],
+            mode='markers',
+            name=f'{pcode} maxima',
+            legendgroup=str(pcode),
+            showlegend=False,
+            marker=dict(color=color, size=7),
+            customdata=points['year'],
+            hovertemplate=f'<b>{pcode}</b> %{{customdata}}<br><b>Annual maximum:</b> %{{y:.1f}} mm<extra></extra>'
+        ))
+    fig.update_layout(
+        title=f'Return Levels of Dekadal Rainfall ({distribution})',
+        title_font_size=16,
+        title_x=0.5,
+        xaxis=dict(title='Return period (years)', type='log', tickvals=[1, 2, 5, 10, 25, 50, 100]),
+        yaxis_title='Dekadal rainfall (mm)',
+        template="plotly_white",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)"
+    )
+    return fig
+
+
+def forecast_bundle(path=FORECAST_CSV):
+    """Metrics, figures and table of the forecast panel, from one read of ``path``."""
+    forecast_df = load_forecast(path)
+    table = forecast_table(forecast_df)
+    return {
+        "metrics": forecast_metrics(forecast_df),
+        "fig_forecast": forecast_figure(forecast_df),
+        "fig_monthly": monthly_forecast_figure(monthly_forecast(forecast_df)),
+        "fig_seasonal": seasonal_forecast_figure(seasonal_forecast(forecast_df)),
+        "table": table,
+        "csv": table.to_csv(index=False),
+    }
@@ -0,0 +1,65 @@
+"""Cleaning of the raw HDX/CHIRPS ADM2 rainfall export.
+
+Mirrors the cleaning cells of ``notebooks/Bhutan_Rainfall_EDA.ipynb`` so the
+scripted pipeline produces the same ``cleaned_btn_rainfall.csv``.
+
+The export's second line is an HXL tag row (``#date,#adm2+id,...``). It is
+skipped while parsing rather than sliced off afterwards, so the numeric
+columns parse as numbers directly and no copy of the frame is made.
+``iter_clean_chunks`` streams the file in fixed-size chunks for full-history
+or multi-country exports that should not be held in memory at once.
+"""
+import pandas as pd
+
+from rainfall.paths import RAW_CSV
+
+NUMERIC_COLS = ['n_pixels', 'rfh', 'rfh_avg', 'r1h', 'r1h_avg', 'r3h', 'r3h_avg', 'rfq', 'r1q', 'r3q']
+# Kept as text while parsing; numeric columns are left to the parser
+TEXT_DTYPES = {'date': str, 'ADM2_PCODE': str, 'version': str}
+
+CHUNK_SIZE = 100_000
+
+
+def has_hxl_row(path):
+    """True if the line after the header is an HXL tag row."""
+    with open(path) as fh:
+        fh.readline()
+        return fh.readline().startswith("#")
+
+
+def read_raw(path=RAW_CSV, chunksize=None):
+    """Read the raw export, skipping the HXL tag row; an iterator if ``chunksize`` is set."""
+    skiprows = [1] if has_hxl_row(path) else None
+    return pd.read_csv(path, skiprows=skiprows, dtype=TEXT_DTYPES, chunksize=chunksize)
+
+
+def clean_rainfall(df):
+    """Coerce types and derive the calendar columns used by the dashboard."""
+    df['date'] = pd.to_datetime(df['date'])
+    for col in NUMERIC_COLS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    df['year'] = df['date'].dt.year
+    df['month'] = df['date'].dt.month
+    df['month_name'] = df['date'].dt.month_name()
+    df['day'] = df['date'].dt.day
+    return df
+
+
+def iter_clean_chunks(path=RAW_CSV, chunksize=CHUNK_SIZE):
+    """Cleaned frames of at most ``chunksize`` raw rows each.
+
+    Coercion is per chunk, so a malformed value only turns its own chunk's
+    column to text before ``to_numeric`` sets it to NaN.
+    """
+    for chunk in read_raw(path, chunksize=chunksize):
+        yield clean_rainfall(chunk)
+
+
+def write_cleaned_csv(raw_path, csv_path, chunksize=CHUNK_SIZE):
+    """Stream ``raw_path`` through the cleaning into ``csv_path``; return the row count."""
+    rows = 0
+    for chunk in iter_clean_chunks(raw_path, chunksize):
+        chunk.to_csv(csv_path, mode='a' if rows else 'w', header=not rows, index=False)
+        rows += len(chunk)
+    return rows
@@ -0,0 +1,208 @@
+"""Grouping regions by their average monthly rainfall profile.
+
+Profiles (region x calendar-month mean ``rfh``) are standardised and
+clustered with KMeans, or MiniBatchKMeans once there are more than
+``MINIBATCH_THRESHOLD`` regions. :func:`evaluate_k` scores a range of k
+(inertia and silhouette), with one fit per worker process once there are
+enough regions to pay for starting them. The scores are advisory: the
+clusters are always fitted with ``N_CLUSTERS``.
+
+The fitted scaler and centroids are persisted as a :class:`ClusterModel`
+(``outputs/cluster_model.npz``), so regions that are new or whose data
+changed can be assigned to the nearest centroid without refitting
+(:func:`assign_regions`, run by the incremental ingest). Those assignments go
+to their own table, ``outputs/cluster_assignments.csv``, which
+:func:`load_cluster_summary` lays over the fitted one: the ``clusters``
+stage's outputs are left alone, so an ingest does not make the pipeline
+refit. The ``clusters`` stage refits everything and drops the overlay.
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from rainfall.fileio import atomic_write_bytes
+from rainfall.paths import CLUSTER_ASSIGNMENTS_CSV, CLUSTER_MODEL, CLUSTER_SUMMARY_CSV
+
+N_CLUSTERS = 3
+RANDOM_STATE = 42
+
+# Candidate cluster counts scored by evaluate_k
+K_RANGE = tuple(range(2, 9))
+# Above this many regions, fit with MiniBatchKMeans
+MINIBATCH_THRESHOLD = 5_000
+MINIBATCH_SIZE = 4_096
+# Silhouette is quadratic in the number of regions: score a sample beyond this
+SILHOUETTE_SAMPLE = 5_000
+# Below this many regions each fit takes milliseconds, less than starting a
+# worker process: evaluate_k scores every k in this process
+PARALLEL_MIN_REGIONS = 2_000
+
+
+def _read_table(path):
+    table = pd.read_csv(path, index_col=0)
+    table.index = table.index.astype(str)
+    return table
+
+
+def load_cluster_summary(path=CLUSTER_SUMMARY_CSV, assignments_path=CLUSTER_ASSIGNMENTS_CSV):
+    """Cluster table shown in the dashboard (written by the ``clusters`` stage).
+
+    Rows of regions assigned by the ingest since the last refit replace or
+    extend the fitted ones.
+    """
+    table = _read_table(path)
+    if assignments_path is None or not os.path.exists(assignments_path):
+        return table
+    rows = _read_table(assignments_path).reindex(columns=table.columns)
+    return pd.concat([table.drop(index=rows.index, errors='ignore'), rows]).sort_index()
+
+
+def cluster_tables_mtime(path=CLUSTER_SUMMARY_CSV, assignments_path=CLUSTER_ASSIGNMENTS_CSV):
+    """mtimes of the fitted table and the assignment overlay, for cache keys."""
+    return tuple(os.stat(p).st_mtime_ns if os.path.exists(p) else None
+                 for p in (path, assignments_path))
+
+
+def monthly_profiles(df):
+    """Region x calendar-month matrix of mean ``rfh`` (the notebook's ``monthly_region``)."""
+    return df.groupby(['ADM2_PCODE', 'month'], observed=True)['rfh'].mean().unstack().fillna(0)
+
+
+def _kmeans(n_clusters, n_regions, random_state=RANDOM_STATE, minibatch=None):
+    # scikit-learn is only needed to fit, not to show the stored clusters
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+
+    if minibatch is None:
+        minibatch = n_regions > MINIBATCH_THRESHOLD
+    if minibatch:
+        return MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state,
+                               batch_size=MINIBATCH_SIZE, n_init="auto")
+    return KMeans(n_clusters=n_clusters, random_state=random_state, n_init="auto")
+
+
+def _score_k(scaled, k, random_state, minibatch):
+    from sklearn.metrics import silhouette_score
+
+    model = _kmeans(k, len(scaled), random_state, minibatch).fit(scaled)
+    silhouette = np.nan
+    if 1 < k < len(scaled):
+        sample = SILHOUETTE_SAMPLE if len(scaled) > SILHOUETTE_SAMPLE else None
+        silhouette = silhouette_score(scaled, model.labels_, sample_size=sample,
+                                      random_state=random_state)
+    return k, float(model.inertia_), float(silhouette)
+
+
+def evaluate_k(monthly_region, k_values=K_RANGE, random_state=RANDOM_STATE,
+               minibatch=None, workers=None):
+    """Inertia and silhouette of the standardised profiles for each k.
+
+    Each k is fitted in its own worker process; serially with one worker or
+    fewer than ``PARALLEL_MIN_REGIONS`` regions. Returns a frame with columns
+    ``k``, ``inertia`` and ``silhouette``.
+    """
+    from sklearn.preprocessing import StandardScaler
+
+    scaled = StandardScaler().fit_transform(monthly_region)
+    k_values = [k for k in k_values if k <= len(scaled)]
+    workers = min(workers or os.cpu_count() or 1, max(len(k_values), 1))
+    if len(scaled) < PARALLEL_MIN_REGIONS:
+        workers = 1
+    if workers == 1:
+        rows = [_score_k(scaled, k, random_state, minibatch) for k in k_values]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_score_k, scaled, k, random_state, minibatch)
+                       for k in k_values]
+            rows = [future.result() for future in futures]
+    return pd.DataFrame(rows, columns=["k", "inertia", "silhouette"])
+
+
+class ClusterModel:
+    """Persisted scaler, centroids and the fitted region assignments."""
+
+    def __init__(self, columns, mean, scale, centroids, regions, labels):
+        self.columns = np.asarray(columns)
+        self.mean = np.asarray(mean, dtype="float64")
+        self.scale = np.asarray(scale, dtype="float64")
+        self.centroids = np.asarray(centroids, dtype="float64")
+        self.regions = pd.Index(regions)
+        self.labels = np.asarray(labels, dtype="int64")
+
+    @classmethod
+    def fit(cls, monthly_region, n_clusters=N_CLUSTERS, random_state=RANDOM_STATE, minibatch=None):
+        """Standardise the profiles and fit (MiniBatch)KMeans."""
+        from sklearn.preprocessing import StandardScaler
+
+        scaler = StandardScaler()
+        monthly_scaled = scaler.fit_transform(monthly_region)
+        kmeans = _kmeans(n_clusters, len(monthly_region), random_state, minibatch)
+        labels = kmeans.fit_predict(monthly_scaled)
+        return cls(monthly_region.columns, scaler.mean_, scaler.scale_,
+                   kmeans.cluster_centers_, monthly_region.index.astype(str), labels)
+
+    @property
+    def n_clusters(self):
+        return len(self.centroids)
+
+    def assign(self, monthly_region):
+        """Nearest-centroid labels for profiles (same month columns as the fit)."""
+        x = monthly_region.reindex(columns=self.columns, fill_value=0).to_numpy(dtype="float64")
+        scaled = (x - self.mean) / self.scale
+        distances = ((scaled[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        return distances.argmin(axis=1)
+
+    def assignments(self):
+        return pd.Series(self.labels, index=self.regions, name="Cluster")
+
+    def profiles(self):
+        """Centroids in mm, one row per cluster and one column per month."""
+        return pd.DataFrame(self.centroids * self.scale + self.mean, columns=self.columns)
+
+    def save(self, path=CLUSTER_MODEL):
+        buffer = io.BytesIO()
+        np.savez(buffer, columns=self.columns, mean=self.mean, scale=self.scale,
+                 centroids=self.centroids, regions=self.regions.to_numpy(dtype=str),
+                 labels=self.labels)
+        atomic_write_bytes(path, buffer.getvalue())
+
+    @classmethod
+    def load(cls, path=CLUSTER_MODEL):
+        with np.load(path) as data:
+            return cls(**{name: data[name] for name in
+                          ["columns", "mean", "scale", "centroids", "regions", "labels"]})
+
+
+def with_clusters(monthly_region, model):
+    """``monthly_region`` with its ``Cluster`` column from ``model``."""
+    monthly_region = monthly_region.copy()
+    monthly_region['Cluster'] = model.assignments().reindex(monthly_region.index.astype(str)).to_numpy()
+    return monthly_region
+
+
+def cluster_regions(monthly_region, n_clusters=N_CLUSTERS, random_state=RANDOM_STATE, minibatch=None):
+    """Standardise the profiles, fit KMeans and append a ``Cluster`` column."""
+    return with_clusters(monthly_region, ClusterModel.fit(monthly_region, n_clusters,
+                                                          random_state, minibatch))
+
+
+def assign_regions(monthly_region, model_path=CLUSTER_MODEL,
+                   assignments_path=CLUSTER_ASSIGNMENTS_CSV):
+    """Assign new/updated regions to the persisted centroids without refitting.
+
+    Their rows (profile and ``Cluster``) are upserted into the assignment
+    overlay; the model and the tables of the ``clusters`` stage are only
+    read. Returns the labels.
+    """
+    model = ClusterModel.load(model_path)
+    rows = monthly_region.copy()
+    rows.columns = rows.columns.astype(str)
+    rows.index = rows.index.astype(str)
+    rows['Cluster'] = model.assign(monthly_region)
+    if os.path.exists(assignments_path):
+        table = _read_table(assignments_path)
+        rows = pd.concat([table.drop(index=rows.index, errors='ignore'), rows])
+    atomic_write_bytes(assignments_path, rows.sort_index().to_csv().encode())
+    return rows.loc[monthly_region.index.astype(str), 'Cluster']
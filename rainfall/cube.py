@@ -0,0 +1,330 @@
+"""Pre-aggregated region x year x month cube of rainfall statistics.
+
+Every dashboard chart is a function of the selected regions and year range.
+Instead of masking and grouping the raw rows on each rerun, the cube keeps,
+per (ADM2_PCODE, year, month) cell, the count, sum, sum of squares, min, max
+and a fixed-bin histogram sketch of ``rfh``. Answers are built by combining
+cells, so their cost depends on the cube shape rather than the row count.
+
+The cube is persisted next to the columnar store, tagged with the dataset
+version, and incremental ingests update it in place (:meth:`apply_delta`)
+rather than rebuilding it from every row.
+"""
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from rainfall.fileio import atomic_write_bytes
+from rainfall.paths import STORE_DIR
+from rainfall.store import MONTH_NAMES
+
+CUBE_FILE = "cube.npz"
+_ARRAYS = ["count", "total", "sumsq", "minimum", "maximum", "hist", "edges"]
+
+N_MONTHS = 12
+DEFAULT_BINS = 128
+
+
+def sketch_edges(max_value, n_bins=DEFAULT_BINS):
+    """Square-root spaced bin edges: fine near zero, coarse in the long tail."""
+    top = max(float(max_value), 1.0)
+    return np.linspace(0.0, np.sqrt(top), n_bins + 1) ** 2
+
+
+def _bin_index(values, edges):
+    idx = np.searchsorted(edges, values, side="right") - 1
+    return np.clip(idx, 0, len(edges) - 2)
+
+
+def _quantile_from_hist(hist, edges, q, lo, hi):
+    """Approximate the q-quantile of each histogram row.
+
+    ``hist`` is (n, bins); values are assumed uniform inside a bin and the
+    result is clamped to the exact per-row ``lo``/``hi``.
+    """
+    total = hist.sum(axis=1)
+    cum = np.cumsum(hist, axis=1)
+    target = q * total
+    b = np.argmax(cum >= target[:, None], axis=1)
+    rows = np.arange(len(hist))
+    below = np.where(b > 0, cum[rows, np.maximum(b - 1, 0)], 0)
+    in_bin = hist[rows, b]
+    frac = np.divide(target - below, in_bin, out=np.zeros(len(hist)), where=in_bin > 0)
+    value = edges[b] + frac * (edges[b + 1] - edges[b])
+    value = np.clip(value, lo, hi)
+    return np.where(total > 0, value, np.nan)
+
+
+class RainfallCube:
+    """Cell statistics for one indicator, indexed [region, year, month]."""
+
+    def __init__(self, regions, years, count, total, sumsq, minimum, maximum,
+                 hist, edges, value="rfh"):
+        self.regions = pd.Index(regions)
+        self.years = np.asarray(years)
+        self.count = count
+        self.total = total
+        self.sumsq = sumsq
+        self.minimum = minimum
+        self.maximum = maximum
+        self.hist = hist
+        self.edges = edges
+        self.value = value
+        # All-region sums per year, computed on first use and reset on updates
+        self._totals = {}
+
+    @classmethod
+    def empty(cls, regions, years, edges, value="rfh"):
+        shape = (len(regions), len(years), N_MONTHS)
+        return cls(regions, years,
+                   np.zeros(shape, dtype="int64"),
+                   np.zeros(shape), np.zeros(shape),
+                   np.full(shape, np.inf), np.full(shape, -np.inf),
+                   np.zeros(shape + (len(edges) - 1,), dtype="uint16"),
+                   edges, value=value)
+
+    @classmethod
+    def from_frame(cls, df, value="rfh", n_bins=DEFAULT_BINS):
+        df = df[df[value].notna()]
+        regions = pd.Index(sorted(df["ADM2_PCODE"].unique()))
+        years = np.arange(int(df["year"].min()), int(df["year"].max()) + 1)
+        x = df[value].to_numpy(dtype="float64")
+        cube = cls.empty(regions, years, sketch_edges(x.max() if len(x) else 1.0, n_bins), value)
+        cube._accumulate(df, sign=1)
+        cube._update_extremes(df)
+        return cube
+
+    # ---- incremental maintenance -------------------------------------------
+
+    def _cells(self, df):
+        r = self.regions.get_indexer(df["ADM2_PCODE"].astype(str))
+        y = df["year"].to_numpy().astype(int) - int(self.years[0])
+        m = df["month"].to_numpy().astype(int) - 1
+        return np.ravel_multi_index((r, y, m), self.count.shape)
+
+    def _accumulate(self, df, sign):
+        """Add (``sign=1``) or remove (``sign=-1``) rows' contributions."""
+        df = df[df[self.value].notna()]
+        if not len(df):
+            return
+        self._totals = {}
+        cell = self._cells(df)
+        x = df[self.value].to_numpy(dtype="float64")
+        n_cells = self.count.size
+        n_bins = self.hist.shape[-1]
+        self.count += sign * np.bincount(cell, minlength=n_cells).reshape(self.count.shape)
+        self.total += sign * np.bincount(cell, weights=x, minlength=n_cells).reshape(self.total.shape)
+        self.sumsq += sign * np.bincount(cell, weights=x * x, minlength=n_cells).reshape(self.sumsq.shape)
+        b = _bin_index(x, self.edges)
+        hist = np.bincount(cell * n_bins + b, minlength=n_cells * n_bins).reshape(self.hist.shape)
+        if sign > 0:
+            self.hist += hist.astype(self.hist.dtype)
+        else:
+            self.hist -= hist.astype(self.hist.dtype)
+
+    def _update_extremes(self, df):
+        df = df[df[self.value].notna()]
+        if not len(df):
+            return
+        cell = self._cells(df)
+        x = df[self.value].to_numpy(dtype="float64")
+        np.minimum.at(self.minimum.reshape(-1), cell, x)
+        np.maximum.at(self.maximum.reshape(-1), cell, x)
+
+    def _grow(self, regions, years):
+        """Extend the region/year axes so every given key has a cell."""
+        new_regions = self.regions.union(pd.Index(regions).astype(str)).sort_values()
+        lo = min(int(self.years[0]), int(np.min(years)))
+        hi = max(int(self.years[-1]), int(np.max(years)))
+        new_years = np.arange(lo, hi + 1)
+        if len(new_regions) == len(self.regions) and len(new_years) == len(self.years):
+            return
+        grown = RainfallCube.empty(new_regions, new_years, self.edges, self.value)
+        r = new_regions.get_indexer(self.regions)
+        y = self.years - lo
+        for name in _ARRAYS[:-1]:
+            getattr(grown, name)[np.ix_(r, y)] = getattr(self, name)
+        self.__dict__.update(grown.__dict__)
+
+    def apply_delta(self, added, removed=None, touched_rows=None):
+        """Update the cube for an upsert.
+
+        ``added`` are the new/replacement rows and ``removed`` the rows they
+        replace. Sums, counts and sketches are updated by difference. Min/max
+        cannot be un-merged, so cells that lost rows are recomputed from
+        ``touched_rows``, which must hold every current row of those cells.
+        """
+        if len(added):
+            self._grow(added["ADM2_PCODE"].astype(str).unique(), added["year"].to_numpy())
+        if removed is not None and len(removed):
+            self._accumulate(removed, sign=-1)
+            cells = np.unique(self._cells(removed))
+            self.minimum.reshape(-1)[cells] = np.inf
+            self.maximum.reshape(-1)[cells] = -np.inf
+            if touched_rows is not None and len(touched_rows):
+                rows = touched_rows[np.isin(self._cells(touched_rows), cells)]
+                self._update_extremes(rows)
+        self._accumulate(added, sign=1)
+        self._update_extremes(added)
+
+    # ---- persistence ------------------------------------------------------------
+
+    def save(self, path, version):
+        buffer = io.BytesIO()
+        np.savez(buffer, regions=self.regions.to_numpy(dtype=str), years=self.years,
+                 value=self.value, version=version,
+                 **{name: getattr(self, name) for name in _ARRAYS})
+        atomic_write_bytes(path, buffer.getvalue())
+
+    @classmethod
+    def load(cls, path):
+        """Return ``(cube, version)`` from a file written by :meth:`save`."""
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in _ARRAYS}
+            cube = cls(data["regions"], data["years"], value=str(data["value"]), **arrays)
+            return cube, str(data["version"])
+
+    # ---- selection helpers ------------------------------------------------
+
+    def _select(self, regions, year_range):
+        idx = self.regions.get_indexer(list(regions))
+        idx = np.unique(idx[idx >= 0])
+        y0, y1 = year_range
+        years = (self.years >= y0) & (self.years <= y1)
+        return idx, years
+
+    def _all_regions(self, name):
+        """Sum of array ``name`` over every region (cached until the next update)."""
+        out = self._totals.get(name)
+        if out is None:
+            out = self._totals[name] = getattr(self, name).sum(axis=0, dtype="float64")
+        return out
+
+    def _region_sum(self, name, idx, years):
+        """Sum array ``name`` over the selected regions and years.
+
+        When more than half the regions are selected, the complement is
+        subtracted from the cached all-region sum, so the work never exceeds
+        half the cube.
+        """
+        arr = getattr(self, name)
+        if len(idx) * 2 > len(self.regions):
+            mask = np.ones(len(self.regions), dtype=bool)
+            mask[idx] = False
+            out = self._all_regions(name)[years]
+            if mask.any():
+                out = out - arr[mask][:, years].sum(axis=0, dtype="float64")
+            return out
+        return arr[idx][:, years].sum(axis=0, dtype="float64")
+
+    # ---- queries ------------------------------------------------------------
+
+    def row_count(self, regions, year_range):
+        idx, years = self._select(regions, year_range)
+        return int(self._region_sum("count", idx, years).sum())
+
+    def region_stats(self, regions, year_range):
+        """Mean and sample standard deviation per selected region."""
+        idx, years = self._select(regions, year_range)
+        count = self.count[idx][:, years].sum(axis=(1, 2))
+        total = self.total[idx][:, years].sum(axis=(1, 2))
+        sumsq = self.sumsq[idx][:, years].sum(axis=(1, 2))
+        keep = count > 0
+        count, total, sumsq = count[keep], total[keep], sumsq[keep]
+        mean = total / count
+        var = np.divide(sumsq - total * mean, count - 1,
+                        out=np.full(len(count), np.nan), where=count > 1)
+        return pd.DataFrame({
+            "Region": self.regions[idx][keep],
+            "Average_Rainfall": mean,
+            "Std_Deviation": np.sqrt(np.clip(var, 0, None)),
+        })
+
+    def month_profiles(self):
+        """Region x calendar-month mean over all years (``clustering.monthly_profiles``)."""
+        count = self.count.sum(axis=1)
+        total = self.total.sum(axis=1)
+        mean = np.divide(total, count, out=np.zeros(total.shape), where=count > 0)
+        return pd.DataFrame(mean, index=pd.Index(self.regions, name="ADM2_PCODE"),
+                            columns=pd.Index(np.arange(1, N_MONTHS + 1), name="month"))
+
+    def _selected_extremes(self, idx, years):
+        if not len(idx):
+            return np.full(N_MONTHS, np.inf), np.full(N_MONTHS, -np.inf)
+        lo = self.minimum[idx][:, years].min(axis=(0, 1))
+        hi = self.maximum[idx][:, years].max(axis=(0, 1))
+        return lo, hi
+
+    def _box_stats(self, hist, count, total, lo, hi):
+        q1 = _quantile_from_hist(hist, self.edges, 0.25, lo, hi)
+        median = _quantile_from_hist(hist, self.edges, 0.5, lo, hi)
+        q3 = _quantile_from_hist(hist, self.edges, 0.75, lo, hi)
+        iqr = q3 - q1
+        return {
+            "count": count.astype("int64"),
+            "mean": np.divide(total, count, out=np.full(len(count), np.nan), where=count > 0),
+            "min": lo,
+            "q1": q1,
+            "median": median,
+            "q3": q3,
+            "max": hi,
+            "lowerfence": np.maximum(q1 - 1.5 * iqr, lo),
+            "upperfence": np.minimum(q3 + 1.5 * iqr, hi),
+        }
+
+    def month_distribution(self, regions, year_range):
+        """Box-plot statistics per calendar month, from the merged sketches."""
+        idx, years = self._select(regions, year_range)
+        count = self._region_sum("count", idx, years).sum(axis=0)
+        total = self._region_sum("total", idx, years).sum(axis=0)
+        hist = self._region_sum("hist", idx, years).sum(axis=0)
+        lo, hi = self._selected_extremes(idx, years)
+        out = pd.DataFrame({
+            "month": np.arange(1, N_MONTHS + 1),
+            "month_name": MONTH_NAMES,
+            **self._box_stats(hist, count, total, lo, hi),
+        })
+        return out[out["count"] > 0].reset_index(drop=True)
+
+    def distribution(self, regions, year_range):
+        """Box-plot statistics over the whole selection (one row)."""
+        idx, years = self._select(regions, year_range)
+        count = self._region_sum("count", idx, years).sum(axis=(0, 1))
+        total = self._region_sum("total", idx, years).sum(axis=(0, 1))
+        hist = self._region_sum("hist", idx, years).sum(axis=(0, 1))
+        lo, hi = self._selected_extremes(idx, years)
+        stats = self._box_stats(hist[None, :], np.array([count]), np.array([total]),
+                                lo.min(keepdims=True), hi.max(keepdims=True))
+        return {key: value[0] for key, value in stats.items()}
+
+    def histogram(self, regions, year_range, nbins=30):
+        """Counts over ``nbins`` equal-width bins spanning the selection.
+
+        The merged sketch is re-binned by interpolating its cumulative counts,
+        i.e. values are assumed uniform inside each sketch bin.
+        """
+        idx, years = self._select(regions, year_range)
+        hist = self._region_sum("hist", idx, years).sum(axis=(0, 1))
+        lo, hi = self._selected_extremes(idx, years)
+        lo, hi = float(lo.min()), float(hi.max())
+        total = hist.sum()
+        if total == 0:
+            return np.zeros(0), np.array([0.0])
+        if hi <= lo:
+            return np.array([total]), np.array([lo, lo + 1.0])
+        edges = np.linspace(lo, hi, nbins + 1)
+        cum = np.concatenate([[0.0], np.cumsum(hist)])
+        at_edges = np.interp(edges, self.edges, cum)
+        at_edges[0], at_edges[-1] = 0.0, total
+        counts = np.diff(np.maximum.accumulate(at_edges))
+        return counts, edges
+
+
+def build_cube(df, value="rfh", n_bins=DEFAULT_BINS):
+    return RainfallCube.from_frame(df, value=value, n_bins=n_bins)
+
+
+def cube_path(store_dir=STORE_DIR):
+    return os.path.join(store_dir, CUBE_FILE)
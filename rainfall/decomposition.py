@@ -0,0 +1,168 @@
+"""Additive seasonal decomposition of every region's dekadal series at once.
+
+The EDA notebook decomposes a single national series after upsampling the
+dekadal data to daily (``asfreq('D').interpolate()``, period 365), i.e. ten
+interpolated points per observation. Here the data stays at its native
+resolution - 36 dekads a year (days 1, 11 and 21 of each month) - and all
+regions are decomposed together as rows of one 2-D array:
+
+* trend: centred 2x36 moving average (as ``seasonal_decompose`` with an even
+  period), undefined for the first and last 18 dekads;
+* seasonal: mean detrended value per dekad of the year, centred on zero;
+* resid: observed - trend - seasonal.
+
+The result is persisted next to the store, tagged with the dataset version,
+like the aggregate cube.
+"""
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from rainfall.fileio import atomic_write_bytes
+from rainfall.paths import STORE_DIR
+
+DECOMPOSITION_FILE = "decomposition.npz"
+COMPONENTS = ["observed", "trend", "seasonal", "resid"]
+
+DEKADS_PER_YEAR = 36
+
+
+def dekad_ordinal(dates):
+    """Running dekad number (``year * 36 + dekad of year``) of each date."""
+    dates = pd.DatetimeIndex(dates)
+    dekad = np.minimum((dates.day.to_numpy() - 1) // 10, 2)
+    return dates.year.to_numpy() * DEKADS_PER_YEAR + (dates.month.to_numpy() - 1) * 3 + dekad
+
+
+def dekad_dates(ordinals):
+    """First day of each running dekad number (inverse of :func:`dekad_ordinal`)."""
+    ordinals = np.asarray(ordinals)
+    year, dekad = np.divmod(ordinals, DEKADS_PER_YEAR)
+    month, third = np.divmod(dekad, 3)
+    return pd.to_datetime(pd.DataFrame({"year": year, "month": month + 1, "day": third * 10 + 1}))
+
+
+def dekadal_matrix(df, value="rfh", interpolate=True):
+    """Region x dekad array on a gap-free grid whole calendar years long.
+
+    Returns ``(regions, first_ordinal, matrix)``. Gaps inside a series are
+    linearly interpolated unless ``interpolate`` is false; cells outside a
+    region's data stay NaN.
+    """
+    df = df[df[value].notna()]
+    codes, regions = pd.factorize(df["ADM2_PCODE"].astype(str), sort=True)
+    ordinal = dekad_ordinal(df["date"])
+    first = (ordinal.min() // DEKADS_PER_YEAR) * DEKADS_PER_YEAR
+    n_years = ordinal.max() // DEKADS_PER_YEAR - first // DEKADS_PER_YEAR + 1
+    matrix = np.full((len(regions), n_years * DEKADS_PER_YEAR), np.nan)
+    matrix[codes, ordinal - first] = df[value].to_numpy(dtype="float64")
+    if interpolate:
+        matrix = pd.DataFrame(matrix.T).interpolate(limit_area="inside").to_numpy().T
+    return pd.Index(regions), first, matrix
+
+
+def _window_sum(x, half):
+    """Sum over the centred window ``t-half..t+half`` along axis 1 (NaN if incomplete)."""
+    valid = np.isfinite(x)
+    filled = np.where(valid, x, 0.0)
+    pad = np.zeros((x.shape[0], 1))
+    total = np.concatenate([pad, np.cumsum(filled, axis=1)], axis=1)
+    count = np.concatenate([pad, np.cumsum(valid, axis=1)], axis=1)
+    width = 2 * half + 1
+    out = np.full(x.shape, np.nan)
+    inner = total[:, width:] - total[:, :-width]
+    complete = (count[:, width:] - count[:, :-width]) == width
+    out[:, half:x.shape[1] - half] = np.where(complete, inner, np.nan)
+    return out
+
+
+def decompose(matrix, period=DEKADS_PER_YEAR):
+    """Classical additive decomposition of each row of ``matrix``.
+
+    The columns must start at phase 0 of the cycle (e.g. the first dekad of a
+    year) and span whole cycles. Returns ``(trend, seasonal, resid)``.
+    """
+    x = np.asarray(matrix, dtype="float64")
+    if period % 2:
+        half = period // 2
+        trend = _window_sum(x, half) / period
+    else:
+        # 2 x period moving average: the two end points get half weight
+        half = period // 2
+        trend = _window_sum(x, half)
+        ends = np.full(x.shape, np.nan)
+        ends[:, half:-half] = x[:, :-2 * half] + x[:, 2 * half:]
+        trend = (trend - 0.5 * ends) / period
+
+    detrended = (x - trend).reshape(x.shape[0], -1, period)
+    valid = np.isfinite(detrended)
+    counts = valid.sum(axis=1)
+    means = np.where(valid, detrended, 0.0).sum(axis=1) / np.maximum(counts, 1)
+    means[counts == 0] = np.nan
+    known = counts > 0
+    means -= (np.where(known, means, 0.0).sum(axis=1) / np.maximum(known.sum(axis=1), 1))[:, None]
+    seasonal = np.tile(means, x.shape[1] // period)
+    return trend, seasonal, x - trend - seasonal
+
+
+class Decomposition:
+    """Observed/trend/seasonal/resid arrays indexed [region, dekad]."""
+
+    def __init__(self, regions, first_ordinal, observed, trend, seasonal, resid, value="rfh"):
+        self.regions = pd.Index(regions)
+        self.first_ordinal = int(first_ordinal)
+        self.observed = observed
+        self.trend = trend
+        self.seasonal = seasonal
+        self.resid = resid
+        self.value = value
+        self.dates = pd.DatetimeIndex(dekad_dates(self.first_ordinal + np.arange(observed.shape[1])))
+
+    @classmethod
+    def from_frame(cls, df, value="rfh", period=DEKADS_PER_YEAR):
+        regions, first, observed = dekadal_matrix(df, value)
+        trend, seasonal, resid = decompose(observed, period)
+        arrays = [a.astype("float32") for a in (observed, trend, seasonal, resid)]
+        return cls(regions, first, *arrays, value=value)
+
+    def save(self, path, version):
+        buffer = io.BytesIO()
+        np.savez(buffer, regions=self.regions.to_numpy(dtype=str),
+                 first_ordinal=self.first_ordinal, value=self.value, version=version,
+                 **{name: getattr(self, name) for name in COMPONENTS})
+        atomic_write_bytes(path, buffer.getvalue())
+
+    @classmethod
+    def load(cls, path):
+        """Return ``(decomposition, version)`` from a file written by :meth:`save`."""
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in COMPONENTS}
+            decomposition = cls(data["regions"], int(data["first_ordinal"]),
+                                value=str(data["value"]), **arrays)
+            return decomposition, str(data["version"])
+
+    def components(self, regions, year_range):
+        """Components averaged over ``regions`` for dekads within ``year_range``.
+
+        Additive components average to the decomposition of the mean series.
+        Returns a frame with ``date`` and one column per component.
+        """
+        idx = self.regions.get_indexer(list(regions))
+        idx = np.unique(idx[idx >= 0])
+        y0, y1 = year_range
+        cols = (self.dates.year >= y0) & (self.dates.year <= y1)
+        out = pd.DataFrame({"date": self.dates[cols]})
+        for name in COMPONENTS:
+            block = getattr(self, name)[np.ix_(idx, cols)]
+            out[name] = pd.DataFrame(block).mean(axis=0).to_numpy() if len(idx) else np.nan
+        return out
+
+
+def build_decomposition(df, value="rfh"):
+    return Decomposition.from_frame(df, value=value)
+
+
+def decomposition_path(store_dir=STORE_DIR):
+    return os.path.join(store_dir, DECOMPOSITION_FILE)
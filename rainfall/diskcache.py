@@ -0,0 +1,297 @@
+"""Result cache shared by every Streamlit worker on a host, persisted in SQLite.
+
+``st.cache_data`` and the in-process :class:`rainfall.queries.LRUCache` live in
+one worker's memory: each replica recomputes the same aggregates and figures,
+and a restart starts cold. :class:`DiskCache` keeps the results in one SQLite
+file (WAL mode, so readers never block each other) with the same interface:
+
+* keys are the dataset version plus the canonical query, hashed to a digest
+  together with :data:`CACHE_FORMAT_VERSION` and the cache's ``namespace``
+  (the query backend), so results computed before an ingest, by an older
+  version of the code or by the other backend are never served;
+* values are pickled, except Plotly figures, which are stored as their JSON;
+* a file written with another table layout (``SCHEMA_VERSION``) is emptied
+  when opened;
+* the file is bounded to ``max_bytes``: the total size is kept in a ``meta``
+  row, and only a put that takes it over the bound evicts, least recently
+  read entries first, down to ``EVICT_TO`` of the bound;
+* a read only writes its access time back when the stored one is more than
+  ``ACCESS_RESOLUTION`` seconds old, so warm hits stay read-only;
+* a small in-memory LRU in front of the file serves a worker's repeat lookups
+  without touching disk;
+* a worker about to compute a missing entry claims it first, and other
+  workers asking for the same key meanwhile wait for its result instead of
+  computing it again.
+
+Unpickling runs arbitrary code, so the cache file must only be writable by
+the user running the dashboard.
+
+Usage::
+
+    python -m rainfall.diskcache           # entries and size
+    python -m rainfall.diskcache --clear
+"""
+import argparse
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+
+from rainfall.paths import ROOT
+from rainfall.queries import LRUCache
+
+RESULT_CACHE_PATH = ROOT / ".cache" / "results.sqlite"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Part of every key: bump when cached values change shape (frame columns,
+# figure layout), so entries written by older code are no longer read
+CACHE_FORMAT_VERSION = 1
+# Stored as the file's user_version: bump when the tables change
+SCHEMA_VERSION = 2
+
+# Access times are this coarse: a hit within it of the last one writes nothing
+ACCESS_RESOLUTION = 60.0
+# Eviction frees space down to this fraction of max_bytes, so that it does not
+# run again on the next put
+EVICT_TO = 0.9
+
+CACHE_ENV_VAR = "RAINFALL_RESULT_CACHE"
+CACHE_BACKENDS = ("disk", "memory")
+
+# Seconds a worker waits for another worker's computation before doing it itself
+CLAIM_TIMEOUT = 30.0
+POLL_INTERVAL = 0.05
+
+_TABLES = ("entries", "claims", "meta")
+_SCHEMA = (
+    """CREATE TABLE entries (
+        key TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        value BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        accessed REAL NOT NULL
+    )""",
+    "CREATE INDEX entries_accessed ON entries (accessed)",
+    """CREATE TABLE claims (
+        key TEXT PRIMARY KEY,
+        started REAL NOT NULL
+    )""",
+    """CREATE TABLE meta (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )""",
+    "INSERT INTO meta VALUES ('bytes', 0)",
+)
+
+
+def result_cache_backend(environ=os.environ):
+    """Result cache selected by ``RAINFALL_RESULT_CACHE`` (default ``disk``)."""
+    backend = environ.get(CACHE_ENV_VAR, "").strip().lower() or CACHE_BACKENDS[0]
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"{CACHE_ENV_VAR} must be one of {CACHE_BACKENDS}, got '{backend}'")
+    return backend
+
+
+def digest(key):
+    """Stable digest of a key built from strings, numbers and tuples of them."""
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+def _encode(value):
+    from plotly.basedatatypes import BaseFigure
+
+    if isinstance(value, BaseFigure):
+        return "figure", value.to_json().encode()
+    return "pickle", pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode(kind, blob):
+    if kind == "figure":
+        import plotly.io as pio
+        return pio.from_json(blob.decode())
+    return pickle.loads(blob)
+
+
+class DiskCache:
+    """Size-bounded LRU in a SQLite file, shared by processes; see the module docstring."""
+
+    def __init__(self, path=RESULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, memory_entries=64,
+                 claim_timeout=CLAIM_TIMEOUT, namespace=""):
+        self.path = os.fspath(path)
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.claim_timeout = claim_timeout
+        self.memory = LRUCache(max_entries=memory_entries) if memory_entries else None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._migrate()
+
+    def _migrate(self):
+        """Create the tables, dropping any written with another ``SCHEMA_VERSION``."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                for table in _TABLES:
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+                for statement in _SCHEMA:
+                    self._conn.execute(statement)
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _key(self, key):
+        return digest((CACHE_FORMAT_VERSION, self.namespace, key))
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def _read(self, key):
+        """Decoded value from memory or disk, without counting the lookup."""
+        if self.memory is not None:
+            value = self.memory.get(key)
+            if value is not None:
+                return value
+        k = self._key(key)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT kind, value, accessed FROM entries WHERE key = ?", (k,)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[2] > ACCESS_RESOLUTION:
+                self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, k))
+        value = _decode(row[0], row[1])
+        if self.memory is not None:
+            self.memory.put(key, value)
+        return value
+
+    def get(self, key):
+        value = self._read(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        kind, blob = _encode(value)
+        k = self._key(key)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (k,)).fetchone()
+                self._conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                                   (k, kind, blob, len(blob), time.time()))
+                self._conn.execute("DELETE FROM claims WHERE key = ?", (k,))
+                self._conn.execute("UPDATE meta SET value = value + ? WHERE name = 'bytes'",
+                                   (len(blob) - (old[0] if old else 0),))
+                if self._total_bytes() > self.max_bytes:
+                    self._evict()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if self.memory is not None:
+            self.memory.put(key, value)
+
+    def _total_bytes(self):
+        return self._conn.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+
+    def _evict(self):
+        """Delete the least recently read entries beyond ``EVICT_TO * max_bytes``."""
+        self._conn.execute(
+            "DELETE FROM entries WHERE key IN ("
+            " SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS running"
+            "                  FROM entries) WHERE running > ?)",
+            (int(self.max_bytes * EVICT_TO),),
+        )
+        self._conn.execute(
+            "UPDATE meta SET value = (SELECT COALESCE(SUM(size), 0) FROM entries) WHERE name = 'bytes'")
+
+    def _claim(self, key):
+        """True if this worker should compute ``key`` (no other live claim)."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO claims VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET started = excluded.started WHERE started < ?",
+                (self._key(key), now, now - self.claim_timeout),
+            )
+            return cursor.rowcount > 0
+
+    def _release(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM claims WHERE key = ?", (self._key(key),))
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is not None:
+            return value
+        if not self._claim(key):
+            # Another worker is computing it: wait for its result
+            deadline = time.monotonic() + self.claim_timeout
+            while time.monotonic() < deadline:
+                time.sleep(POLL_INTERVAL)
+                value = self._read(key)
+                if value is not None:
+                    return value
+        try:
+            value = compute()
+            self.put(key, value)
+        finally:
+            self._release(key)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM claims")
+            self._conn.execute("UPDATE meta SET value = 0 WHERE name = 'bytes'")
+            self._conn.execute("VACUUM")
+        if self.memory is not None:
+            self.memory = LRUCache(max_entries=self.memory.max_entries)
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            size = self._total_bytes()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": size,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or clear the shared result cache.")
+    parser.add_argument("--path", default=str(RESULT_CACHE_PATH))
+    parser.add_argument("--clear", action="store_true", help="delete every cached result")
+    args = parser.parse_args(argv)
+
+    cache = DiskCache(args.path, memory_entries=0)
+    if args.clear:
+        cache.clear()
+        print(f"🧹 Cleared '{args.path}'")
+    stats = cache.stats()
+    print(f"{stats['entries']:,} cached results, {stats['bytes'] / 1024 / 1024:.1f} MB in '{args.path}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
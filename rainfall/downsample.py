@@ -0,0 +1,61 @@
+"""Server-side decimation so chart payloads stay bounded.
+
+Line charts are reduced with Largest-Triangle-Three-Buckets (LTTB), which keeps
+the visual shape of a series (peaks and troughs) with a fixed number of
+points.
+"""
+import numpy as np
+
+# Upper bound on points sent to the browser per line trace
+MAX_LINE_POINTS = 1000
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype("int64").astype("float64")
+    return x.astype("float64")
+
+
+def lttb_indices(x, y, n_out=MAX_LINE_POINTS):
+    """Indices of the points LTTB keeps out of the series ``(x, y)``.
+
+    The first and last points are always kept. Series that already fit are
+    returned unchanged.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = np.asarray(y, dtype="float64")
+
+    # Bucket boundaries for the n - 2 interior points
+    bounds = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = bounds[i], bounds[i + 1]
+        # Average of the next bucket is the third triangle vertex
+        nxt_start, nxt_stop = bounds[i + 1], bounds[i + 2] if i + 2 < len(bounds) else n
+        cx = x[nxt_start:nxt_stop].mean()
+        cy = y[nxt_start:nxt_stop].mean()
+        bx = x[start:stop]
+        by = y[start:stop]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def decimate_frame(frame, x, y, n_out=MAX_LINE_POINTS):
+    """Rows of ``frame`` kept by LTTB on columns ``x``/``y``.
+
+    Other columns (e.g. forecast bounds) follow the same indices so bands stay
+    aligned with their line.
+    """
+    if len(frame) <= n_out:
+        return frame
+    idx = lttb_indices(frame[x].to_numpy(), frame[y].to_numpy(), n_out)
+    return frame.iloc[idx]
@@ -0,0 +1,229 @@
+"""Extreme-event index: top-k and threshold queries without sorting the selection.
+
+Rows are grouped into (region, year) cells. For each indexed indicator
+(``rfh`` and the ``rfq`` percent-of-normal anomaly) the index keeps every
+cell's values sorted, so for a selection of regions and years:
+
+* the k largest (or smallest) rows lie among the k largest of each selected
+  cell - at most ``cells * k`` candidates, reduced with one ``argpartition``;
+* the number of rows above a threshold in each cell is a binary search,
+  run for all selected cells at once.
+
+Neither touches the other rows of the selection. The index also returns a
+cell's rows in date order for drill-down. It is persisted next to the store,
+tagged with the dataset version, like the decomposition.
+
+Usage (e.g. for alerting after an ingest)::
+
+    python -m rainfall.extremes                          # rfq > 200 % in the latest year
+    python -m rainfall.extremes --column rfh --threshold 150 --years 2021 2025 --top 20
+"""
+import argparse
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from rainfall.decomposition import dekad_dates, dekad_ordinal
+from rainfall.fileio import atomic_write_bytes, load_or_build
+from rainfall.paths import STORE_DIR
+
+EXTREMES_FILE = "extremes.npz"
+
+# Indicators with a sorted index, and the columns carried with each event
+INDEX_COLS = ("rfh", "rfq")
+EVENT_COLS = ["rfh", "rfh_avg", "rfq", "r1q", "r3q"]
+
+DEFAULT_THRESHOLDS = {"rfh": 100.0, "rfq": 200.0}
+
+
+class ExtremeIndex:
+    """Event rows grouped by (region, year) cell, sorted per indexed indicator."""
+
+    def __init__(self, regions, years, offsets, dekads, columns, order, n_valid):
+        # Rows are ordered by cell then date; cell c spans offsets[c]:offsets[c + 1].
+        # order[col] permutes each cell's span into ascending ``col`` (NaNs last)
+        # and n_valid[col][c] is the number of non-NaN values in cell c.
+        self.regions = pd.Index(regions)
+        self.years = np.asarray(years)
+        self.offsets = offsets
+        self.dekads = dekads
+        self.columns = columns
+        self.order = order
+        self.n_valid = n_valid
+        self.sorted = {col: columns[col][order[col]] for col in order}
+
+    @classmethod
+    def from_frame(cls, df):
+        regions = pd.Index(sorted(df["ADM2_PCODE"].astype(str).unique()))
+        years = np.arange(int(df["year"].min()), int(df["year"].max()) + 1) if len(df) else np.zeros(0, int)
+        r = regions.get_indexer(df["ADM2_PCODE"].astype(str))
+        cell = r * len(years) + (df["year"].to_numpy().astype(int) - (int(years[0]) if len(years) else 0))
+        dekads = dekad_ordinal(df["date"])
+        rows = np.lexsort((dekads, cell))
+        cell, dekads = cell[rows], dekads[rows].astype("int32")
+        columns = {col: df[col].to_numpy(dtype="float32")[rows] for col in EVENT_COLS}
+        offsets = np.searchsorted(cell, np.arange(len(regions) * len(years) + 1)).astype("int64")
+        order, n_valid = {}, {}
+        for col in INDEX_COLS:
+            # np.lexsort sorts NaN last within each cell
+            order[col] = np.lexsort((columns[col], cell)).astype("int64")
+            valid = np.isfinite(columns[col])
+            n_valid[col] = np.bincount(cell[valid], minlength=len(offsets) - 1)
+        return cls(regions, years, offsets, dekads, columns, order, n_valid)
+
+    # ---- persistence ------------------------------------------------------------
+
+    def save(self, path, version):
+        arrays = {f"col_{col}": values for col, values in self.columns.items()}
+        arrays.update({f"order_{col}": self.order[col] for col in self.order})
+        arrays.update({f"valid_{col}": self.n_valid[col] for col in self.n_valid})
+        buffer = io.BytesIO()
+        np.savez(buffer, regions=self.regions.to_numpy(dtype=str), years=self.years,
+                 offsets=self.offsets, dekads=self.dekads, version=version, **arrays)
+        atomic_write_bytes(path, buffer.getvalue())
+
+    @classmethod
+    def load(cls, path):
+        """Return ``(index, version)`` from a file written by :meth:`save`."""
+        with np.load(path) as data:
+            index = cls(data["regions"], data["years"], data["offsets"], data["dekads"],
+                        {col: data[f"col_{col}"] for col in EVENT_COLS},
+                        {col: data[f"order_{col}"] for col in INDEX_COLS},
+                        {col: data[f"valid_{col}"] for col in INDEX_COLS})
+            return index, str(data["version"])
+
+    # ---- queries ------------------------------------------------------------------
+
+    def _cells(self, regions, year_range):
+        idx = self.regions.get_indexer(list(regions))
+        idx = np.unique(idx[idx >= 0])
+        y0, y1 = year_range
+        years = np.flatnonzero((self.years >= y0) & (self.years <= y1))
+        return (idx[:, None] * len(self.years) + years[None, :]).ravel()
+
+    def _check(self, column):
+        if column not in self.order:
+            raise ValueError(f"No extreme index for '{column}' (indexed: {', '.join(self.order)})")
+
+    def _events(self, rows):
+        """Event table for base row numbers ``rows``."""
+        cell = np.searchsorted(self.offsets, rows, side="right") - 1
+        out = pd.DataFrame({
+            "Region": self.regions[cell // len(self.years)],
+            "Date": dekad_dates(self.dekads[rows]),
+        })
+        for col in EVENT_COLS:
+            out[col] = self.columns[col][rows].astype("float64")
+        return out
+
+    def top_k(self, column, regions, year_range, k=10, largest=True):
+        """The ``k`` rows with the largest (or smallest) ``column`` in the selection."""
+        self._check(column)
+        cells = self._cells(regions, year_range)
+        start = self.offsets[cells]
+        valid = self.n_valid[column][cells]
+        take = np.minimum(valid, k)
+        if not take.sum():
+            return self._events(np.zeros(0, dtype="int64"))
+        # Positions (in sorted order) of each cell's k most extreme values
+        step = np.arange(take.sum()) - np.repeat(np.cumsum(take) - take, take)
+        if largest:
+            pos = np.repeat(start + valid - 1, take) - step
+        else:
+            pos = np.repeat(start, take) + step
+        values = self.sorted[column][pos].astype("float64")
+        key = -values if largest else values
+        n = min(k, len(pos))
+        best = np.argpartition(key, n - 1)[:n] if n < len(pos) else np.arange(len(pos))
+        best = best[np.argsort(key[best], kind="stable")]
+        return self._events(self.order[column][pos[best]]).reset_index(drop=True)
+
+    def _count_above(self, column, threshold, cells):
+        """Values above ``threshold`` per cell, by a binary search over every cell at once."""
+        lo = self.offsets[cells].copy()
+        hi = lo + self.n_valid[column][cells]
+        end = hi.copy()
+        values = self.sorted[column]
+        while True:
+            open_ = lo < hi
+            if not open_.any():
+                break
+            mid = (lo + hi) // 2
+            below = open_ & (values[np.minimum(mid, len(values) - 1)] <= threshold)
+            lo = np.where(below, mid + 1, lo)
+            hi = np.where(open_ & ~below, mid, hi)
+        return end - lo, lo, end
+
+    def exceedance_counts(self, column, threshold, regions, year_range):
+        """Rows with ``column`` above ``threshold`` per selected region (``Region``, ``Count``)."""
+        self._check(column)
+        cells = self._cells(regions, year_range)
+        counts, _, _ = self._count_above(column, threshold, cells)
+        region = cells // len(self.years)
+        totals = np.bincount(region, weights=counts, minlength=len(self.regions))
+        rows = np.unique(region)
+        out = pd.DataFrame({"Region": self.regions[rows], "Count": totals[rows].astype("int64")})
+        return out.sort_values(["Count", "Region"], ascending=[False, True], ignore_index=True)
+
+    def exceedances(self, column, threshold, regions, year_range):
+        """Every row above ``threshold`` in the selection, most extreme first."""
+        self._check(column)
+        counts, first, end = self._count_above(column, threshold, self._cells(regions, year_range))
+        step = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        pos = np.repeat(first, counts) + step
+        events = self._events(self.order[column][pos])
+        return events.sort_values(column, ascending=False, ignore_index=True)
+
+    def cell_rows(self, region, year):
+        """All rows of one region and year in date order (drill-down)."""
+        r = self.regions.get_loc(str(region))
+        cell = r * len(self.years) + int(year) - int(self.years[0])
+        return self._events(np.arange(self.offsets[cell], self.offsets[cell + 1]))
+
+
+def build_extreme_index(df):
+    return ExtremeIndex.from_frame(df)
+
+
+def extremes_path(store_dir=STORE_DIR):
+    return os.path.join(store_dir, EXTREMES_FILE)
+
+
+def main(argv=None):
+    from rainfall.store import dataset_version, load_rainfall
+
+    parser = argparse.ArgumentParser(description="Report extreme dekads and threshold exceedances.")
+    parser.add_argument("--column", choices=INDEX_COLS, default="rfq",
+                        help="indicator (rfq: percent of normal, rfh: mm; default rfq)")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="exceedance threshold (default: 200 for rfq, 100 for rfh)")
+    parser.add_argument("--years", type=int, nargs=2, metavar=("FIRST", "LAST"),
+                        help="year range (default: the latest year)")
+    parser.add_argument("--regions", nargs="+", metavar="PCODE", help="only these regions")
+    parser.add_argument("--top", type=int, default=10, help="number of most extreme dekads to list")
+    args = parser.parse_args(argv)
+
+    index = load_or_build(extremes_path(), dataset_version(),
+                          lambda: build_extreme_index(load_rainfall()), ExtremeIndex.load)
+    threshold = DEFAULT_THRESHOLDS[args.column] if args.threshold is None else args.threshold
+    years = tuple(args.years) if args.years else (int(index.years[-1]),) * 2
+    regions = args.regions or list(index.regions)
+
+    with pd.option_context("display.width", 120, "display.max_columns", None):
+        print(f"🌧️  Top {args.top} dekads by {args.column}, {years[0]}–{years[1]}:")
+        top = index.top_k(args.column, regions, years, args.top)
+        print(top.round({col: 1 for col in EVENT_COLS}).to_string(index=False))
+        counts = index.exceedance_counts(args.column, threshold, regions, years)
+        counts = counts[counts["Count"] > 0]
+        print(f"\n⚠️  {int(counts['Count'].sum()):,} dekad(s) with {args.column} > {threshold:g} "
+              f"in {len(counts):,} region(s)")
+        if len(counts):
+            print(counts.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
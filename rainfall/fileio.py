@@ -0,0 +1,61 @@
+"""Small file helpers: content hashing and atomic writes."""
+import contextlib
+import hashlib
+import os
+import tempfile
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextlib.contextmanager
+def atomic_output(path):
+    """Yield a temp path next to ``path`` and move it into place on success.
+
+    Readers never observe a partially written file: the final ``os.replace``
+    is atomic on the same filesystem, and the temp file is removed on error.
+    """
+    path = os.fspath(path)
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def atomic_write_bytes(path, data):
+    with atomic_output(path) as tmp_path:
+        with open(tmp_path, "wb") as fh:
+            fh.write(data)
+
+
+def load_or_build(path, version, build, load):
+    """The artifact saved at ``path`` if it was saved for ``version``, else a rebuilt one.
+
+    ``load(path)`` returns ``(artifact, saved_version)``. ``build()`` is only
+    called on a miss, so the frame it needs is only loaded then; its result
+    must have a ``save(path, version)`` method and is persisted when the
+    directory of ``path`` exists.
+    """
+    try:
+        artifact, saved_version = load(path)
+        if saved_version == version:
+            return artifact
+    except (FileNotFoundError, KeyError, ValueError, OSError):
+        pass
+    artifact = build()
+    if os.path.isdir(os.path.dirname(os.fspath(path)) or "."):
+        artifact.save(path, version)
+    return artifact
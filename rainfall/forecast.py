@@ -0,0 +1,67 @@
+"""Loading and summarising the forecasts shown in the dashboard.
+
+``forecast.csv`` is the national forecast from ``notebooks/forecast.ipynb``;
+``region_forecasts.csv`` holds per-region forecasts from
+``python -m rainfall.forecast_engine``.
+"""
+import pandas as pd
+
+from rainfall.paths import FORECAST_CSV, OUTPUTS_DIR
+from rainfall.store import month_names, season_names
+
+REGION_FORECASTS_CSV = OUTPUTS_DIR / "region_forecasts.csv"
+
+
+def load_forecast(path=FORECAST_CSV):
+    """Read the forecast CSV and derive its calendar columns vectorised."""
+    forecast_df = pd.read_csv(path, parse_dates=["ds"])
+    month = forecast_df["ds"].dt.month.to_numpy()
+    forecast_df["month"] = month
+    forecast_df["month_name"] = month_names(month)
+    forecast_df["season"] = season_names(month)
+    return forecast_df
+
+
+def has_interval(forecast_df):
+    return "yhat_lower" in forecast_df.columns and "yhat_upper" in forecast_df.columns
+
+
+def forecast_metrics(forecast_df):
+    return {
+        "days": (forecast_df["ds"].max() - forecast_df["ds"].min()).days,
+        "mean": forecast_df["yhat"].mean(),
+        "max": forecast_df["yhat"].max(),
+        "min": forecast_df["yhat"].min(),
+    }
+
+
+def monthly_forecast(forecast_df):
+    return (
+        forecast_df.groupby(["month", "month_name"], observed=True)["yhat"]
+        .mean()
+        .reset_index()
+    )
+
+
+def seasonal_forecast(forecast_df):
+    seasonal = forecast_df.groupby("season", observed=True)["yhat"].agg(["mean", "std"]).reset_index()
+    seasonal.columns = ["Season", "Average_Rainfall", "Std_Deviation"]
+    return seasonal
+
+
+def forecast_table(forecast_df):
+    """Rounded table shown (and offered for download) under the charts."""
+    table = forecast_df[["ds", "yhat"]].copy()
+    table.columns = ["Date", "Predicted_Rainfall_mm"]
+    table["Predicted_Rainfall_mm"] = table["Predicted_Rainfall_mm"].round(2)
+    if has_interval(forecast_df):
+        table["Lower_Bound"] = forecast_df["yhat_lower"].round(2)
+        table["Upper_Bound"] = forecast_df["yhat_upper"].round(2)
+    return table
+
+
+def load_region_forecasts(path=REGION_FORECASTS_CSV):
+    """Long per-region forecast frame (``ADM2_PCODE, ds, yhat, ...``)."""
+    forecasts = pd.read_csv(path, parse_dates=["ds"])
+    forecasts["ADM2_PCODE"] = forecasts["ADM2_PCODE"].astype("category")
+    return forecasts
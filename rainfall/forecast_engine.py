@@ -0,0 +1,247 @@
+"""Per-region forecasting across a process pool, with a fitted-model cache.
+
+``notebooks/forecast.ipynb`` fits one national Prophet model. This engine fits
+one model per ADM2_PCODE monthly-mean series in parallel worker processes.
+Each fitted model (and its forecast) is serialised under a key derived from
+the series' contents and the model configuration, so a refresh only refits
+the series whose data actually changed. A run over every region then deletes
+the entries it did not use, so superseded models do not pile up release
+after release.
+
+``backend="fourier"`` swaps Prophet for the vectorised seasonal regression in
+``rainfall.fourier``, which fits every region in one batch in milliseconds
+(no pool or model cache needed) with the same output schema.
+
+Usage::
+
+    python -m rainfall.forecast_engine                 # all regions, one worker per CPU
+    python -m rainfall.forecast_engine --workers 4 --periods 12
+    python -m rainfall.forecast_engine --backend fourier
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from rainfall.fileio import atomic_output, atomic_write_bytes
+from rainfall.forecast import REGION_FORECASTS_CSV
+from rainfall.paths import ROOT
+
+MODEL_CACHE_DIR = ROOT / ".cache" / "forecast_models"
+
+FORECAST_COLS = ["ds", "yhat", "yhat_lower", "yhat_upper"]
+BACKENDS = ("prophet", "fourier")
+
+# Same settings as the national model in notebooks/forecast.ipynb
+PROPHET_PARAMS = {
+    "yearly_seasonality": True,
+    "weekly_seasonality": False,
+    "daily_seasonality": False,
+}
+
+
+def monthly_means(df, value="rfh"):
+    """Monthly mean of ``value`` per region, as a long Series indexed by (pcode, month)."""
+    return (
+        df.groupby(["ADM2_PCODE", pd.Grouper(key="date", freq="MS")], observed=True)[value]
+        .mean()
+        .dropna()
+    )
+
+
+def monthly_series(df, value="rfh"):
+    """Monthly mean of ``value`` per region, as ``{pcode: DataFrame(ds, y)}``."""
+    monthly = monthly_means(df, value).reset_index().rename(columns={"date": "ds", value: "y"})
+    return {
+        str(pcode): group[["ds", "y"]].reset_index(drop=True)
+        for pcode, group in monthly.groupby("ADM2_PCODE", observed=True)
+    }
+
+
+def monthly_matrix(df, value="rfh"):
+    """Monthly means as a (month x region) frame; missing months are NaN."""
+    wide = monthly_means(df, value).unstack("ADM2_PCODE")
+    wide.columns = pd.Index(wide.columns.astype(str), name="ADM2_PCODE")
+    return wide
+
+
+def _library_version():
+    try:
+        import prophet
+        return prophet.__version__
+    except ImportError:
+        return None
+
+
+def cache_key(series, periods, params):
+    """Hash of the series contents, horizon, hyperparameters and Prophet version."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+    config = {"periods": periods, "params": params, "prophet": _library_version()}
+    digest.update(json.dumps(config, sort_keys=True).encode())
+    return digest.hexdigest()[:24]
+
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def read_cached(cache_dir, key):
+    try:
+        with open(_cache_path(cache_dir, key)) as fh:
+            entry = json.load(fh)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    forecast = pd.DataFrame(entry["forecast"])
+    forecast["ds"] = pd.to_datetime(forecast["ds"])
+    return forecast
+
+
+def prune_cache(cache_dir, keep):
+    """Delete cached models whose key is not in ``keep``; return how many were removed."""
+    removed = 0
+    for name in os.listdir(cache_dir):
+        key, ext = os.path.splitext(name)
+        if ext == ".json" and key not in keep:
+            os.remove(os.path.join(cache_dir, name))
+            removed += 1
+    return removed
+
+
+def fit_prophet(series, periods, params):
+    """Fit one Prophet model; return ``(forecast, serialised model)``."""
+    import logging
+    from prophet import Prophet
+    from prophet.serialize import model_to_json
+    # cmdstanpy logs two INFO lines per fit; keep worker output readable
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+
+    model = Prophet(**params)
+    model.fit(series)
+    future = model.make_future_dataframe(periods=periods, freq="MS")
+    forecast = model.predict(future)[FORECAST_COLS]
+    return forecast, model_to_json(model)
+
+
+def _fit_task(pcode, series, periods, params, cache_dir, key):
+    """Worker entry point: fit, write the cache entry, return the forecast."""
+    forecast, model_json = fit_prophet(series, periods, params)
+    entry = {
+        "pcode": pcode,
+        "periods": periods,
+        "params": params,
+        "model": model_json,
+        "forecast": {
+            "ds": forecast["ds"].dt.strftime("%Y-%m-%d").tolist(),
+            **{col: forecast[col].tolist() for col in FORECAST_COLS[1:]},
+        },
+    }
+    atomic_write_bytes(_cache_path(cache_dir, key), json.dumps(entry).encode())
+    return pcode, forecast
+
+
+def _prophet_forecasts(series, periods, params, workers, cache_dir, log, prune):
+    params = {**PROPHET_PARAMS, **(params or {})}
+    os.makedirs(cache_dir, exist_ok=True)
+    results, pending, keys = {}, [], set()
+    for pcode, s in series.items():
+        key = cache_key(s, periods, params)
+        keys.add(key)
+        cached = read_cached(cache_dir, key)
+        if cached is not None:
+            results[pcode] = cached
+        else:
+            pending.append((pcode, s, key))
+    log(f"🔁 {len(results)} cached, 🧮 {len(pending)} to fit")
+
+    if pending:
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(pending) == 1:
+            for pcode, s, key in pending:
+                results[pcode] = _fit_task(pcode, s, periods, params, cache_dir, key)[1]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(_fit_task, pcode, s, periods, params, cache_dir, key)
+                    for pcode, s, key in pending
+                ]
+                for future in futures:
+                    pcode, forecast = future.result()
+                    results[pcode] = forecast
+    if prune:
+        removed = prune_cache(cache_dir, keys)
+        if removed:
+            log(f"🧹 {removed} superseded cached model(s) removed")
+    return results
+
+
+def _fourier_forecasts(df, regions, periods, params, log):
+    from rainfall.fourier import fit_predict
+    wide = monthly_matrix(df)
+    if regions is not None:
+        wide = wide[[pcode for pcode in wide.columns if pcode in set(regions)]]
+    if wide.shape[1] == 0:
+        return pd.DataFrame(columns=["ADM2_PCODE"] + FORECAST_COLS)
+    forecasts = fit_predict(wide.dropna(how="all"), periods=periods, **(params or {}))
+    log(f"⚡ {wide.shape[1]} series fitted in one batch")
+    return forecasts
+
+
+def forecast_regions(df, regions=None, periods=12, params=None, workers=None,
+                     backend="prophet", cache_dir=MODEL_CACHE_DIR, log=print):
+    """Forecast every (or the given) region with ``backend``.
+
+    With Prophet, cached series are not refit, and a run over every region
+    removes the cached models it did not use. Returns a long frame
+    ``ADM2_PCODE, ds, yhat, yhat_lower, yhat_upper``.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown forecast backend '{backend}' (choose from {', '.join(BACKENDS)})")
+    if backend == "fourier":
+        # Fitted straight from the (month x region) matrix, no per-region frames
+        return _fourier_forecasts(df, regions, periods, params, log)
+
+    series = monthly_series(df)
+    if regions is not None:
+        series = {pcode: s for pcode, s in series.items() if pcode in set(regions)}
+    results = _prophet_forecasts(series, periods, params, workers, cache_dir, log,
+                                 prune=regions is None)
+
+    frames = [forecast.assign(ADM2_PCODE=pcode) for pcode, forecast in sorted(results.items())]
+    if not frames:
+        return pd.DataFrame(columns=["ADM2_PCODE"] + FORECAST_COLS)
+    return pd.concat(frames, ignore_index=True)[["ADM2_PCODE"] + FORECAST_COLS]
+
+
+def write_region_forecasts(forecasts, path=REGION_FORECASTS_CSV):
+    with atomic_output(path) as tmp_path:
+        forecasts.to_csv(tmp_path, index=False)
+
+
+def main(argv=None):
+    from rainfall.store import load_rainfall
+
+    parser = argparse.ArgumentParser(description="Fit per-region rainfall forecasts.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--periods", type=int, default=12, help="months to forecast")
+    parser.add_argument("--regions", nargs="+", metavar="PCODE", help="only these regions")
+    parser.add_argument("--backend", choices=BACKENDS, default="prophet",
+                        help="forecasting model (default: prophet)")
+    parser.add_argument("--output", default=str(REGION_FORECASTS_CSV))
+    args = parser.parse_args(argv)
+
+    forecasts = forecast_regions(load_rainfall(), regions=args.regions,
+                                 periods=args.periods, workers=args.workers,
+                                 backend=args.backend)
+    write_region_forecasts(forecasts, args.output)
+    print(f"✅ Forecasts for {forecasts['ADM2_PCODE'].nunique()} regions saved to '{args.output}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Vectorised seasonal regression forecaster: a fast alternative to Prophet.
+
+Each monthly series is modelled as a linear trend plus ``order`` yearly
+Fourier harmonics, fitted by ordinary least squares. All regions share the
+same design matrix, so every series is fitted at once with a single
+``lstsq`` on a (months x regions) matrix. Prediction intervals are the
+analytic OLS ones:
+
+    yhat +/- t * s * sqrt(1 + x0 (X'X)^-1 x0')
+
+The output follows Prophet's ``ds, yhat, yhat_lower, yhat_upper`` schema
+(history plus ``periods`` future months) so app.py can plot it unchanged.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_ORDER = 3
+# Prophet's default interval_width
+DEFAULT_INTERVAL_WIDTH = 0.8
+
+
+def design_matrix(month_index, order=DEFAULT_ORDER, trend=True):
+    """Columns ``[1, t, sin(2πkt/12), cos(2πkt/12) for k in 1..order]``."""
+    t = np.asarray(month_index, dtype="float64")
+    columns = [np.ones_like(t)]
+    if trend:
+        columns.append(t / 12.0)
+    for k in range(1, order + 1):
+        angle = 2 * np.pi * k * t / 12.0
+        columns.extend([np.sin(angle), np.cos(angle)])
+    return np.column_stack(columns)
+
+
+def _critical_value(interval_width, dof):
+    try:
+        # scipy.special imports in a fraction of the time of scipy.stats
+        from scipy.special import stdtrit
+        return stdtrit(dof, 0.5 + interval_width / 2)
+    except ImportError:
+        from statistics import NormalDist
+        return NormalDist().inv_cdf(0.5 + interval_width / 2)
+
+
+def _month_index(dates, origin):
+    dates = pd.DatetimeIndex(dates)
+    return (dates.year - origin.year) * 12 + (dates.month - origin.month)
+
+
+def fit_predict(wide, periods=12, order=DEFAULT_ORDER, trend=True,
+                interval_width=DEFAULT_INTERVAL_WIDTH):
+    """Fit every column of ``wide`` (month-start index x series) at once.
+
+    Returns a long frame ``<series>, ds, yhat, yhat_lower, yhat_upper`` (the
+    first column is named after ``wide.columns.name``), series by series.
+    Columns with missing months are fitted on their observed rows only.
+    """
+    wide = wide.sort_index()
+    origin = wide.index[0]
+    future = pd.date_range(wide.index[-1], periods=periods + 1, freq="MS")[1:]
+    ds = wide.index.append(future)
+
+    X = design_matrix(_month_index(wide.index, origin), order, trend)
+    X_all = design_matrix(_month_index(ds, origin), order, trend)
+    Y = wide.to_numpy(dtype="float64")
+    n_params = X.shape[1]
+
+    yhat = np.empty((len(ds), Y.shape[1]))
+    half_width = np.empty_like(yhat)
+
+    observed = ~np.isnan(Y)
+    complete = observed.all(axis=0)
+    # Group series by missing-value pattern; normally a single complete group
+    patterns = {}
+    for j in range(Y.shape[1]):
+        key = b"" if complete[j] else observed[:, j].tobytes()
+        patterns.setdefault(key, []).append(j)
+
+    for cols in patterns.values():
+        rows = observed[:, cols[0]]
+        Xp, Yp = X[rows], Y[rows][:, cols]
+        dof = len(Xp) - n_params
+        if dof <= 0:
+            yhat[:, cols] = np.nan
+            half_width[:, cols] = np.nan
+            continue
+        beta, _, _, _ = np.linalg.lstsq(Xp, Yp, rcond=None)
+        resid = Yp - Xp @ beta
+        sigma = np.sqrt((resid ** 2).sum(axis=0) / dof)
+        xtx_inv = np.linalg.pinv(Xp.T @ Xp)
+        leverage = np.einsum("ij,jk,ik->i", X_all, xtx_inv, X_all)
+        scale = _critical_value(interval_width, dof) * np.sqrt(1.0 + leverage)
+        yhat[:, cols] = X_all @ beta
+        half_width[:, cols] = np.outer(scale, sigma)
+
+    # Column-major ravel: all dates of the first series, then the next, ...
+    return pd.DataFrame({
+        wide.columns.name or "series": np.repeat(np.asarray(wide.columns), len(ds)),
+        "ds": np.tile(ds.to_numpy(), Y.shape[1]),
+        "yhat": yhat.ravel(order="F"),
+        "yhat_lower": (yhat - half_width).ravel(order="F"),
+        "yhat_upper": (yhat + half_width).ravel(order="F"),
+    })
+
+
+def forecast_series(series_by_key, periods=12, **kwargs):
+    """Batch-forecast ``{key: DataFrame(ds, y)}``; returns ``{key: forecast}``."""
+    wide = pd.DataFrame({key: s.set_index("ds")["y"] for key, s in series_by_key.items()})
+    wide.columns.name = "series"
+    forecasts = fit_predict(wide, periods=periods, **kwargs)
+    return {
+        key: group.drop(columns="series").reset_index(drop=True)
+        for key, group in forecasts.groupby("series", sort=False)
+    }
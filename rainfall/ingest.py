@@ -0,0 +1,172 @@
+"""Incremental (append/upsert) ingestion of new dekadal rainfall releases.
+
+The raw export is a rolling five-year file that is re-published every dekad.
+Re-cleaning all of it on each release is wasted work: only rows dated after
+the store's high-water mark, or rows that were provisional (``version`` not
+``final``) and have since changed version, are new information.
+
+``ingest`` scans the raw file in chunks, keeps only those delta rows (using
+plain string comparisons, before any parsing), cleans just the delta, writes
+it as a store delta part and updates the persisted aggregate cube and
+time rollup by difference. Cleaning, merging and aggregation therefore scale with the delta.
+
+Backfills of old, already-final rows are not detected; run the full pipeline
+(``python -m rainfall.pipeline --force``) for those.
+
+Usage::
+
+    python -m rainfall.ingest                 # ingest data/btn-rainfall-adm2-5ytd.csv
+    python -m rainfall.ingest path/to/new.csv --compact
+"""
+import argparse
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from rainfall.cleaning import clean_rainfall, has_hxl_row
+from rainfall.cube import RainfallCube, build_cube, cube_path
+from rainfall.paths import CLEANED_CSV, CLUSTER_MODEL, RAW_CSV, STORE_DIR
+from rainfall.rollup import Rollup, build_rollup, rollup_path
+from rainfall.store import (KEY_COLS, append_delta, compact_frame,
+                            compact_store, is_fresh, read_manifest, read_store,
+                            row_keys, tracking_info, write_manifest)
+
+CHUNK_SIZE = 50_000
+# Fold delta parts into the base file once this many have accumulated
+MAX_DELTA_PARTS = 24
+
+
+def read_delta_rows(raw_path, high_water_mark, open_rows, chunksize=CHUNK_SIZE):
+    """Raw rows newer than ``high_water_mark`` or whose open version changed.
+
+    Rows are read as strings; ISO dates compare correctly as text, so nothing
+    outside the delta is parsed.
+    """
+    skiprows = [1] if has_hxl_row(raw_path) else None
+    parts = []
+    for chunk in pd.read_csv(raw_path, dtype=str, skiprows=skiprows, chunksize=chunksize):
+        if high_water_mark:
+            keep = (chunk["date"] > high_water_mark).to_numpy(dtype=bool, copy=True)
+        else:
+            keep = np.ones(len(chunk), dtype=bool)
+        if open_rows:
+            keys = chunk["date"] + "|" + chunk["ADM2_PCODE"]
+            previous = keys.map(open_rows)
+            keep |= (previous.notna() & (previous != chunk["version"])).to_numpy(dtype=bool)
+        if keep.any():
+            parts.append(chunk.loc[keep])
+    if not parts:
+        return None
+    return pd.concat(parts, ignore_index=True)
+
+
+def _delta_version(previous, delta):
+    digest = hashlib.sha256(previous.encode())
+    digest.update(pd.util.hash_pandas_object(delta, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def ingest(raw_path=RAW_CSV, csv_path=CLEANED_CSV, store_dir=STORE_DIR, compact=False,
+           update_clusters=True, log=print):
+    """Upsert the delta of ``raw_path`` into the store; return the delta row count.
+
+    With ``update_clusters``, the regions in the delta are re-assigned to the
+    persisted cluster centroids (``outputs/cluster_model.npz``) when present;
+    the fitted cluster tables are not rewritten.
+    """
+    manifest = read_manifest(store_dir)
+    if not is_fresh(manifest, csv_path, store_dir):
+        # No usable store yet: build it (and the cube and rollup) from the cleaned CSV first
+        from rainfall.store import build_store
+        df, manifest = build_store(csv_path, store_dir)
+        build_cube(df).save(cube_path(store_dir), manifest["version"])
+        build_rollup(df).save(rollup_path(store_dir), manifest["version"])
+        log(f"🧱 built store from {os.path.basename(csv_path)}")
+
+    hwm = manifest.get("high_water_mark")
+    open_rows = manifest.get("open_rows", {})
+    raw_delta = read_delta_rows(raw_path, hwm, open_rows)
+    if raw_delta is None:
+        log(f"✅ up to date (high-water mark {hwm})")
+        return 0
+
+    delta = compact_frame(clean_rainfall(raw_delta))
+    keys = row_keys(delta)
+    replaced_keys = set(keys[keys.isin(open_rows)])
+
+    # Rows being replaced, read from the recent tail only
+    removed = touched = None
+    if replaced_keys:
+        replaced = delta[keys.isin(replaced_keys)]
+        start = replaced["date"].min().to_period("M").to_timestamp()
+        tail = read_store(manifest, store_dir, filters=[("date", ">=", start)])
+        removed = tail[row_keys(tail).isin(replaced_keys)]
+        touched = pd.concat([tail, delta], ignore_index=True).drop_duplicates(KEY_COLS, keep="last")
+
+    try:
+        cube, cube_version = RainfallCube.load(cube_path(store_dir))
+    except (FileNotFoundError, KeyError, ValueError, OSError):
+        cube, cube_version = None, None
+    if cube is not None and cube_version != manifest["version"]:
+        cube = None
+    try:
+        rollup, rollup_version = Rollup.load(rollup_path(store_dir))
+    except (FileNotFoundError, KeyError, ValueError, OSError):
+        rollup, rollup_version = None, None
+    if rollup is not None and rollup_version != manifest["version"]:
+        rollup = None
+
+    append_delta(delta, manifest, store_dir)
+    new_version = _delta_version(manifest["version"], raw_delta)
+
+    tracking = tracking_info(delta)
+    for key in replaced_keys:
+        open_rows.pop(key, None)
+    open_rows.update(tracking["open_rows"])
+    manifest["open_rows"] = open_rows
+    if hwm is None or tracking["high_water_mark"] > hwm:
+        manifest["high_water_mark"] = tracking["high_water_mark"]
+    manifest["rows"] += len(delta) - len(replaced_keys)
+    manifest["version"] = new_version
+
+    if cube is not None:
+        cube.apply_delta(delta, removed, touched)
+        cube.save(cube_path(store_dir), new_version)
+    if rollup is not None:
+        rollup.apply_delta(delta, removed)
+        rollup.save(rollup_path(store_dir), new_version)
+    write_manifest(manifest, store_dir)
+
+    log(f"✅ ingested {len(delta):,} rows "
+        f"({len(delta) - len(replaced_keys):,} new, {len(replaced_keys):,} updated); "
+        f"high-water mark {manifest['high_water_mark']}")
+
+    if update_clusters and os.path.exists(CLUSTER_MODEL):
+        from rainfall.clustering import assign_regions, monthly_profiles
+        regions = sorted(delta["ADM2_PCODE"].astype(str).unique())
+        history = read_store(manifest, store_dir, filters=[("ADM2_PCODE", "in", regions)])
+        labels = assign_regions(monthly_profiles(history))
+        log(f"🏷️  assigned {len(labels):,} region(s) to the stored clusters")
+
+    if compact or len(manifest["deltas"]) >= MAX_DELTA_PARTS:
+        compact_store(store_dir)
+        log("🗜️  compacted delta parts into the base file")
+    return len(delta)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Upsert a new rainfall release into the store.")
+    parser.add_argument("raw", nargs="?", default=str(RAW_CSV), help="raw HDX/CHIRPS ADM2 CSV")
+    parser.add_argument("--compact", action="store_true", help="fold delta parts into the base file")
+    parser.add_argument("--no-clusters", action="store_true",
+                        help="do not re-assign the delta's regions to the stored clusters")
+    args = parser.parse_args(argv)
+    ingest(args.raw, compact=args.compact, update_clusters=not args.no_clusters)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
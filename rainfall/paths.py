@@ -0,0 +1,21 @@
+"""Project file locations, resolved from the repository root."""
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DATA_DIR = ROOT / "data"
+OUTPUTS_DIR = ROOT / "outputs"
+
+RAW_CSV = DATA_DIR / "btn-rainfall-adm2-5ytd.csv"
+CLEANED_CSV = DATA_DIR / "cleaned_btn_rainfall.csv"
+
+# Generated columnar copy of the cleaned dataset (not committed)
+STORE_DIR = DATA_DIR / "store"
+
+FORECAST_CSV = OUTPUTS_DIR / "forecast.csv"
+CLUSTER_SUMMARY_CSV = OUTPUTS_DIR / "cluster_summary.csv"
+MONTHLY_REGION_CLUSTERS_CSV = OUTPUTS_DIR / "monthly_region_clusters.csv"
+CLUSTER_MODEL = OUTPUTS_DIR / "cluster_model.npz"
+CLUSTER_SCORES_CSV = OUTPUTS_DIR / "cluster_k_scores.csv"
+# Regions assigned by the incremental ingest since the last refit
+CLUSTER_ASSIGNMENTS_CSV = OUTPUTS_DIR / "cluster_assignments.csv"
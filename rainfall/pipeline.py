@@ -0,0 +1,296 @@
+"""Headless batch pipeline replacing the notebook's cleaning/clustering cells.
+
+Stages form a small DAG (``clean`` -> ``store`` -> ``decomposition`` /
+``rollup`` / ``spi`` / ``extremes`` / ``return_periods``, and ``clean`` -> ``clusters`` / ``region_forecasts``). Each stage
+declares its input and output files; a stage is skipped when the content hash
+of every input, its parameters and its recorded outputs are unchanged since
+the last successful run. Outputs are written atomically.
+
+``region_forecasts`` refits a Prophet model per region whenever the cleaned
+data changes, so it is on demand: it only runs when named with ``--only``.
+
+Usage::
+
+    python -m rainfall.pipeline            # run whatever is out of date
+    python -m rainfall.pipeline --force    # rerun every stage
+    python -m rainfall.pipeline --only clusters --dry-run
+    python -m rainfall.pipeline --only region_forecasts
+"""
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+
+from rainfall.cleaning import write_cleaned_csv
+from rainfall.fileio import atomic_output, atomic_write_bytes, file_hash
+from rainfall.paths import (CLEANED_CSV, CLUSTER_ASSIGNMENTS_CSV, CLUSTER_MODEL,
+                            CLUSTER_SCORES_CSV, CLUSTER_SUMMARY_CSV, MONTHLY_REGION_CLUSTERS_CSV,
+                            OUTPUTS_DIR, RAW_CSV, ROOT, STORE_DIR)
+
+STATE_FILE = OUTPUTS_DIR / ".pipeline_state.json"
+
+
+class Stage:
+    """One pipeline step: ``run(stage)`` reads ``inputs`` and writes ``outputs``.
+
+    An ``on_demand`` stage is left out of a run unless it is named in ``only``.
+    """
+
+    def __init__(self, name, inputs, outputs, run, deps=(), params=None, on_demand=False):
+        self.name = name
+        self.inputs = [os.fspath(p) for p in inputs]
+        self.outputs = [os.fspath(p) for p in outputs]
+        self.run = run
+        self.deps = tuple(deps)
+        self.params = params or {}
+        self.on_demand = on_demand
+
+
+# ---- stage implementations ----------------------------------------------------
+
+def run_clean(stage):
+    # Streamed chunk by chunk: memory stays bounded however long the export is
+    with atomic_output(stage.outputs[0]) as tmp_path:
+        write_cleaned_csv(stage.inputs[0], tmp_path)
+
+
+def run_store(stage):
+    # Rebuilt only if the cleaned CSV differs from the one the store was built
+    # from. The stage also reruns when ingest compaction rewrote the Parquet
+    # file; a rebuild then would drop the ingested rows
+    from rainfall.store import ensure_store
+    ensure_store(stage.inputs[0], os.path.dirname(stage.outputs[0]))
+
+
+def run_clusters(stage):
+    from rainfall.clustering import ClusterModel, evaluate_k, monthly_profiles, with_clusters
+    params = dict(stage.params)
+    k_values = params.pop("k_values")
+    df = pd.read_csv(stage.inputs[0])
+    profiles = monthly_profiles(df)
+    model = ClusterModel.fit(profiles, **params)
+    payload = with_clusters(profiles, model).to_csv().encode()
+    for path in stage.outputs[:2]:
+        atomic_write_bytes(path, payload)
+    model.save(stage.outputs[2])
+    scores = evaluate_k(profiles, k_values, random_state=params["random_state"])
+    atomic_write_bytes(stage.outputs[3], scores.to_csv(index=False).encode())
+    # The refit covers every region the ingest assigned since the last one
+    if os.path.exists(CLUSTER_ASSIGNMENTS_CSV):
+        os.remove(CLUSTER_ASSIGNMENTS_CSV)
+
+
+def store_artifact(module, builder):
+    """Stage runner that builds an artifact from the store and saves it next to it.
+
+    ``module.builder(df)`` must return an object with ``save(path, version)``.
+    The frame is read through the store (not re-parsed from the CSV) and the
+    artifact is tagged with the store's dataset version, which is what the
+    dashboard checks - also after an incremental ingest.
+    """
+    def run(stage):
+        from importlib import import_module
+        from rainfall.store import dataset_version, load_rainfall
+        build = getattr(import_module(module), builder)
+        csv_path, store_dir = stage.inputs[0], os.path.dirname(stage.outputs[0])
+        df = load_rainfall(csv_path, store_dir)
+        build(df).save(stage.outputs[0], dataset_version(csv_path, store_dir))
+    return run
+
+
+def run_region_forecasts(stage):
+    from rainfall.forecast_engine import forecast_regions, write_region_forecasts
+    from rainfall.store import read_cleaned_csv
+    forecasts = forecast_regions(read_cleaned_csv(stage.inputs[0]), **stage.params)
+    write_region_forecasts(forecasts, stage.outputs[0])
+
+
+def default_stages():
+    from rainfall.clustering import K_RANGE, N_CLUSTERS, RANDOM_STATE
+    from rainfall.decomposition import DECOMPOSITION_FILE
+    from rainfall.extremes import EXTREMES_FILE
+    from rainfall.forecast import REGION_FORECASTS_CSV
+    from rainfall.return_periods import RETURN_PERIODS_FILE
+    from rainfall.rollup import ROLLUP_FILE
+    from rainfall.spi import SPI_FILE
+    from rainfall.store import DATA_FILE
+    return [
+        Stage("clean", [RAW_CSV], [CLEANED_CSV], run_clean),
+        Stage("store", [CLEANED_CSV], [STORE_DIR / DATA_FILE], run_store, deps=["clean"]),
+        Stage("clusters", [CLEANED_CSV],
+              [MONTHLY_REGION_CLUSTERS_CSV, CLUSTER_SUMMARY_CSV, CLUSTER_MODEL,
+               CLUSTER_SCORES_CSV],
+              run_clusters, deps=["clean"],
+              params={"n_clusters": N_CLUSTERS, "random_state": RANDOM_STATE,
+                      "k_values": list(K_RANGE)}),
+        Stage("decomposition", [CLEANED_CSV], [STORE_DIR / DECOMPOSITION_FILE],
+              store_artifact("rainfall.decomposition", "build_decomposition"), deps=["store"]),
+        Stage("rollup", [CLEANED_CSV], [STORE_DIR / ROLLUP_FILE],
+              store_artifact("rainfall.rollup", "build_rollup"), deps=["store"]),
+        Stage("spi", [CLEANED_CSV], [STORE_DIR / SPI_FILE],
+              store_artifact("rainfall.spi", "build_spi"), deps=["store"]),
+        Stage("extremes", [CLEANED_CSV], [STORE_DIR / EXTREMES_FILE],
+              store_artifact("rainfall.extremes", "build_extreme_index"), deps=["store"]),
+        Stage("return_periods", [CLEANED_CSV], [STORE_DIR / RETURN_PERIODS_FILE],
+              store_artifact("rainfall.return_periods", "build_return_periods"), deps=["store"]),
+        # Per-series model cache: only regions with new data are refit
+        Stage("region_forecasts", [CLEANED_CSV], [REGION_FORECASTS_CSV],
+              run_region_forecasts, deps=["clean"],
+              params={"periods": 12, "backend": "prophet"}, on_demand=True),
+    ]
+
+
+# ---- DAG runner -----------------------------------------------------------------
+
+def _relpath(path):
+    try:
+        return os.path.relpath(path, ROOT)
+    except ValueError:
+        return path
+
+
+class HashMemo:
+    """Content hashes, reused while a file's size and mtime are unchanged."""
+
+    def __init__(self, files):
+        self.files = files
+
+    def __call__(self, path):
+        stat = os.stat(path)
+        key = _relpath(path)
+        entry = self.files.get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha256"]
+        sha256 = file_hash(path)
+        self.files[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+        return sha256
+
+
+def load_state(path=STATE_FILE):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"stages": {}, "files": {}}
+
+
+def save_state(state, path=STATE_FILE):
+    atomic_write_bytes(path, json.dumps(state, indent=2, sort_keys=True).encode())
+
+
+def topological_order(stages, only=None):
+    """Stages in dependency order, restricted to ``only`` and their ancestors.
+
+    Without ``only``, every stage except the ``on_demand`` ones.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    wanted = set(only or [stage.name for stage in stages if not stage.on_demand])
+    unknown = wanted - set(by_name)
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+
+    ordered, visiting, done = [], set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle at stage '{name}'")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+        ordered.append(by_name[name])
+
+    for name in by_name:
+        if name in wanted:
+            visit(name)
+    return ordered
+
+
+def _fingerprint(stage, hash_file):
+    # A missing input (e.g. an upstream output in a dry run) fingerprints as None
+    return {
+        "inputs": {_relpath(p): hash_file(p) if os.path.exists(p) else None
+                   for p in stage.inputs},
+        "params": stage.params,
+    }
+
+
+def _is_current(stage, record, fingerprint, hash_file):
+    if not record or record.get("fingerprint") != fingerprint:
+        return False
+    for path in stage.outputs:
+        if not os.path.exists(path):
+            return False
+        if hash_file(path) != record["outputs"].get(_relpath(path)):
+            return False
+    return True
+
+
+def run_pipeline(stages=None, only=None, force=False, dry_run=False,
+                 state_path=STATE_FILE, log=print):
+    """Run out-of-date stages in dependency order; return ``{stage: status}``.
+
+    ``force`` applies to the stages named in ``only`` (or to every stage when
+    ``only`` is not given); their ancestors still run only if out of date.
+    """
+    stages = topological_order(stages or default_stages(), only)
+    forced = {stage.name for stage in stages} if only is None else set(only)
+    state = load_state(state_path)
+    hash_file = HashMemo(state.setdefault("files", {}))
+    results = {}
+    # Stages a dry run would run: their outputs, and so their dependents'
+    # inputs, would change
+    pending = set()
+
+    for stage in stages:
+        fingerprint = _fingerprint(stage, hash_file)
+        record = state["stages"].get(stage.name)
+        upstream_pending = any(dep in pending for dep in stage.deps)
+        if (not upstream_pending and not (force and stage.name in forced)
+                and _is_current(stage, record, fingerprint, hash_file)):
+            results[stage.name] = "skipped"
+            log(f"⏭️  {stage.name}: up to date")
+            continue
+        if dry_run:
+            pending.add(stage.name)
+            results[stage.name] = "pending"
+            log(f"📝 {stage.name}: would run")
+            continue
+
+        log(f"▶️  {stage.name}: running")
+        stage.run(stage)
+        state["stages"][stage.name] = {
+            "fingerprint": fingerprint,
+            "outputs": {_relpath(p): hash_file(p) for p in stage.outputs},
+        }
+        save_state(state, state_path)
+        results[stage.name] = "ran"
+        log(f"✅ {stage.name}: done")
+
+    if dry_run:
+        return results
+    save_state(state, state_path)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild cleaned data and analysis outputs.")
+    parser.add_argument("--only", nargs="+", metavar="STAGE",
+                        help="run only these stages (and the stages they depend on)")
+    parser.add_argument("--force", action="store_true", help="rerun stages even if up to date")
+    parser.add_argument("--dry-run", action="store_true", help="report what would run")
+    args = parser.parse_args(argv)
+    try:
+        run_pipeline(only=args.only, force=args.force, dry_run=args.dry_run)
+    except ValueError as exc:
+        parser.error(str(exc))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
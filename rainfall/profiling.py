@@ -0,0 +1,180 @@
+"""Opt-in per-rerun timing and memory instrumentation.
+
+Enabled for every rerun with ``RAINFALL_PROFILE=1`` in the environment. With
+``RAINFALL_PROFILE=url`` only reruns opened with ``?profile=1`` in the
+dashboard URL are profiled; without the env var the query parameter is
+ignored, so visitors cannot switch it on. While a :class:`RerunProfiler` is
+active, every ``with stage("name"):`` block - in app.py and in the library
+code it calls - records its wall time, the peak memory allocated inside it
+(``tracemalloc``) and, for charts, the size of the figure's JSON. Nested
+stages are recorded with their depth. When profiling is off, ``stage`` is a no-op.
+
+``tracemalloc`` is process-wide and slows allocation-heavy code down, so
+it only runs while a profiled rerun is in progress: the profiler that starts
+tracing stops it in :meth:`RerunProfiler.finish`, or on the way out of
+:func:`profiled_rerun` when the rerun raised or was stopped before finishing. Only one rerun at a time
+traces memory (its peak counter would be reset by the others); reruns
+profiled concurrently record timings only.
+
+Each finished rerun is written as one JSON line to the ``rainfall.profile``
+logger and appended to ``.cache/profile.jsonl`` (override with
+``RAINFALL_PROFILE_LOG``).
+"""
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+from rainfall.paths import ROOT
+
+ENV_VAR = "RAINFALL_PROFILE"
+# RAINFALL_PROFILE value that lets ?profile=1 turn profiling on per rerun
+URL_OPT_IN = "url"
+QUERY_PARAM = "profile"
+LOG_ENV_VAR = "RAINFALL_PROFILE_LOG"
+DEFAULT_LOG_PATH = ROOT / ".cache" / "profile.jsonl"
+
+logger = logging.getLogger("rainfall.profile")
+
+# Profiler of the rerun running in this thread/context (None when off)
+_active = contextvars.ContextVar("rainfall_profiler", default=None)
+# Serialises the single memory-tracing slot
+_tracing_lock = threading.Lock()
+
+
+def _truthy(value):
+    if isinstance(value, (list, tuple)):
+        value = value[-1] if value else ""
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def profiling_enabled(environ=os.environ, query_params=None):
+    """True if the env var turns profiling on, or allows the query parameter and it is set."""
+    setting = environ.get(ENV_VAR, "").strip().lower()
+    if _truthy(setting):
+        return True
+    return (setting == URL_OPT_IN and query_params is not None
+            and _truthy(query_params.get(QUERY_PARAM, "")))
+
+
+def stage(name, figure=None, **fields):
+    """Time a block under the active profiler; a no-op when profiling is off."""
+    profiler = _active.get()
+    if profiler is None:
+        return nullcontext()
+    return profiler.stage(name, figure=figure, **fields)
+
+
+def start_rerun(enabled):
+    """Begin a script run: a fresh active profiler, or none when ``enabled`` is false.
+
+    Always (re)sets the active profiler, so a run that died mid-way cannot
+    leave its profiler collecting stages of the next one (or tracing memory).
+    """
+    stale = _active.get()
+    if stale is not None:
+        stale.deactivate()
+    if not enabled:
+        _active.set(None)
+        return None
+    return RerunProfiler().activate()
+
+
+@contextmanager
+def profiled_rerun(enabled):
+    """Wrap a script run: yields :func:`start_rerun`'s profiler (or None).
+
+    The profiler is deactivated on the way out, so memory tracing stops even
+    when the run raises (an error, ``st.stop()``, a newer rerun) before
+    :meth:`RerunProfiler.finish` is reached.
+    """
+    profiler = start_rerun(enabled)
+    try:
+        yield profiler
+    finally:
+        if profiler is not None:
+            profiler.deactivate()
+
+
+class RerunProfiler:
+    """Collects the stages of one script run."""
+
+    def __init__(self, trace_memory=True):
+        self.records = []
+        self._stack = []
+        self._started = time.perf_counter()
+        # Trace memory only if tracing is off: then this profiler owns it and
+        # stops it when done. Otherwise another rerun (or the host process)
+        # is tracing and resetting the peak here would corrupt its numbers.
+        self.trace_memory = False
+        if trace_memory:
+            with _tracing_lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self.trace_memory = True
+
+    def activate(self):
+        _active.set(self)
+        return self
+
+    def deactivate(self):
+        """Stop collecting, and stop memory tracing if this profiler started it."""
+        if _active.get() is self:
+            _active.set(None)
+        if self.trace_memory:
+            with _tracing_lock:
+                tracemalloc.stop()
+            self.trace_memory = False
+
+    @contextmanager
+    def stage(self, name, figure=None, **fields):
+        record = {"stage": name, "depth": len(self._stack), **fields}
+        self.records.append(record)
+        frame = {"start": 0, "peak": 0}
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # Keep the parent's peak so far before resetting the counter
+                parent = self._stack[-1]
+                parent["peak"] = max(parent["peak"], peak)
+            tracemalloc.reset_peak()
+            frame = {"start": current, "peak": current}
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["ms"] = round((time.perf_counter() - start) * 1000, 3)
+            self._stack.pop()
+            if self.trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], frame["peak"])
+                record["peak_kb"] = round((peak - frame["start"]) / 1024, 1)
+                if self._stack:
+                    self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            if figure is not None:
+                record["figure_kb"] = round(len(figure.to_json()) / 1024, 1)
+
+    def summary(self):
+        return {
+            "total_ms": round((time.perf_counter() - self._started) * 1000, 3),
+            "stages": list(self.records),
+        }
+
+    def finish(self, log_path=None, **fields):
+        """Deactivate, log the rerun as one JSON line and return its summary."""
+        self.deactivate()
+        summary = {"ts": time.strftime("%Y-%m-%dT%H:%M:%S%z"), **fields, **self.summary()}
+        line = json.dumps(summary, default=str)
+        logger.info(line)
+        path = log_path or os.environ.get(LOG_ENV_VAR) or DEFAULT_LOG_PATH
+        try:
+            os.makedirs(os.path.dirname(os.fspath(path)), exist_ok=True)
+            with open(path, "a") as fh:
+                fh.write(line + "\n")
+        except OSError as exc:
+            logger.warning("could not write profile log %s: %s", path, exc)
+        return summary
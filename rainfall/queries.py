@@ -0,0 +1,127 @@
+"""Memoized filter-and-aggregate layer for the dashboard charts.
+
+Streamlit reruns app.py top to bottom on every widget interaction. The chart
+inputs only depend on the selected regions and year range, so they are
+computed once per canonical (regions, year_range) query and kept in a bounded
+LRU shared by every session of the worker process.
+
+The aggregations come from a query engine: the in-memory aggregate cube by
+default, or SQL over the Parquet store with ``RAINFALL_QUERY_BACKEND=duckdb``
+(see rainfall/sql.py) when the archive is too large for worker memory.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from rainfall.profiling import stage
+
+HISTOGRAM_BINS = 30
+
+BACKEND_ENV_VAR = "RAINFALL_QUERY_BACKEND"
+QUERY_BACKENDS = ("cube", "duckdb")
+
+
+def query_backend(environ=os.environ):
+    """Query engine selected by ``RAINFALL_QUERY_BACKEND`` (default ``cube``)."""
+    backend = environ.get(BACKEND_ENV_VAR, "").strip().lower() or QUERY_BACKENDS[0]
+    if backend not in QUERY_BACKENDS:
+        raise ValueError(f"{BACKEND_ENV_VAR} must be one of {QUERY_BACKENDS}, got '{backend}'")
+    return backend
+
+
+def canonical_query(regions, year_range):
+    """Normalise a selection into a hashable key (sorted, de-duplicated)."""
+    regions = tuple(sorted({str(r) for r in regions}))
+    y0, y1 = year_range
+    return regions, (int(y0), int(y1))
+
+
+class LRUCache:
+    """Thread-safe LRU with optional time-to-live and hit/miss counters."""
+
+    def __init__(self, max_entries=256, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._data),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def compute_dashboard_frames(cube, regions, year_range):
+    """Build every chart input for one canonical selection.
+
+    All inputs are bounded summaries (``HISTOGRAM_BINS`` bars, one box per
+    month, one row per region), never raw rows. The rainfall trend is read
+    from the time rollup (rainfall/rollup.py) instead.
+    """
+    with stage("filter"):
+        row_count = cube.row_count(regions, year_range)
+    with stage("histogram"):
+        counts, edges = cube.histogram(regions, year_range, nbins=HISTOGRAM_BINS)
+    with stage("distribution"):
+        distribution = cube.distribution(regions, year_range)
+    with stage("box by month"):
+        month_stats = cube.month_distribution(regions, year_range)
+    with stage("regional stats"):
+        regional_avg = cube.region_stats(regions, year_range)
+    return {
+        "row_count": row_count,
+        "histogram": {"counts": counts, "edges": edges},
+        "distribution": distribution,
+        "month_stats": month_stats,
+        "regional_avg": regional_avg,
+    }
+
+
+def dashboard_frames(cache, cube, regions, year_range, version=None):
+    """Cached :func:`compute_dashboard_frames` keyed on the canonical query.
+
+    ``version`` identifies the dataset so entries computed before an ingest
+    are never served for the new data.
+    """
+    regions, year_range = canonical_query(regions, year_range)
+    return cache.get_or_compute(
+        ("dashboard", version, regions, year_range),
+        lambda: compute_dashboard_frames(cube, regions, year_range),
+    )
@@ -0,0 +1,207 @@
+"""Return-period rainfall per region from annual dekadal maxima.
+
+For every region the largest dekadal ``rfh`` of each complete year is taken
+as a block maximum, and a GEV and a Gumbel distribution are fitted to the
+maxima of all regions at once by the method of L-moments:
+
+* the sample L-moments come from probability-weighted moments of each
+  region's sorted maxima, computed on one (region x year) array;
+* GEV parameters use Hosking's approximation of the shape from the L-skewness,
+  Gumbel parameters follow in closed form from the first two L-moments.
+
+There is no per-region optimizer call. The T-year return level is the
+quantile with annual non-exceedance probability ``1 - 1/T``. Years with
+fewer than ``MIN_DEKADS`` observed dekads (e.g. a year still in progress)
+are left out, and regions with fewer than ``MIN_YEARS`` maxima get no fit.
+With only a few years of history the estimates - the GEV shape above all -
+are indicative; long return periods extrapolate far beyond the record.
+
+The fit is persisted next to the store, tagged with the dataset version,
+like the decomposition, so new data triggers a refit.
+"""
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from rainfall.decomposition import DEKADS_PER_YEAR, dekadal_matrix
+from rainfall.fileio import atomic_write_bytes
+from rainfall.paths import STORE_DIR
+
+RETURN_PERIODS_FILE = "return_periods.npz"
+
+DISTRIBUTIONS = ("gev", "gumbel")
+# Return periods (years) reported in tables
+RETURN_PERIODS = (2, 5, 10, 25, 50, 100)
+MIN_YEARS = 3
+MIN_DEKADS = 33
+EULER_GAMMA = 0.5772156649015329
+
+
+def annual_maxima(df, value="rfh", min_dekads=MIN_DEKADS):
+    """Largest dekadal value per region and calendar year.
+
+    Returns ``(regions, years, maxima)``; years with fewer than
+    ``min_dekads`` observed dekads are NaN. Gaps are not interpolated, so
+    only observed dekads count towards completeness.
+    """
+    regions, first, matrix = dekadal_matrix(df, value, interpolate=False)
+    blocks = matrix.reshape(len(regions), -1, DEKADS_PER_YEAR)
+    years = first // DEKADS_PER_YEAR + np.arange(blocks.shape[1])
+    complete = np.isfinite(blocks).sum(axis=2) >= min_dekads
+    with np.errstate(invalid="ignore"):
+        maxima = np.where(complete, np.nanmax(np.where(complete[..., None], blocks, -np.inf), axis=2), np.nan)
+    return regions, years, maxima
+
+
+def l_moments(samples, min_samples=MIN_YEARS):
+    """First two L-moments and the L-skewness of each row: ``(l1, l2, t3)``.
+
+    NaNs are ignored; rows with fewer than ``min_samples`` values are NaN.
+    """
+    x = np.sort(np.asarray(samples, dtype="float64"), axis=1)  # NaNs sort last
+    n = np.isfinite(x).sum(axis=1)[:, None].astype("float64")
+    i = np.arange(x.shape[1])[None, :].astype("float64")
+    values = np.where(np.isfinite(x), x, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        b0 = values.sum(axis=1) / n[:, 0]
+        b1 = (values * i / (n - 1)).sum(axis=1) / n[:, 0]
+        b2 = (values * i * (i - 1) / ((n - 1) * (n - 2))).sum(axis=1) / n[:, 0]
+        l1, l2, l3 = b0, 2 * b1 - b0, 6 * b2 - 6 * b1 + b0
+        t3 = l3 / l2
+    ok = (n[:, 0] >= min_samples) & (l2 > 0)
+    return np.where(ok, l1, np.nan), np.where(ok, l2, np.nan), np.where(ok, t3, np.nan)
+
+
+def fit_gumbel(l1, l2):
+    """Gumbel ``(location, scale)`` from the first two L-moments."""
+    scale = l2 / np.log(2)
+    return l1 - EULER_GAMMA * scale, scale
+
+
+def fit_gev(l1, l2, t3):
+    """GEV ``(location, scale, shape)`` from L-moments (Hosking, 1985).
+
+    ``shape`` follows Hosking's sign convention: negative values have a heavy
+    upper tail, zero is the Gumbel distribution.
+    """
+    from scipy.special import gamma
+
+    c = 2 / (3 + t3) - np.log(2) / np.log(3)
+    shape = 7.8590 * c + 2.9554 * c ** 2
+    gumbel_loc, gumbel_scale = fit_gumbel(l1, l2)
+    small = np.abs(shape) < 1e-6
+    k = np.where(small, 1.0, shape)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        g = gamma(1 + k)
+        scale = l2 * k / ((1 - 2.0 ** -k) * g)
+        loc = l1 - scale * (1 - g) / k
+    # The GEV mean only exists for shape > -1
+    ok = np.isfinite(scale) & (shape > -1)
+    scale = np.where(small, gumbel_scale, np.where(ok, scale, np.nan))
+    loc = np.where(small, gumbel_loc, np.where(ok, loc, np.nan))
+    return loc, scale, np.where(np.isfinite(loc), shape, np.nan)
+
+
+def return_level(params, periods, distribution="gev"):
+    """Return levels ``[region, period]`` for fitted ``params`` and periods in years."""
+    y = -np.log(1 - 1 / np.asarray(periods, dtype="float64"))[None, :]  # -ln F
+    if distribution == "gumbel":
+        loc, scale = (p[:, None] for p in params)
+        return loc - scale * np.log(y)
+    if distribution != "gev":
+        raise ValueError(f"Unknown distribution '{distribution}' (choose from {', '.join(DISTRIBUTIONS)})")
+    loc, scale, shape = (p[:, None] for p in params)
+    small = np.abs(shape) < 1e-6
+    k = np.where(small, 1.0, shape)
+    return np.where(small, loc - scale * np.log(y), loc + scale / k * (1 - y ** k))
+
+
+class ReturnPeriods:
+    """Annual maxima and GEV/Gumbel fits of every region."""
+
+    def __init__(self, regions, years, maxima, params, value="rfh"):
+        # params: {distribution: tuple of per-region parameter arrays}
+        self.regions = pd.Index(regions)
+        self.years = np.asarray(years)
+        self.maxima = maxima
+        self.params = params
+        self.value = value
+
+    @classmethod
+    def from_frame(cls, df, value="rfh"):
+        regions, years, maxima = annual_maxima(df, value)
+        l1, l2, t3 = l_moments(maxima)
+        params = {"gev": fit_gev(l1, l2, t3), "gumbel": fit_gumbel(l1, l2)}
+        return cls(regions, years, maxima, params, value=value)
+
+    def save(self, path, version):
+        arrays = {f"{dist}_{i}": p for dist, params in self.params.items() for i, p in enumerate(params)}
+        buffer = io.BytesIO()
+        np.savez(buffer, regions=self.regions.to_numpy(dtype=str), years=self.years,
+                 maxima=self.maxima, value=self.value, version=version, **arrays)
+        atomic_write_bytes(path, buffer.getvalue())
+
+    @classmethod
+    def load(cls, path):
+        """Return ``(return_periods, version)`` from a file written by :meth:`save`."""
+        with np.load(path) as data:
+            params = {"gev": tuple(data[f"gev_{i}"] for i in range(3)),
+                      "gumbel": tuple(data[f"gumbel_{i}"] for i in range(2))}
+            fit = cls(data["regions"], data["years"], data["maxima"], params, value=str(data["value"]))
+            return fit, str(data["version"])
+
+    def _rows(self, regions):
+        idx = self.regions.get_indexer(list(regions))
+        return np.unique(idx[idx >= 0])
+
+    def levels(self, regions, periods=RETURN_PERIODS, distribution="gev"):
+        """Region x return period frame of return levels (columns are years)."""
+        if distribution not in self.params:
+            raise ValueError(f"Unknown distribution '{distribution}' (choose from {', '.join(DISTRIBUTIONS)})")
+        idx = self._rows(regions)
+        params = tuple(p[idx] for p in self.params[distribution])
+        return pd.DataFrame(return_level(params, periods, distribution),
+                            index=pd.Index(self.regions[idx], name="Region"),
+                            columns=pd.Index(list(periods), name="Return period"))
+
+    def curves(self, regions, distribution="gev", max_period=100, points=60):
+        """Long frame of return-level curves (``Region``, ``period``, ``level``)."""
+        periods = np.geomspace(1.01, max_period, points)
+        levels = self.levels(regions, periods, distribution)
+        out = levels.stack().rename("level").reset_index()
+        return out.rename(columns={"Return period": "period"})
+
+    def observed(self, regions):
+        """Annual maxima of ``regions`` at Gringorten plotting positions.
+
+        Returns ``Region``, ``year``, ``level`` and the empirical return
+        ``period`` (years).
+        """
+        idx = self._rows(regions)
+        maxima = self.maxima[idx]
+        n = np.isfinite(maxima).sum(axis=1)[:, None]
+        # Rank 1 = largest maximum of the region
+        rank = (-np.where(np.isfinite(maxima), maxima, -np.inf)).argsort(axis=1).argsort(axis=1) + 1
+        period = (n + 0.12) / (rank - 0.44)
+        out = pd.DataFrame({
+            "Region": np.repeat(self.regions[idx], len(self.years)),
+            "year": np.tile(self.years, len(idx)),
+            "level": maxima.ravel(),
+            "period": period.ravel(),
+        })
+        return out.dropna(subset=["level"]).reset_index(drop=True)
+
+    def n_years(self, regions):
+        """Number of annual maxima behind each region's fit."""
+        idx = self._rows(regions)
+        return pd.Series(np.isfinite(self.maxima[idx]).sum(axis=1), index=self.regions[idx])
+
+
+def build_return_periods(df, value="rfh"):
+    return ReturnPeriods.from_frame(df, value=value)
+
+
+def return_periods_path(store_dir=STORE_DIR):
+    return os.path.join(store_dir, RETURN_PERIODS_FILE)
@@ -0,0 +1,238 @@
+"""Materialized dekad -> month -> season -> year rollups of rainfall.
+
+The data is dekadal. For every region the rollup keeps the count and sum of
+``rfh`` per dekad, and from those the same two arrays per month, season
+(Winter/Spring/Monsoon/Autumn, see ``rainfall.store.SEASONS``) and calendar
+year. Any selection of regions at any level is then a sum over array rows -
+the national series is the sum over all of them - so switching the
+dashboard's time granularity never rescans the rows.
+
+Seasons are numbered by season year: December belongs to the following
+year's winter. Values are mean dekadal rainfall, so levels stay comparable.
+
+Like the cube, the rollup is persisted next to the store, tagged with the
+dataset version, and updated by difference on incremental ingests.
+"""
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from rainfall.decomposition import dekad_dates, dekad_ordinal
+from rainfall.fileio import atomic_write_bytes
+from rainfall.paths import STORE_DIR
+from rainfall.store import MONTH_NAMES, SEASON_OF_MONTH, SEASONS
+
+ROLLUP_FILE = "rollup.npz"
+LEVELS = ("dekad", "month", "season", "year")
+
+# First calendar month of each season in SEASONS (Winter starts in December)
+SEASON_START_MONTH = np.array([12, 3, 6, 10])
+
+
+def level_ordinals(dekads, level):
+    """Running period number at ``level`` of each running dekad number.
+
+    Non-decreasing in ``dekads``, so a sorted dekad axis maps to contiguous
+    blocks of periods.
+    """
+    dekads = np.asarray(dekads, dtype="int64")
+    if level == "dekad":
+        return dekads
+    month = dekads // 3  # year * 12 + month - 1
+    if level == "month":
+        return month
+    if level == "year":
+        return month // 12
+    if level == "season":
+        year, month_of_year = np.divmod(month, 12)
+        season_year = year + (month_of_year == 11)
+        return season_year * len(SEASONS) + SEASON_OF_MONTH[month_of_year]
+    raise ValueError(f"Unknown rollup level '{level}' (choose from {', '.join(LEVELS)})")
+
+
+def period_dates(ordinals, level):
+    """First day of each period."""
+    ordinals = np.asarray(ordinals, dtype="int64")
+    if level == "dekad":
+        return pd.DatetimeIndex(dekad_dates(ordinals))
+    if level == "season":
+        season_year, season = np.divmod(ordinals, len(SEASONS))
+        start = SEASON_START_MONTH[season]
+        year, month = season_year - (start == 12), start
+    elif level == "month":
+        year, month = np.divmod(ordinals, 12)
+        month = month + 1
+    else:
+        year, month = ordinals, np.ones_like(ordinals)
+    return pd.DatetimeIndex(pd.to_datetime(pd.DataFrame({"year": year, "month": month, "day": 1})))
+
+
+def period_labels(ordinals, level):
+    """Display label of each period (``"Monsoon 2024"``, ``"Jun 2024"``, ...)."""
+    ordinals = np.asarray(ordinals, dtype="int64")
+    if level == "season":
+        season_year, season = np.divmod(ordinals, len(SEASONS))
+        return [f"{SEASONS[s]} {y}" for s, y in zip(season, season_year)]
+    if level == "year":
+        return [str(y) for y in ordinals]
+    dates = period_dates(ordinals, level)
+    if level == "month":
+        return [f"{MONTH_NAMES[d.month - 1][:3]} {d.year}" for d in dates]
+    return [f"{MONTH_NAMES[d.month - 1][:3]} {d.year} D{(d.day - 1) // 10 + 1}" for d in dates]
+
+
+def period_years(ordinals, level):
+    """Year each period is counted in (the season year for seasons)."""
+    ordinals = np.asarray(ordinals, dtype="int64")
+    per_year = {"dekad": 36, "month": 12, "season": len(SEASONS), "year": 1}[level]
+    return ordinals // per_year
+
+
+class Rollup:
+    """Per-region counts and sums of one indicator at every level of :data:`LEVELS`."""
+
+    def __init__(self, regions, levels, value="rfh"):
+        # levels: {level: (ordinals, count[region, period], total[region, period])}
+        self.regions = pd.Index(regions)
+        self.levels = levels
+        self.value = value
+
+    @classmethod
+    def empty(cls, regions, first_dekad, n_dekads, value="rfh"):
+        shape = (len(regions), n_dekads)
+        dekads = int(first_dekad) + np.arange(n_dekads)
+        rollup = cls(regions, {"dekad": (dekads, np.zeros(shape, dtype="int64"), np.zeros(shape))},
+                     value=value)
+        rollup._materialize()
+        return rollup
+
+    @classmethod
+    def from_frame(cls, df, value="rfh"):
+        df = df[df[value].notna()]
+        regions = pd.Index(sorted(df["ADM2_PCODE"].astype(str).unique()))
+        dekads = dekad_ordinal(df["date"])
+        first = int(dekads.min()) if len(dekads) else 0
+        n_dekads = int(dekads.max()) - first + 1 if len(dekads) else 0
+        rollup = cls.empty(regions, first, n_dekads, value)
+        rollup._accumulate(df, sign=1)
+        rollup._materialize()
+        return rollup
+
+    # ---- maintenance ----------------------------------------------------------
+
+    def _materialize(self):
+        """Recompute the month, season and year arrays from the dekad arrays."""
+        dekads, count, total = self.levels["dekad"]
+        for level in LEVELS[1:]:
+            ordinals = level_ordinals(dekads, level)
+            if not len(ordinals):
+                empty = np.zeros((len(self.regions), 0))
+                self.levels[level] = (ordinals, empty.astype("int64"), empty)
+                continue
+            starts = np.flatnonzero(np.r_[True, ordinals[1:] != ordinals[:-1]])
+            self.levels[level] = (ordinals[starts],
+                                  np.add.reduceat(count, starts, axis=1),
+                                  np.add.reduceat(total, starts, axis=1))
+
+    def _accumulate(self, df, sign):
+        """Add (``sign=1``) or remove (``sign=-1``) rows' contributions."""
+        df = df[df[self.value].notna()]
+        if not len(df):
+            return
+        dekads, count, total = self.levels["dekad"]
+        r = self.regions.get_indexer(df["ADM2_PCODE"].astype(str))
+        cell = r * len(dekads) + (dekad_ordinal(df["date"]) - dekads[0])
+        x = df[self.value].to_numpy(dtype="float64")
+        count += sign * np.bincount(cell, minlength=count.size).reshape(count.shape)
+        total += sign * np.bincount(cell, weights=x, minlength=total.size).reshape(total.shape)
+
+    def _grow(self, regions, dekads):
+        """Extend the region/dekad axes so every given key has a cell."""
+        old_dekads, count, total = self.levels["dekad"]
+        new_regions = self.regions.union(pd.Index(regions).astype(str)).sort_values()
+        lo = min(int(old_dekads[0]), int(np.min(dekads))) if len(old_dekads) else int(np.min(dekads))
+        hi = max(int(old_dekads[-1]), int(np.max(dekads))) if len(old_dekads) else int(np.max(dekads))
+        if (len(new_regions) == len(self.regions) and len(old_dekads)
+                and lo == old_dekads[0] and hi == old_dekads[-1]):
+            return
+        grown = Rollup.empty(new_regions, lo, hi - lo + 1, self.value)
+        _, new_count, new_total = grown.levels["dekad"]
+        r = new_regions.get_indexer(self.regions)
+        d = old_dekads - lo
+        new_count[np.ix_(r, d)] = count
+        new_total[np.ix_(r, d)] = total
+        self.regions, self.levels = grown.regions, grown.levels
+
+    def apply_delta(self, added, removed=None):
+        """Update the rollup for an upsert: ``added`` rows replace ``removed`` ones."""
+        if len(added):
+            self._grow(added["ADM2_PCODE"].astype(str).unique(), dekad_ordinal(added["date"]))
+        if removed is not None and len(removed):
+            self._accumulate(removed, sign=-1)
+        self._accumulate(added, sign=1)
+        self._materialize()
+
+    # ---- persistence ------------------------------------------------------------
+
+    def save(self, path, version):
+        arrays = {}
+        for level, (ordinals, count, total) in self.levels.items():
+            arrays.update({f"{level}_ordinals": ordinals, f"{level}_count": count,
+                           f"{level}_total": total})
+        buffer = io.BytesIO()
+        np.savez(buffer, regions=self.regions.to_numpy(dtype=str), value=self.value,
+                 version=version, **arrays)
+        atomic_write_bytes(path, buffer.getvalue())
+
+    @classmethod
+    def load(cls, path):
+        """Return ``(rollup, version)`` from a file written by :meth:`save`."""
+        with np.load(path) as data:
+            levels = {level: (data[f"{level}_ordinals"], data[f"{level}_count"],
+                              data[f"{level}_total"]) for level in LEVELS}
+            rollup = cls(data["regions"], levels, value=str(data["value"]))
+            return rollup, str(data["version"])
+
+    # ---- queries ------------------------------------------------------------------
+
+    def _columns(self, level, year_range):
+        ordinals = self.levels[level][0]
+        if year_range is None:
+            return np.ones(len(ordinals), dtype=bool)
+        years = period_years(ordinals, level)
+        return (years >= year_range[0]) & (years <= year_range[1])
+
+    def series(self, level, regions=None, year_range=None):
+        """Mean value per period over ``regions`` (all regions, i.e. national, when None).
+
+        Returns ``date`` (period start), ``period`` (label), the value and the
+        number of observations; periods without data are left out.
+        """
+        if level not in self.levels:
+            raise ValueError(f"Unknown rollup level '{level}' (choose from {', '.join(LEVELS)})")
+        ordinals, count, total = self.levels[level]
+        cols = self._columns(level, year_range)
+        if regions is None:
+            n, s = count[:, cols].sum(axis=0), total[:, cols].sum(axis=0)
+        else:
+            idx = self.regions.get_indexer(list(regions))
+            idx = np.unique(idx[idx >= 0])
+            n, s = count[np.ix_(idx, cols)].sum(axis=0), total[np.ix_(idx, cols)].sum(axis=0)
+        keep = n > 0
+        ordinals = ordinals[cols][keep]
+        return pd.DataFrame({
+            "date": period_dates(ordinals, level),
+            "period": period_labels(ordinals, level),
+            self.value: s[keep] / n[keep],
+            "count": n[keep],
+        })
+
+
+def build_rollup(df, value="rfh"):
+    return Rollup.from_frame(df, value=value)
+
+
+def rollup_path(store_dir=STORE_DIR):
+    return os.path.join(store_dir, ROLLUP_FILE)
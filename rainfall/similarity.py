@@ -0,0 +1,56 @@
+"""Nearest-neighbour search over regions' seasonal rainfall profiles.
+
+Each region is described by its calendar-month mean rainfall (the EDA
+notebook's ``monthly_region``). Every month is standardised across regions,
+as for clustering, and each vector is scaled to unit length, so a single
+matrix-vector product gives the cosine similarity of one region to all the
+others. The top k come from ``argpartition``, which makes a query linear in
+the number of regions without a full sort. The index is a few kilobytes per
+thousand regions and is built once per dataset version.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_K = 5
+
+
+class SimilarityIndex:
+    """Unit-length standardised profiles, one row per region."""
+
+    def __init__(self, profiles, vectors):
+        self.profiles = profiles
+        self.regions = pd.Index(profiles.index.astype(str))
+        self.vectors = vectors
+
+    @classmethod
+    def from_profiles(cls, monthly_region):
+        x = monthly_region.to_numpy(dtype="float64")
+        scale = x.std(axis=0)
+        scale[scale == 0] = 1.0
+        z = (x - x.mean(axis=0)) / scale
+        norms = np.linalg.norm(z, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return cls(monthly_region, (z / norms).astype("float32"))
+
+    def __len__(self):
+        return len(self.regions)
+
+    def similar(self, region, k=DEFAULT_K):
+        """The ``k`` regions most similar to ``region``, best first.
+
+        Returns a frame with ``Region`` and ``Similarity`` (cosine, -1..1).
+        Raises ``KeyError`` for a region that is not in the index.
+        """
+        i = self.regions.get_loc(str(region))
+        scores = self.vectors @ self.vectors[i]
+        scores[i] = -np.inf
+        k = max(0, min(int(k), len(self.regions) - 1))
+        if k == 0:
+            return pd.DataFrame({"Region": pd.Series([], dtype=str), "Similarity": np.array([])})
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return pd.DataFrame({"Region": self.regions[top], "Similarity": scores[top].astype("float64")})
+
+
+def build_similarity_index(monthly_region):
+    return SimilarityIndex.from_profiles(monthly_region)
@@ -0,0 +1,200 @@
+"""Standardized Precipitation Index (SPI) for every region at once.
+
+For each accumulation window (1, 3 and 6 months = 3, 9 and 18 dekads) the
+dekadal ``rfh`` of all regions is summed over the trailing window as one
+(region x dekad) array. For every region and dekad of the year, a gamma
+distribution is fitted to that dekad's accumulations across the years, with
+a point mass for zero totals, and each accumulation is mapped through the
+fitted CDF to a standard normal quantile:
+
+* gamma shape/scale use Thom's maximum-likelihood approximation, evaluated
+  on a (region x year x dekad-of-year) array, so every (region, dekad, window)
+  fit is one vectorized pass;
+* SPI = Phi^-1(q + (1 - q) * G(x)), q being the share of zero totals.
+
+Negative values are drier than usual for that time of year, positive wetter
+(-1 / -1.5 / -2: moderately / severely / extremely dry). With only a few
+years of history each fit rests on few samples; dekads with fewer than
+``MIN_YEARS`` non-zero totals get no index.
+
+The result is persisted next to the store, tagged with the dataset version,
+like the decomposition.
+"""
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from rainfall.decomposition import DEKADS_PER_YEAR, dekad_dates, dekadal_matrix
+from rainfall.fileio import atomic_write_bytes
+from rainfall.paths import STORE_DIR
+
+SPI_FILE = "spi.npz"
+
+# Accumulation windows in months; a month is three dekads
+WINDOWS = (1, 3, 6)
+MIN_YEARS = 3
+# Keep the normal quantile finite at the extremes of the fitted CDF
+PROB_CLIP = 1e-6
+
+# (upper bound, label): SPI below the bound falls in the category
+CATEGORIES = [
+    (-2.0, "Extremely dry"),
+    (-1.5, "Severely dry"),
+    (-1.0, "Moderately dry"),
+    (1.0, "Near normal"),
+    (1.5, "Moderately wet"),
+    (2.0, "Very wet"),
+    (np.inf, "Extremely wet"),
+]
+
+
+def category(values):
+    """Drought/wetness class of each SPI value (``None`` for NaN)."""
+    values = np.asarray(values, dtype="float64")
+    bounds = np.array([bound for bound, _ in CATEGORIES])
+    labels = np.array([label for _, label in CATEGORIES] + [None], dtype=object)
+    codes = np.searchsorted(bounds, values, side="right")
+    codes[np.isnan(values)] = len(CATEGORIES)
+    return labels[codes]
+
+
+def accumulate(matrix, window):
+    """Trailing sum over ``window`` columns of each row (NaN if incomplete)."""
+    x = np.asarray(matrix, dtype="float64")
+    valid = np.isfinite(x)
+    pad = np.zeros((x.shape[0], 1))
+    total = np.concatenate([pad, np.cumsum(np.where(valid, x, 0.0), axis=1)], axis=1)
+    count = np.concatenate([pad, np.cumsum(valid, axis=1)], axis=1)
+    out = np.full(x.shape, np.nan)
+    if window <= x.shape[1]:
+        sums = total[:, window:] - total[:, :-window]
+        complete = (count[:, window:] - count[:, :-window]) == window
+        out[:, window - 1:] = np.where(complete, sums, np.nan)
+    return out
+
+
+def fit_gamma(samples, axis=1, min_samples=MIN_YEARS):
+    """Zero-inflated gamma fit along ``axis``; returns ``(shape, scale, p_zero)``.
+
+    NaNs are ignored. Shape and scale come from Thom's approximation to the
+    maximum-likelihood estimates over the positive samples; fits with fewer
+    than ``min_samples`` positive values, or no spread, are NaN.
+    """
+    x = np.asarray(samples, dtype="float64")
+    valid = np.isfinite(x)
+    positive = valid & (x > 0)
+    n = valid.sum(axis=axis)
+    n_pos = positive.sum(axis=axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(positive, x, 0.0).sum(axis=axis) / n_pos
+        mean_log = np.where(positive, np.log(np.where(positive, x, 1.0)), 0.0).sum(axis=axis) / n_pos
+        a = np.log(mean) - mean_log
+        shape = (1 + np.sqrt(1 + 4 * a / 3)) / (4 * a)
+        scale = mean / shape
+        p_zero = (n - n_pos) / n
+    ok = (n_pos >= min_samples) & (a > 0)
+    return np.where(ok, shape, np.nan), np.where(ok, scale, np.nan), np.where(ok, p_zero, np.nan)
+
+
+def standardize(x, shape, scale, p_zero):
+    """SPI of accumulations ``x`` under fitted zero-inflated gamma parameters."""
+    from scipy.special import gammainc, ndtri
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        g = gammainc(shape, np.maximum(x, 0.0) / scale)
+    prob = p_zero + (1 - p_zero) * np.where(x > 0, g, 0.0)
+    prob = np.clip(prob, PROB_CLIP, 1 - PROB_CLIP)
+    return np.where(np.isfinite(x) & np.isfinite(shape), ndtri(prob), np.nan)
+
+
+def compute_spi(matrix, windows=WINDOWS, period=DEKADS_PER_YEAR, min_years=MIN_YEARS):
+    """SPI for each window (months), shaped ``[window, region, dekad]``.
+
+    ``matrix`` must start at the first dekad of a year and span whole years
+    (as returned by :func:`rainfall.decomposition.dekadal_matrix`).
+    """
+    n_regions, n_dekads = matrix.shape
+    out = np.full((len(windows), n_regions, n_dekads), np.nan)
+    for i, months in enumerate(windows):
+        acc = accumulate(matrix, months * 3).reshape(n_regions, -1, period)
+        shape, scale, p_zero = fit_gamma(acc, axis=1, min_samples=min_years)
+        spi = standardize(acc, shape[:, None, :], scale[:, None, :], p_zero[:, None, :])
+        out[i] = spi.reshape(n_regions, n_dekads)
+    return out
+
+
+class SPI:
+    """SPI arrays indexed [window, region, dekad]."""
+
+    def __init__(self, regions, first_ordinal, windows, values, value="rfh"):
+        self.regions = pd.Index(regions)
+        self.first_ordinal = int(first_ordinal)
+        self.windows = tuple(int(w) for w in windows)
+        self.values = values
+        self.value = value
+        self.dates = pd.DatetimeIndex(dekad_dates(self.first_ordinal + np.arange(values.shape[2])))
+
+    @classmethod
+    def from_frame(cls, df, value="rfh", windows=WINDOWS):
+        regions, first, matrix = dekadal_matrix(df, value)
+        values = compute_spi(matrix, windows).astype("float32")
+        return cls(regions, first, windows, values, value=value)
+
+    def save(self, path, version):
+        buffer = io.BytesIO()
+        np.savez(buffer, regions=self.regions.to_numpy(dtype=str), first_ordinal=self.first_ordinal,
+                 windows=np.array(self.windows), values=self.values, value=self.value,
+                 version=version)
+        atomic_write_bytes(path, buffer.getvalue())
+
+    @classmethod
+    def load(cls, path):
+        """Return ``(spi, version)`` from a file written by :meth:`save`."""
+        with np.load(path) as data:
+            spi = cls(data["regions"], int(data["first_ordinal"]), data["windows"],
+                      data["values"], value=str(data["value"]))
+            return spi, str(data["version"])
+
+    def _block(self, window, regions, year_range):
+        if window not in self.windows:
+            raise ValueError(f"No {window}-month SPI (available: {self.windows})")
+        idx = self.regions.get_indexer(list(regions))
+        idx = np.unique(idx[idx >= 0])
+        y0, y1 = year_range
+        cols = (self.dates.year >= y0) & (self.dates.year <= y1)
+        return idx, cols, self.values[self.windows.index(window)][np.ix_(idx, cols)]
+
+    def series(self, window, regions, year_range):
+        """Mean SPI of ``regions`` per dekad (``date``, ``spi``); dekads without an index are dropped."""
+        _, cols, block = self._block(window, regions, year_range)
+        mean = pd.DataFrame(block).mean(axis=0).to_numpy() if len(block) else np.full(cols.sum(), np.nan)
+        out = pd.DataFrame({"date": self.dates[cols], "spi": mean})
+        return out.dropna(subset=["spi"]).reset_index(drop=True)
+
+    def latest(self, window, regions, year_range):
+        """Most recent SPI of each region in the selection, with its category."""
+        idx, cols, block = self._block(window, regions, year_range)
+        known = np.isfinite(block)
+        rows = np.flatnonzero(known.any(axis=1))
+        last = block.shape[1] - 1 - np.argmax(known[rows, ::-1], axis=1)
+        values = np.full(len(idx), np.nan)
+        values[rows] = block[rows, last]
+        dates = pd.Series(pd.NaT, index=range(len(idx)), dtype="datetime64[ns]")
+        dates.iloc[rows] = self.dates[cols][last]
+        out = pd.DataFrame({
+            "Region": self.regions[idx],
+            "Date": dates.to_numpy(),
+            "SPI": values,
+            "Category": category(values),
+        })
+        return out.sort_values("SPI", na_position="last").reset_index(drop=True)
+
+
+def build_spi(df, value="rfh"):
+    return SPI.from_frame(df, value=value)
+
+
+def spi_path(store_dir=STORE_DIR):
+    return os.path.join(store_dir, SPI_FILE)
@@ -0,0 +1,174 @@
+"""Optional DuckDB query backend: dashboard aggregations as SQL over the store.
+
+The default backend answers chart queries from the in-memory aggregate cube,
+which needs the frame (or a persisted cube) per worker. :class:`DuckDBQueries`
+instead runs each aggregation as one SQL query directly over the Parquet
+store (base file plus delta parts), reading only the columns it needs, so
+the archive never has to fit in worker memory.
+
+It implements the same query methods as :class:`rainfall.cube.RainfallCube`
+(``row_count``, ``region_stats``, ``histogram``,
+``distribution``, ``month_distribution``, ``month_profiles``), so
+:func:`rainfall.queries.compute_dashboard_frames` works with either. Box-plot
+quantiles and histogram bins are exact here rather than sketch-based.
+
+Enable it for the dashboard with ``RAINFALL_QUERY_BACKEND=duckdb``.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from rainfall.paths import STORE_DIR
+from rainfall.store import (DATA_FILE, DELTA_DIR, INDICATOR_COLS, KEY_COLS,
+                            MONTH_NAMES, read_manifest)
+
+SELECTION = "ADM2_PCODE IN (SELECT unnest($regions)) AND year BETWEEN $y0 AND $y1"
+
+
+def _sql_string(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class DuckDBQueries:
+    """Dashboard queries pushed down to DuckDB over the Parquet store."""
+
+    def __init__(self, store_dir=STORE_DIR, manifest=None, value="rfh", database=":memory:"):
+        import duckdb
+
+        if value not in INDICATOR_COLS:
+            raise ValueError(f"Unknown indicator '{value}'")
+        manifest = manifest or read_manifest(store_dir)
+        if not manifest:
+            raise FileNotFoundError(f"No rainfall store in {store_dir}")
+        self.value = value
+        self._con = duckdb.connect(database)
+        self._lock = threading.Lock()
+
+        paths = [os.path.join(store_dir, DATA_FILE)]
+        paths += [os.path.join(store_dir, DELTA_DIR, name) for name in manifest.get("deltas", [])]
+        files = "[" + ", ".join(_sql_string(p) for p in paths) + "]"
+        columns = f"date, ADM2_PCODE, year, month, {value}"
+        if len(paths) == 1:
+            source = f"SELECT {columns} FROM read_parquet({files})"
+        else:
+            # Later delta parts replace earlier rows with the same key
+            keys = ", ".join(KEY_COLS)
+            source = f"""
+                SELECT {columns} FROM read_parquet({files}, filename = true)
+                QUALIFY row_number() OVER (
+                    PARTITION BY {keys} ORDER BY list_position({files}, filename) DESC
+                ) = 1
+            """
+        self._con.execute(f"CREATE VIEW rainfall AS {source}")
+
+        regions = self._query("SELECT DISTINCT ADM2_PCODE FROM rainfall ORDER BY 1")
+        years = self._query("SELECT DISTINCT year FROM rainfall ORDER BY 1")
+        self.regions = pd.Index(regions.iloc[:, 0].astype(str))
+        self.years = years.iloc[:, 0].to_numpy(dtype="int64")
+
+    def _query(self, sql, regions=None, year_range=None, **params):
+        if regions is not None:
+            params.update(regions=[str(r) for r in regions],
+                          y0=int(year_range[0]), y1=int(year_range[1]))
+        # One cursor per query: a DuckDB connection is not safe to share
+        # between Streamlit's script threads
+        with self._lock:
+            cursor = self._con.cursor()
+        try:
+            return cursor.execute(sql, params or None).df()
+        finally:
+            cursor.close()
+
+    # ---- queries ------------------------------------------------------------
+
+    def row_count(self, regions, year_range):
+        sql = f"SELECT count({self.value}) AS n FROM rainfall WHERE {SELECTION}"
+        return int(self._query(sql, regions, year_range)["n"].iloc[0])
+
+    def region_stats(self, regions, year_range):
+        """Mean and sample standard deviation per selected region."""
+        v = self.value
+        sql = f"""
+            SELECT CAST(ADM2_PCODE AS VARCHAR) AS Region,
+                   avg({v}) AS Average_Rainfall,
+                   stddev_samp({v}) AS Std_Deviation
+            FROM rainfall WHERE {SELECTION} AND {v} IS NOT NULL
+            GROUP BY ALL ORDER BY Region
+        """
+        return self._query(sql, regions, year_range)
+
+    def month_profiles(self):
+        """Region x calendar-month mean over all years (``clustering.monthly_profiles``)."""
+        v = self.value
+        sql = f"""
+            SELECT CAST(ADM2_PCODE AS VARCHAR) AS ADM2_PCODE, CAST(month AS INTEGER) AS month,
+                   avg({v}) AS mean
+            FROM rainfall WHERE {v} IS NOT NULL
+            GROUP BY ALL
+        """
+        out = self._query(sql).pivot(index="ADM2_PCODE", columns="month", values="mean")
+        return out.reindex(index=self.regions, columns=range(1, 13)).fillna(0)
+
+    def _box_query(self, group_by, regions, year_range):
+        v = self.value
+        select = f"{group_by} AS month, " if group_by else ""
+        grouping = f"GROUP BY {group_by} ORDER BY {group_by}" if group_by else ""
+        sql = f"""
+            SELECT {select}count({v}) AS count, avg({v}) AS mean, min({v}) AS min,
+                   quantile_cont({v}, [0.25, 0.5, 0.75]) AS q, max({v}) AS max
+            FROM rainfall WHERE {SELECTION} AND {v} IS NOT NULL
+            {grouping}
+        """
+        out = self._query(sql, regions, year_range)
+        q = np.array([list(row) if row is not None else [np.nan] * 3 for row in out.pop("q")],
+                     dtype="float64").reshape(len(out), 3)
+        out["q1"], out["median"], out["q3"] = q[:, 0], q[:, 1], q[:, 2]
+        iqr = out["q3"] - out["q1"]
+        # Same whisker rule as the cube: 1.5 IQR, clamped to the data range
+        out["lowerfence"] = np.maximum(out["q1"] - 1.5 * iqr, out["min"])
+        out["upperfence"] = np.minimum(out["q3"] + 1.5 * iqr, out["max"])
+        return out
+
+    def month_distribution(self, regions, year_range):
+        """Box-plot statistics per calendar month (exact quantiles)."""
+        out = self._box_query("month", regions, year_range)
+        out["month"] = out["month"].astype("int64")
+        out.insert(1, "month_name", [MONTH_NAMES[m - 1] for m in out["month"]])
+        columns = ["month", "month_name", "count", "mean", "min", "q1", "median", "q3",
+                   "max", "lowerfence", "upperfence"]
+        return out[columns].reset_index(drop=True)
+
+    def distribution(self, regions, year_range):
+        """Box-plot statistics over the whole selection (one row)."""
+        out = self._box_query(None, regions, year_range)
+        keys = ["count", "mean", "min", "q1", "median", "q3", "max", "lowerfence", "upperfence"]
+        return {key: out[key].iloc[0] for key in keys}
+
+    def histogram(self, regions, year_range, nbins=30):
+        """Exact counts over ``nbins`` equal-width bins spanning the selection."""
+        v = self.value
+        sql = f"""
+            WITH sel AS (
+                SELECT {v} AS v FROM rainfall WHERE {SELECTION} AND {v} IS NOT NULL
+            ),
+            bounds AS (SELECT min(v) AS lo, max(v) AS hi, count(*) AS n FROM sel),
+            binned AS (
+                SELECT least(CAST(floor((v - lo) / nullif(hi - lo, 0) * $nbins) AS INTEGER),
+                             $nbins - 1) AS bin,
+                       count(*) AS c
+                FROM sel, bounds GROUP BY bin
+            )
+            SELECT lo, hi, n, bin, c FROM bounds LEFT JOIN binned ON true
+        """
+        out = self._query(sql, regions, year_range, nbins=int(nbins))
+        total = int(out["n"].iloc[0])
+        if total == 0:
+            return np.zeros(0), np.array([0.0])
+        lo, hi = float(out["lo"].iloc[0]), float(out["hi"].iloc[0])
+        if hi <= lo:
+            return np.array([float(total)]), np.array([lo, lo + 1.0])
+        counts = np.zeros(nbins)
+        counts[out["bin"].to_numpy(dtype="int64")] = out["c"].to_numpy(dtype="float64")
+        return counts, np.linspace(lo, hi, nbins + 1)
@@ -0,0 +1,308 @@
+"""Columnar on-disk store for the cleaned rainfall dataset.
+
+Parsing ``cleaned_btn_rainfall.csv`` (dates, 18 text columns) dominates a cold
+start of the dashboard. The store keeps a Parquet copy of the frame with
+compact dtypes next to a small JSON manifest describing the CSV it was built
+from. The Parquet file is only rebuilt when the CSV's size/mtime change *and*
+its content hash no longer matches, so touching the file or restarting many
+workers at once does not trigger a re-parse.
+"""
+import calendar
+import importlib.util
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from rainfall.fileio import atomic_output, atomic_write_bytes, file_hash
+from rainfall.paths import CLEANED_CSV, STORE_DIR
+
+SCHEMA_VERSION = 3
+
+DATA_FILE = "rainfall.parquet"
+MANIFEST_FILE = "manifest.json"
+DELTA_DIR = "deltas"
+
+KEY_COLS = ["date", "ADM2_PCODE"]
+FINAL_VERSION = "final"
+
+MONTH_NAMES = list(calendar.month_name)[1:]
+
+# Bhutan's seasons, in order within a season year. Winter runs December to
+# February, so December belongs to the following year's winter.
+SEASONS = ["Winter", "Spring", "Monsoon", "Autumn"]
+# Index into SEASONS of each calendar month (index 0 = January)
+SEASON_OF_MONTH = np.array([0, 0, 1, 1, 1, 2, 2, 2, 2, 3, 3, 0])
+SEASON_BY_MONTH = np.array(SEASONS)[SEASON_OF_MONTH]
+
+INDICATOR_COLS = [
+    "n_pixels", "rfh", "rfh_avg", "r1h", "r1h_avg",
+    "r3h", "r3h_avg", "rfq", "r1q", "r3q",
+]
+CALENDAR_DTYPES = {"year": "int16", "month": "int8", "day": "int8"}
+# Columns of the cleaned CSV derived from others and not kept in memory
+DERIVED_COLS = ["month_name"]
+CATEGORY_COLS = ["ADM2_PCODE", "version"]
+
+# Rows per CSV chunk / Parquet row group when building the store
+CHUNK_SIZE = 100_000
+
+# Checked without importing pyarrow; pandas loads it on first Parquet read
+HAS_PARQUET = importlib.util.find_spec("pyarrow") is not None
+
+
+def compact_frame(df):
+    """Cast a cleaned rainfall frame to the store's compact dtypes.
+
+    Region codes and ``version`` become categoricals, ids and calendar parts
+    small ints, indicators float32, and ``month_name`` is dropped (see
+    :func:`month_names`). About a third of the default dtypes' footprint.
+    """
+    df = df.drop(columns=[c for c in DERIVED_COLS if c in df.columns])
+    df["date"] = pd.to_datetime(df["date"])
+    df["adm2_id"] = pd.to_numeric(df["adm2_id"]).astype("int32")
+    df = sorted_categories(df)
+    for col in INDICATOR_COLS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+    for col, dtype in CALENDAR_DTYPES.items():
+        df[col] = df[col].astype(dtype)
+    return df
+
+
+def sorted_categories(df):
+    """Make ``ADM2_PCODE``/``version`` categoricals whose categories are sorted.
+
+    A store written in row groups reads back with the categories in order of
+    first appearance; sorting keeps groupby output ordered by region code.
+    """
+    for col in CATEGORY_COLS:
+        values = df[col].astype("category")
+        categories = values.cat.categories
+        if not categories.is_monotonic_increasing:
+            values = values.cat.reorder_categories(categories.sort_values())
+        df[col] = values
+    return df
+
+
+def month_names(months):
+    """Ordered categorical of month names for month numbers (1 = January)."""
+    codes = np.asarray(months, dtype="int64") - 1
+    return pd.Categorical.from_codes(codes, categories=MONTH_NAMES, ordered=True)
+
+
+def season_names(months):
+    """Ordered categorical of season names for month numbers (1 = January)."""
+    codes = SEASON_OF_MONTH[np.asarray(months, dtype="int64") - 1]
+    return pd.Categorical.from_codes(codes, categories=SEASONS, ordered=True)
+
+
+def read_cleaned_csv(csv_path=CLEANED_CSV, chunksize=None):
+    """Parse the cleaned CSV directly (the slow path the store replaces).
+
+    With ``chunksize``, an iterator of raw (not yet compacted) chunks.
+    """
+    if chunksize:
+        return pd.read_csv(csv_path, parse_dates=["date"], chunksize=chunksize)
+    return compact_frame(pd.read_csv(csv_path, parse_dates=["date"]))
+
+
+def read_manifest(store_dir=STORE_DIR):
+    try:
+        with open(os.path.join(store_dir, MANIFEST_FILE)) as fh:
+            return json.load(fh)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_manifest(manifest, store_dir=STORE_DIR):
+    payload = json.dumps(manifest, indent=2, sort_keys=True).encode()
+    atomic_write_bytes(os.path.join(store_dir, MANIFEST_FILE), payload)
+
+
+def _source_stat(csv_path):
+    stat = os.stat(csv_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def is_fresh(manifest, csv_path=CLEANED_CSV, store_dir=STORE_DIR):
+    """Return True if the store was built from the current CSV contents.
+
+    A matching size/mtime is trusted without reading the CSV. When only the
+    mtime moved, the content hash decides and the manifest is refreshed so the
+    next check is cheap again.
+    """
+    if not manifest or manifest.get("schema_version") != SCHEMA_VERSION:
+        return False
+    if not os.path.exists(os.path.join(store_dir, DATA_FILE)):
+        return False
+    source = manifest.get("source", {})
+    stat = _source_stat(csv_path)
+    if stat["size"] != source.get("size"):
+        return False
+    if stat["mtime_ns"] == source.get("mtime_ns"):
+        return True
+    if file_hash(csv_path) != source.get("sha256"):
+        return False
+    manifest["source"].update(stat)
+    write_manifest(manifest, store_dir)
+    return True
+
+
+def row_keys(df):
+    """``"YYYY-MM-DD|PCODE"`` key of each row."""
+    return df["date"].dt.strftime("%Y-%m-%d") + "|" + df["ADM2_PCODE"].astype(str)
+
+
+def tracking_info(df):
+    """High-water mark and the keys/versions of rows that are not final yet."""
+    open_mask = (df["version"] != FINAL_VERSION).to_numpy()
+    open_rows = df.loc[open_mask]
+    return {
+        "high_water_mark": df["date"].max().strftime("%Y-%m-%d") if len(df) else None,
+        "open_rows": dict(zip(row_keys(open_rows), open_rows["version"].astype(str))),
+    }
+
+
+def _write_parquet(df, path):
+    with atomic_output(path) as tmp_path:
+        df.to_parquet(tmp_path, index=False)
+
+
+def _clear_deltas(store_dir):
+    delta_dir = os.path.join(store_dir, DELTA_DIR)
+    if os.path.isdir(delta_dir):
+        for name in os.listdir(delta_dir):
+            os.remove(os.path.join(delta_dir, name))
+
+
+def _write_parquet_chunks(chunks, path):
+    """Write frames one row group at a time; return the tracking info of all rows."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows, high_water_mark, open_rows = 0, None, {}
+    with atomic_output(path) as tmp_path:
+        writer = schema = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    schema = table.schema
+                    writer = pq.ParquetWriter(tmp_path, schema)
+                # Category codes may be narrower in a chunk with fewer values
+                writer.write_table(table.cast(schema))
+                rows += len(chunk)
+                tracking = tracking_info(chunk)
+                if tracking["high_water_mark"] and (
+                        high_water_mark is None or tracking["high_water_mark"] > high_water_mark):
+                    high_water_mark = tracking["high_water_mark"]
+                open_rows.update(tracking["open_rows"])
+        finally:
+            if writer is not None:
+                writer.close()
+    return {"rows": rows, "high_water_mark": high_water_mark, "open_rows": open_rows}
+
+
+def write_store(csv_path=CLEANED_CSV, store_dir=STORE_DIR, chunksize=CHUNK_SIZE):
+    """Stream the CSV into the Parquet copy plus its manifest; return the manifest.
+
+    The CSV is read ``chunksize`` rows at a time and each chunk becomes one
+    Parquet row group, so peak memory does not grow with the file. Any delta
+    parts from earlier ingests are discarded: the CSV is the full
+    authoritative snapshot.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    stat = _source_stat(csv_path)
+    sha256 = file_hash(csv_path)
+    chunks = (compact_frame(chunk) for chunk in read_cleaned_csv(csv_path, chunksize=chunksize))
+    info = _write_parquet_chunks(chunks, os.path.join(store_dir, DATA_FILE))
+    _clear_deltas(store_dir)
+
+    manifest = {
+        "schema_version": SCHEMA_VERSION,
+        "source": {"path": os.path.basename(csv_path), "sha256": sha256, **stat},
+        "version": sha256[:16],
+        "deltas": [],
+        **info,
+    }
+    write_manifest(manifest, store_dir)
+    return manifest
+
+
+def build_store(csv_path=CLEANED_CSV, store_dir=STORE_DIR):
+    """:func:`write_store`, then read the new store back; return ``(df, manifest)``."""
+    manifest = write_store(csv_path, store_dir)
+    return read_store(manifest, store_dir), manifest
+
+
+def read_store(manifest, store_dir=STORE_DIR, filters=None):
+    """Base file plus delta parts, de-duplicated on (date, ADM2_PCODE).
+
+    ``filters`` is passed to ``pd.read_parquet`` (e.g. to read only a recent
+    tail of the data).
+    """
+    paths = [os.path.join(store_dir, DATA_FILE)]
+    paths += [os.path.join(store_dir, DELTA_DIR, name) for name in manifest.get("deltas", [])]
+    frames = [pd.read_parquet(path, filters=filters) for path in paths]
+    if len(frames) == 1:
+        return sorted_categories(frames[0])
+    df = pd.concat(frames, ignore_index=True)
+    df = df.drop_duplicates(KEY_COLS, keep="last").reset_index(drop=True)
+    return compact_frame(df)
+
+
+def append_delta(delta, manifest, store_dir=STORE_DIR):
+    """Write ``delta`` as the next delta part and register it in ``manifest``.
+
+    The caller updates the manifest's version/tracking fields and writes it.
+    """
+    name = f"delta-{len(manifest['deltas']) + 1:05d}.parquet"
+    os.makedirs(os.path.join(store_dir, DELTA_DIR), exist_ok=True)
+    _write_parquet(compact_frame(delta), os.path.join(store_dir, DELTA_DIR, name))
+    manifest["deltas"].append(name)
+    return name
+
+
+def compact_store(store_dir=STORE_DIR):
+    """Fold every delta part into the base file (same data, same version)."""
+    manifest = read_manifest(store_dir)
+    if not manifest or not manifest.get("deltas"):
+        return manifest
+    df = read_store(manifest, store_dir)
+    _write_parquet(df, os.path.join(store_dir, DATA_FILE))
+    manifest["deltas"] = []
+    manifest["rows"] = len(df)
+    write_manifest(manifest, store_dir)
+    _clear_deltas(store_dir)
+    return manifest
+
+
+def load_rainfall(csv_path=CLEANED_CSV, store_dir=STORE_DIR):
+    """Load the cleaned rainfall frame, (re)building the store if needed.
+
+    Falls back to parsing the CSV when pyarrow is not installed.
+    """
+    if not HAS_PARQUET:
+        return read_cleaned_csv(csv_path)
+    manifest = read_manifest(store_dir)
+    if is_fresh(manifest, csv_path, store_dir):
+        return read_store(manifest, store_dir)
+    df, _ = build_store(csv_path, store_dir)
+    return df
+
+
+def ensure_store(csv_path=CLEANED_CSV, store_dir=STORE_DIR):
+    """Manifest of an up-to-date store, building it first if it is missing or stale."""
+    manifest = read_manifest(store_dir)
+    if is_fresh(manifest, csv_path, store_dir):
+        return manifest
+    return write_store(csv_path, store_dir)
+
+
+def dataset_version(csv_path=CLEANED_CSV, store_dir=STORE_DIR):
+    """Short content hash identifying the dataset the store currently holds."""
+    manifest = read_manifest(store_dir)
+    if manifest and is_fresh(manifest, csv_path, store_dir):
+        return manifest["version"]
+    return file_hash(csv_path)[:16]
@@ -0,0 +1,17 @@
+import pytest
+
+from rainfall.paths import CLEANED_CSV
+from rainfall.store import read_cleaned_csv
+
+
+@pytest.fixture(scope="session")
+def rainfall_df():
+    """The committed cleaned dataset, parsed the way the store parses it."""
+    return read_cleaned_csv(CLEANED_CSV)
+
+
+@pytest.fixture(scope="session")
+def observed(rainfall_df):
+    """Rows with an ``rfh`` value and a plain string region code."""
+    df = rainfall_df[rainfall_df["rfh"].notna()]
+    return df.assign(ADM2_PCODE=df["ADM2_PCODE"].astype(str))
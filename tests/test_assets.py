@@ -0,0 +1,42 @@
+"""Landing-page background variants and their fallbacks."""
+import pytest
+
+from rainfall import assets
+from rainfall.assets import background_css, landing_background, read_variants
+
+
+def quiet(message):
+    pass
+
+
+@pytest.fixture
+def photo(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", (1400, 700), (40, 90, 160)).save(path, "JPEG")
+    return path
+
+
+def test_variants_are_built_on_first_use(tmp_path, photo):
+    static_dir = tmp_path / "static"
+    variants = landing_background(photo, static_dir, log=quiet)
+    # Widths above the source are not upscaled
+    assert sorted(variants) == [640, 1280]
+    assert variants == read_variants(static_dir)
+    assert all(url.startswith(f"{assets.STATIC_URL}/bhutan-") for url in variants.values())
+    assert "min-width: 641px" in background_css(variants)
+
+
+def test_photo_is_inlined_when_variants_cannot_be_built(tmp_path, photo, monkeypatch):
+    def fail(*args, **kwargs):
+        raise ImportError("No module named 'PIL'")
+
+    monkeypatch.setattr(assets, "generate_variants", fail)
+    variants = landing_background(photo, tmp_path / "static", log=quiet)
+    assert list(variants) == [0]
+    assert variants[0].startswith("data:image/jpeg;base64,")
+    assert "url('data:image/jpeg;base64," in background_css(variants)
+
+
+def test_no_background_without_a_source_photo(tmp_path):
+    assert landing_background(tmp_path / "missing.jpg", tmp_path / "static", log=quiet) == {}
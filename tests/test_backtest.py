@@ -0,0 +1,57 @@
+"""Rolling-origin backtests: fold placement, scoring and cached refits."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall.backtest import NATIONAL, cutoffs, run_backtest, score, summarize
+
+
+def test_cutoffs_end_one_horizon_before_the_data():
+    ds = pd.date_range("2020-01-01", periods=60, freq="MS")
+    folds = cutoffs(ds, horizon=12, n_cutoffs=3, step=3)
+    assert folds == [ds[41], ds[44], ds[47]]
+    # Folds with fewer than min_train months of history are dropped
+    assert cutoffs(ds[:40], horizon=12, n_cutoffs=3, step=3, min_train=24) == [ds[24], ds[27]]
+
+
+def test_score_and_summarize():
+    results = pd.DataFrame({
+        "series": ["a", "a", "b", "b", NATIONAL],
+        "horizon": [1, 1, 1, 1, 1],
+        "y": [10.0, 2.0, 20.0, 40.0, 100.0],
+        "yhat": [12.0, 3.0, 10.0, 40.0, 0.0],
+        "yhat_lower": [11.0, 0.0, 0.0, 30.0, 0.0],
+        "yhat_upper": [13.0, 4.0, 30.0, 50.0, 1.0],
+    })
+    metrics = score(results).set_index("series")
+    assert metrics.loc["a", "mae"] == pytest.approx(1.5)
+    assert metrics.loc["a", "mape"] == pytest.approx(20.0)  # 2 mm is below MAPE_MIN_Y
+    assert metrics.loc["a", "coverage"] == pytest.approx(0.5)
+    assert (metrics.loc["a", "n"], metrics.loc["a", "n_mape"]) == (2, 1)
+
+    overall = summarize(metrics.reset_index()).iloc[0]
+    assert overall["mae"] == pytest.approx((1 + 2 + 10 + 0) / 4)  # national excluded
+    assert overall["mape"] == pytest.approx((20 + 50 + 0) / 3)
+    assert overall["coverage"] == pytest.approx(3 / 4) and overall["n"] == 4
+    national = summarize(metrics.reset_index(), series=[NATIONAL]).iloc[0]
+    assert national["mae"] == 100
+
+
+def test_fourier_backtest_reuses_cached_folds(tmp_path):
+    ds = pd.date_range("2015-01-01", periods=72, freq="MS")
+    t = np.arange(72)
+    series = {name: pd.DataFrame({"ds": ds, "y": 50 + a * np.sin(2 * np.pi * t / 12)})
+              for name, a in [("x", 20.0), ("y", 35.0)]}
+    logs = []
+    results = run_backtest(series, backend="fourier", horizon=6, n_cutoffs=3, step=2,
+                           workers=1, cache_dir=tmp_path, log=logs.append)
+    assert len(results) == 2 * 3 * 6
+    assert list(results["horizon"].unique()) == [1, 2, 3, 4, 5, 6]
+    assert (results["ds"] > results["cutoff"]).all()
+    np.testing.assert_allclose(results["yhat"], results["y"], atol=1e-6)
+    assert len(list(tmp_path.glob("*.json"))) == 6
+
+    again = run_backtest(series, backend="fourier", horizon=6, n_cutoffs=3, step=2,
+                         workers=1, cache_dir=tmp_path, log=logs.append)
+    assert logs[-1].startswith("🔁 6 folds cached, 🧮 0 to fit")
+    pd.testing.assert_frame_equal(results, again)
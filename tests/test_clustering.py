@@ -0,0 +1,78 @@
+"""Persisted cluster model: nearest-centroid assignment without refitting."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall import clustering
+from rainfall.clustering import (ClusterModel, assign_regions, evaluate_k,
+                                 load_cluster_summary, monthly_profiles)
+
+pytest.importorskip("sklearn")
+
+
+@pytest.fixture(scope="module")
+def profiles(rainfall_df):
+    return monthly_profiles(rainfall_df)
+
+
+@pytest.fixture(scope="module")
+def model(profiles):
+    return ClusterModel.fit(profiles)
+
+
+def test_assign_reproduces_the_fitted_labels(model, profiles):
+    np.testing.assert_array_equal(model.assign(profiles), model.labels)
+    assert model.n_clusters == 3
+    assert list(model.assignments().index) == list(profiles.index.astype(str))
+    np.testing.assert_allclose(model.profiles().mean(axis=0), profiles.mean(axis=0), rtol=0.5)
+
+
+def test_save_load_round_trip(model, profiles, tmp_path):
+    model.save(tmp_path / "model.npz")
+    loaded = ClusterModel.load(tmp_path / "model.npz")
+    np.testing.assert_array_equal(loaded.assign(profiles), model.labels)
+    assert list(loaded.regions) == list(model.regions)
+
+
+def test_assign_regions_writes_only_the_overlay(model, profiles, tmp_path):
+    model_path = tmp_path / "model.npz"
+    summary = tmp_path / "summary.csv"
+    overlay = tmp_path / "assignments.csv"
+    model.save(model_path)
+    fitted = profiles.copy()
+    fitted.columns = fitted.columns.astype(str)
+    fitted.index = fitted.index.astype(str)
+    fitted["Cluster"] = model.labels
+    fitted.to_csv(summary)
+    saved = summary.read_bytes()
+
+    # A wetter copy of the first region plus a brand new region
+    first = profiles.index[0]
+    rows = profiles.loc[[first]] * 3
+    new = profiles.loc[[first]].rename(index={first: "BT99999"})
+    labels = assign_regions(pd.concat([rows, new]), model_path, overlay)
+
+    assert summary.read_bytes() == saved
+    np.testing.assert_array_equal(labels.to_numpy(), model.assign(pd.concat([rows, new])))
+    table = load_cluster_summary(summary, overlay)
+    assert table.loc["BT99999", "Cluster"] == model.labels[0]
+    np.testing.assert_allclose(table.loc[str(first)].drop("Cluster").to_numpy(dtype=float),
+                               rows.iloc[0].to_numpy(), rtol=1e-6)
+    assert len(table) == len(profiles) + 1
+
+
+def test_evaluate_k_scores_each_k(profiles):
+    scores = evaluate_k(profiles, k_values=[2, 3, 4], workers=1)
+    assert list(scores["k"]) == [2, 3, 4]
+    assert scores["inertia"].is_monotonic_decreasing
+    assert scores["silhouette"].between(-1, 1).all()
+
+
+def test_evaluate_k_stays_in_process_for_few_regions(profiles, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("started a process pool")
+
+    monkeypatch.setattr(clustering, "ProcessPoolExecutor", no_pool)
+    scores = evaluate_k(profiles, k_values=[2, 3], workers=4)
+    expected = evaluate_k(profiles, k_values=[2, 3], workers=1)
+    pd.testing.assert_frame_equal(scores, expected)
@@ -0,0 +1,74 @@
+"""The aggregate cube answers the same queries as grouping the raw rows."""
+import numpy as np
+import pytest
+
+from rainfall.clustering import monthly_profiles
+from rainfall.cube import RainfallCube, build_cube
+
+
+@pytest.fixture(scope="module")
+def cube(rainfall_df):
+    return build_cube(rainfall_df)
+
+
+def selections(cube):
+    regions = list(cube.regions)
+    # A few regions, and more than half (the complement path of _region_sum)
+    return [(regions[:3], (2021, 2025)), (regions[:3], (2022, 2023)),
+            (regions[: len(regions) * 3 // 4], (2022, 2024)), (regions, (2021, 2025))]
+
+
+def select(df, regions, year_range):
+    return df[df["ADM2_PCODE"].isin(regions) & df["year"].between(*year_range)]
+
+
+def test_row_count_and_region_stats_match_pandas(cube, observed):
+    for regions, year_range in selections(cube):
+        rows = select(observed, regions, year_range)
+        assert cube.row_count(regions, year_range) == len(rows)
+
+        expected = rows.groupby("ADM2_PCODE")["rfh"].agg(["mean", "std"])
+        stats = cube.region_stats(regions, year_range).set_index("Region")
+        expected = expected.reindex(stats.index)
+        np.testing.assert_allclose(stats["Average_Rainfall"], expected["mean"], rtol=1e-5)
+        np.testing.assert_allclose(stats["Std_Deviation"], expected["std"], rtol=1e-5)
+
+
+def test_month_distribution_counts_and_means(cube, observed):
+    for regions, year_range in selections(cube):
+        rows = select(observed, regions, year_range)
+        expected = rows.groupby("month")["rfh"].agg(["count", "mean", "min", "max"])
+        stats = cube.month_distribution(regions, year_range).set_index("month")
+        np.testing.assert_array_equal(stats["count"], expected["count"])
+        np.testing.assert_allclose(stats["mean"], expected["mean"], rtol=1e-5)
+        np.testing.assert_allclose(stats["min"], expected["min"])
+        np.testing.assert_allclose(stats["max"], expected["max"])
+        # Sketch quantiles stay within the observed range and in order
+        assert (stats["min"] <= stats["q1"]).all() and (stats["q1"] <= stats["median"]).all()
+        assert (stats["median"] <= stats["q3"]).all() and (stats["q3"] <= stats["max"]).all()
+
+
+def test_distribution_and_histogram_cover_the_selection(cube, observed):
+    regions, year_range = selections(cube)[2]
+    rows = select(observed, regions, year_range)
+    summary = cube.distribution(regions, year_range)
+    assert summary["count"] == len(rows)
+    assert summary["mean"] == pytest.approx(rows["rfh"].mean())
+    counts, edges = cube.histogram(regions, year_range)
+    assert counts.sum() == len(rows)
+    assert len(edges) == len(counts) + 1
+
+
+def test_month_profiles_match_clustering_profiles(cube, rainfall_df):
+    expected = monthly_profiles(rainfall_df)
+    profiles = cube.month_profiles().reindex(expected.index.astype(str))
+    np.testing.assert_allclose(profiles.to_numpy(), expected.to_numpy(), rtol=1e-5)
+
+
+def test_save_load_round_trip(cube, tmp_path):
+    path = tmp_path / "cube.npz"
+    cube.save(path, "v1")
+    loaded, version = RainfallCube.load(path)
+    assert version == "v1"
+    regions = list(cube.regions[:5])
+    assert loaded.region_stats(regions, (2021, 2025)).equals(cube.region_stats(regions, (2021, 2025)))
@@ -0,0 +1,59 @@
+"""Vectorised seasonal decomposition of the dekadal series."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall.decomposition import (DEKADS_PER_YEAR, Decomposition, decompose, dekad_dates,
+                                    dekad_ordinal, dekadal_matrix)
+
+
+def test_dekad_ordinals_round_trip():
+    dates = pd.to_datetime(["2020-01-01", "2020-01-11", "2020-01-21", "2020-12-21", "2021-01-01"])
+    ordinals = dekad_ordinal(dates)
+    np.testing.assert_array_equal(np.diff(ordinals), [1, 1, 33, 1])
+    assert (dekad_dates(ordinals) == dates).all()
+
+
+def test_recovers_trend_and_seasonal_cycle():
+    n_years, period = 6, DEKADS_PER_YEAR
+    t = np.arange(n_years * period)
+    cycle = 40 * np.sin(2 * np.pi * np.arange(period) / period)
+    cycle -= cycle.mean()
+    matrix = np.vstack([10 + 0.05 * t + np.tile(cycle, n_years),
+                        np.tile(2 * cycle, n_years)])
+    trend, seasonal, resid = decompose(matrix)
+
+    assert np.isnan(trend[:, :period // 2]).all() and np.isnan(trend[:, -(period // 2):]).all()
+    inner = slice(period // 2, -(period // 2))
+    np.testing.assert_allclose(trend[0, inner], 10 + 0.05 * t[inner], atol=1e-9)
+    np.testing.assert_allclose(trend[1, inner], 0, atol=1e-9)
+    np.testing.assert_allclose(seasonal[0, :period], cycle, atol=1e-9)
+    np.testing.assert_allclose(seasonal[1, :period], 2 * cycle, atol=1e-9)
+    np.testing.assert_allclose(resid[:, inner], 0, atol=1e-9)
+
+
+def test_matches_statsmodels():
+    seasonal_decompose = pytest.importorskip("statsmodels.tsa.seasonal").seasonal_decompose
+    rng = np.random.default_rng(1)
+    x = 50 + 30 * np.sin(np.arange(5 * DEKADS_PER_YEAR) / 6) + rng.normal(0, 5, 5 * DEKADS_PER_YEAR)
+    trend, seasonal, _ = decompose(x[None, :])
+    expected = seasonal_decompose(x, period=DEKADS_PER_YEAR, model="additive")
+    np.testing.assert_allclose(trend[0], expected.trend, atol=1e-9)
+    np.testing.assert_allclose(seasonal[0], expected.seasonal, atol=1e-9)
+
+
+def test_frame_components_average_the_regions(observed):
+    regions = sorted(observed["ADM2_PCODE"].unique())[:3]
+    df = observed[observed["ADM2_PCODE"].isin(regions)]
+    names, first, matrix = dekadal_matrix(df)
+    assert list(names) == regions and first % DEKADS_PER_YEAR == 0
+    assert matrix.shape[1] % DEKADS_PER_YEAR == 0
+
+    decomposition = Decomposition.from_frame(df)
+    out = decomposition.components(regions, (2022, 2023))
+    assert out["date"].dt.year.between(2022, 2023).all() and len(out) == 2 * DEKADS_PER_YEAR
+    single = decomposition.components(regions[:1], (2022, 2023))
+    by_date = df[df["ADM2_PCODE"] == regions[0]].set_index("date")["rfh"]
+    np.testing.assert_allclose(single["observed"], by_date.reindex(single["date"]).to_numpy(), rtol=1e-6)
+    np.testing.assert_allclose(out["observed"],
+                               out["trend"] + out["seasonal"] + out["resid"], rtol=1e-4, atol=1e-3)
@@ -0,0 +1,73 @@
+"""The shared SQLite result cache."""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+from rainfall.diskcache import DiskCache, result_cache_backend
+
+
+def test_disk_cache_is_shared_between_instances(tmp_path):
+    path = tmp_path / "results.sqlite"
+    frame = pd.DataFrame({"x": [1.0, 2.0]})
+    DiskCache(path).put(("frame", "v1"), frame)
+    other = DiskCache(path, memory_entries=0)
+    assert other.get(("frame", "v1")).equals(frame)
+    assert other.get(("frame", "v2")) is None
+    # Another namespace (query backend) never sees the entry
+    assert DiskCache(path, namespace="duckdb").get(("frame", "v1")) is None
+    assert other.stats()["hits"] == 1 and other.stats()["misses"] == 1
+
+
+def test_disk_cache_stores_figures_as_json(tmp_path):
+    go = pytest.importorskip("plotly.graph_objects")
+    cache = DiskCache(tmp_path / "results.sqlite", memory_entries=0)
+    cache.put("fig", go.Figure(go.Bar(x=[1, 2], y=[3, 4])))
+    figure = cache.get("fig")
+    assert isinstance(figure, go.Figure) and list(figure.data[0].y) == [3, 4]
+
+
+def test_disk_cache_evicts_least_recently_read(tmp_path):
+    cache = DiskCache(tmp_path / "results.sqlite", max_bytes=10_000, memory_entries=0)
+    blob = b"x" * 1000
+    for i in range(9):
+        cache.put(i, blob)
+    assert cache.stats()["bytes"] <= 10_000 and len(cache) == 9
+    cache.put(9, blob)
+    # Over the bound: the oldest entries go until 90% of it is left
+    assert cache.stats()["bytes"] <= 9_000
+    assert cache.get(0) is None and cache.get(9) == blob
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["bytes"] == 0
+
+
+def _compute_once(path, log_path):
+    def compute():
+        with open(log_path, "a") as fh:
+            fh.write(f"{os.getpid()}\n")
+        time.sleep(0.5)
+        return 42
+
+    return DiskCache(path, memory_entries=0).get_or_compute(("slow",), compute)
+
+
+def test_concurrent_workers_compute_once(tmp_path):
+    path, log_path = tmp_path / "results.sqlite", tmp_path / "computes.log"
+    DiskCache(path)  # create the file before the workers race for it
+    # Fresh interpreters, like separate dashboard workers (a fork would copy
+    # this process's SQLite and thread-pool state)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=3, mp_context=context) as pool:
+        results = list(pool.map(_compute_once, [path] * 3, [log_path] * 3))
+    assert results == [42, 42, 42]
+    assert len(log_path.read_text().splitlines()) == 1
+
+
+def test_result_cache_backend():
+    assert result_cache_backend({}) == "disk"
+    assert result_cache_backend({"RAINFALL_RESULT_CACHE": "Memory"}) == "memory"
+    with pytest.raises(ValueError):
+        result_cache_backend({"RAINFALL_RESULT_CACHE": "redis"})
@@ -0,0 +1,31 @@
+"""LTTB decimation keeps the shape of a series within the point budget."""
+import numpy as np
+import pandas as pd
+
+from rainfall.downsample import decimate_frame, lttb_indices
+
+
+def test_short_series_are_unchanged():
+    np.testing.assert_array_equal(lttb_indices(np.arange(5), np.arange(5.0), n_out=10), np.arange(5))
+
+
+def test_keeps_ends_and_peaks_within_budget():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=5_000)
+    y[1234], y[4321] = 50.0, -50.0
+    idx = lttb_indices(np.arange(len(y)), y, n_out=200)
+    assert len(idx) == 200
+    assert idx[0] == 0 and idx[-1] == len(y) - 1
+    assert (np.diff(idx) > 0).all()
+    assert 1234 in idx and 4321 in idx
+
+
+def test_datetime_x_and_aligned_columns():
+    dates = pd.date_range("2021-01-01", periods=3_000, freq="D")
+    frame = pd.DataFrame({"ds": dates, "yhat": np.sin(np.arange(3_000) / 50.0)})
+    frame["yhat_upper"] = frame["yhat"] + 1
+    out = decimate_frame(frame, "ds", "yhat", n_out=300)
+    assert len(out) == 300
+    np.testing.assert_allclose(out["yhat_upper"] - out["yhat"], 1.0)
+    assert out["ds"].is_monotonic_increasing
+    assert decimate_frame(frame.head(10), "ds", "yhat", n_out=300) is not None
@@ -0,0 +1,57 @@
+"""Top-k and threshold queries of the extreme-event index against pandas."""
+import numpy as np
+import pytest
+
+from rainfall.extremes import ExtremeIndex, build_extreme_index
+
+
+@pytest.fixture(scope="module")
+def index(rainfall_df):
+    return build_extreme_index(rainfall_df)
+
+
+@pytest.fixture(scope="module")
+def frame(rainfall_df):
+    return rainfall_df.assign(ADM2_PCODE=rainfall_df["ADM2_PCODE"].astype(str))
+
+
+def selections(index):
+    rng = np.random.default_rng(0)
+    for trial in range(12):
+        regions = list(rng.choice(index.regions, size=rng.integers(1, 40), replace=False))
+        y0 = int(rng.integers(2021, 2026))
+        yield regions, (y0, int(rng.integers(y0, 2026))), ["rfh", "rfq"][trial % 2], bool(trial % 3)
+
+
+def test_top_k_matches_pandas(index, frame):
+    for regions, year_range, column, largest in selections(index):
+        rows = frame[frame["ADM2_PCODE"].isin(regions) & frame["year"].between(*year_range)]
+        expected = rows[column].dropna().sort_values(ascending=not largest).head(10)
+        top = index.top_k(column, regions, year_range, k=10, largest=largest)
+        np.testing.assert_allclose(top[column], expected.to_numpy(), rtol=1e-6)
+
+
+def test_top_k_rows_carry_their_values(index, frame):
+    top = index.top_k("rfq", list(index.regions), (2021, 2025), k=3)
+    for event in top.itertuples():
+        row = frame[(frame["ADM2_PCODE"] == event.Region) & (frame["date"] == event.Date)].iloc[0]
+        assert row["rfh"] == pytest.approx(event.rfh, rel=1e-6)
+
+
+def test_exceedance_counts_match_pandas(index, frame):
+    for regions, year_range, column, _ in selections(index):
+        rows = frame[frame["ADM2_PCODE"].isin(regions) & frame["year"].between(*year_range)]
+        expected = (rows[column] > 50).groupby(rows["ADM2_PCODE"]).sum()
+        counts = index.exceedance_counts(column, 50, regions, year_range).set_index("Region")["Count"]
+        np.testing.assert_array_equal(counts.reindex(expected.index).to_numpy(), expected.to_numpy())
+        assert len(index.exceedances(column, 50, regions, year_range)) == expected.sum()
+
+
+def test_unknown_column_and_round_trip(index, tmp_path):
+    with pytest.raises(ValueError):
+        index.top_k("n_pixels", list(index.regions), (2021, 2025))
+    index.save(tmp_path / "extremes.npz", "v1")
+    loaded, version = ExtremeIndex.load(tmp_path / "extremes.npz")
+    assert version == "v1"
+    query = ("rfh", ["BT00101"], (2021, 2025), 5)
+    assert loaded.top_k(*query).equals(index.top_k(*query))
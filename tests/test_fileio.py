@@ -0,0 +1,58 @@
+"""Versioned artifact loading and atomic writes."""
+import numpy as np
+import pytest
+
+from rainfall.fileio import atomic_output, atomic_write_bytes, file_hash, load_or_build
+
+
+class Artifact:
+    def __init__(self, value):
+        self.value = value
+
+    def save(self, path, version):
+        np.savez(path, value=self.value, version=version)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(int(data["value"])), str(data["version"])
+
+
+def test_load_or_build_reuses_matching_version(tmp_path):
+    path = tmp_path / "artifact.npz"
+    builds = []
+
+    def build():
+        builds.append(1)
+        return Artifact(len(builds))
+
+    assert load_or_build(path, "v1", build, Artifact.load).value == 1
+    assert load_or_build(path, "v1", build, Artifact.load).value == 1
+    assert load_or_build(path, "v2", build, Artifact.load).value == 2
+    assert Artifact.load(path)[1] == "v2"
+
+
+def test_load_or_build_rebuilds_unreadable_files(tmp_path):
+    path = tmp_path / "artifact.npz"
+    path.write_bytes(b"not an npz")
+    assert load_or_build(path, "v1", lambda: Artifact(7), Artifact.load).value == 7
+    assert Artifact.load(path)[0].value == 7
+
+
+def test_load_or_build_without_directory_does_not_save(tmp_path):
+    path = tmp_path / "missing" / "artifact.npz"
+    assert load_or_build(path, "v1", lambda: Artifact(3), Artifact.load).value == 3
+    assert not path.exists()
+
+
+def test_atomic_output_keeps_old_file_on_error(tmp_path):
+    path = tmp_path / "out.txt"
+    atomic_write_bytes(path, b"old")
+    with pytest.raises(RuntimeError):
+        with atomic_output(path) as tmp:
+            with open(tmp, "w") as fh:
+                fh.write("partial")
+            raise RuntimeError
+    assert path.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.txt"]
+    assert file_hash(path) == file_hash(path) and len(file_hash(path)) == 64
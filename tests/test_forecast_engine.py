@@ -0,0 +1,68 @@
+"""Per-region forecasts: model cache hits and pruning (Prophet replaced by a stub)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall import forecast_engine
+from rainfall.forecast_engine import FORECAST_COLS, forecast_regions
+
+
+@pytest.fixture
+def fits(monkeypatch):
+    """Record the series fitted instead of running Prophet."""
+    fitted = []
+
+    def fake_fit(series, periods, params):
+        fitted.append(series["y"].iloc[0])
+        ds = pd.date_range(series["ds"].iloc[0], periods=len(series) + periods, freq="MS")
+        mean = float(series["y"].mean())
+        forecast = pd.DataFrame({"ds": ds, "yhat": mean, "yhat_lower": mean - 1, "yhat_upper": mean + 1})
+        return forecast, "{}"
+
+    monkeypatch.setattr(forecast_engine, "fit_prophet", fake_fit)
+    return fitted
+
+
+@pytest.fixture(scope="module")
+def frame(rainfall_df):
+    regions = sorted(rainfall_df["ADM2_PCODE"].astype(str).unique())[:4]
+    return rainfall_df[rainfall_df["ADM2_PCODE"].astype(str).isin(regions)]
+
+
+def run(df, cache_dir, **kwargs):
+    return forecast_regions(df, periods=3, workers=1, cache_dir=cache_dir, log=lambda *a: None, **kwargs)
+
+
+def test_cached_series_are_not_refit(frame, fits, tmp_path):
+    first = run(frame, tmp_path)
+    assert len(fits) == 4
+    assert list(first.columns) == ["ADM2_PCODE"] + FORECAST_COLS
+    second = run(frame, tmp_path)
+    assert len(fits) == 4
+    pd.testing.assert_frame_equal(first, second)
+
+    # New data for one region refits that region only
+    changed = frame.copy()
+    last = changed.index[changed["ADM2_PCODE"].astype(str) == "BT00101"][-1]
+    changed.loc[last, "rfh"] = changed.loc[last, "rfh"] + 100
+    run(changed, tmp_path)
+    assert len(fits) == 5
+    assert len(list(tmp_path.glob("*.json"))) == 4
+
+
+def test_partial_runs_keep_other_models(frame, fits, tmp_path):
+    run(frame, tmp_path)
+    (tmp_path / "stale.json").write_text("{}")
+    run(frame, tmp_path, regions=["BT00101"])
+    assert (tmp_path / "stale.json").exists()
+    run(frame, tmp_path)
+    assert not (tmp_path / "stale.json").exists()
+    assert len(fits) == 4
+
+
+def test_fourier_backend_has_the_same_schema(frame, tmp_path):
+    out = run(frame, tmp_path, backend="fourier")
+    assert list(out.columns) == ["ADM2_PCODE"] + FORECAST_COLS
+    assert out["ADM2_PCODE"].nunique() == 4 and np.isfinite(out["yhat"]).all()
+    with pytest.raises(ValueError):
+        run(frame, tmp_path, backend="arima")
@@ -0,0 +1,109 @@
+"""Incremental ingest ends where a full rebuild from the new release would."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall.cube import RainfallCube, build_cube, cube_path
+from rainfall.ingest import ingest
+from rainfall.paths import CLEANED_CSV, RAW_CSV
+from rainfall.pipeline import Stage, run_pipeline, run_store
+from rainfall.rollup import LEVELS, Rollup, build_rollup, rollup_path
+from rainfall.store import DATA_FILE, KEY_COLS, read_manifest, read_store
+
+pytest.importorskip("pyarrow")
+
+LAST_INGESTED = "2025-05-01"
+
+
+def quiet(*args):
+    pass
+
+
+def write_old_snapshot(csv_path):
+    """The cleaned CSV as of an older release.
+
+    It stops at ``LAST_INGESTED`` and has that dekad as provisional with
+    different values, so an ingest both appends and replaces rows.
+    """
+    full = pd.read_csv(CLEANED_CSV)
+    old = full[full["date"] <= LAST_INGESTED].copy()
+    last = old["date"] == LAST_INGESTED
+    old.loc[last, "version"] = "prelim"
+    old.loc[last, "rfh"] = old.loc[last, "rfh"] * 3 + 500
+    old.to_csv(csv_path, index=False)
+
+
+@pytest.fixture
+def ingested(tmp_path):
+    """A store built from an older snapshot, then brought up to date by ingest."""
+    csv_path = tmp_path / "cleaned.csv"
+    write_old_snapshot(csv_path)
+    store_dir = tmp_path / "store"
+    added = ingest(RAW_CSV, csv_path, store_dir, update_clusters=False, log=quiet)
+    return {"csv_path": csv_path, "store_dir": store_dir, "added": added}
+
+
+def sorted_rows(df):
+    df = df.assign(ADM2_PCODE=df["ADM2_PCODE"].astype(str))
+    return df.sort_values(KEY_COLS).reset_index(drop=True)
+
+
+def test_store_matches_full_rebuild(ingested, rainfall_df):
+    assert ingested["added"] > 0
+    manifest = read_manifest(ingested["store_dir"])
+    stored = sorted_rows(read_store(manifest, ingested["store_dir"]))
+    expected = sorted_rows(rainfall_df)
+    assert manifest["rows"] == len(expected) == len(stored)
+    np.testing.assert_array_equal(stored["date"], expected["date"])
+    np.testing.assert_allclose(stored["rfh"], expected["rfh"], rtol=1e-6)
+    assert (stored["version"].astype(str) == expected["version"].astype(str)).all()
+
+
+def test_cube_and_rollup_match_full_rebuild(ingested, rainfall_df):
+    store_dir = ingested["store_dir"]
+    version = read_manifest(store_dir)["version"]
+    cube, cube_version = RainfallCube.load(cube_path(store_dir))
+    rollup, rollup_version = Rollup.load(rollup_path(store_dir))
+    assert cube_version == rollup_version == version
+
+    expected = build_cube(rainfall_df)
+    regions = list(expected.regions)
+    assert cube.row_count(regions, (2021, 2025)) == expected.row_count(regions, (2021, 2025))
+    np.testing.assert_allclose(cube.region_stats(regions, (2021, 2025)).iloc[:, 1:],
+                               expected.region_stats(regions, (2021, 2025)).iloc[:, 1:], rtol=1e-6)
+    np.testing.assert_allclose(cube.month_profiles(), expected.month_profiles(), rtol=1e-6)
+
+    expected = build_rollup(rainfall_df)
+    for level in LEVELS:
+        np.testing.assert_array_equal(rollup.levels[level][0], expected.levels[level][0])
+        np.testing.assert_array_equal(rollup.levels[level][1], expected.levels[level][1])
+        np.testing.assert_allclose(rollup.levels[level][2], expected.levels[level][2], rtol=1e-6)
+
+
+def test_second_ingest_is_a_no_op(ingested):
+    store_dir = ingested["store_dir"]
+    before = read_manifest(store_dir)
+    assert ingest(RAW_CSV, ingested["csv_path"], store_dir, update_clusters=False, log=quiet) == 0
+    after = read_manifest(store_dir)
+    assert after["version"] == before["version"]
+    assert after["rows"] == before["rows"]
+    assert after["deltas"] == before["deltas"]
+
+
+def test_pipeline_keeps_compacted_ingested_rows(tmp_path, rainfall_df):
+    csv_path, store_dir = tmp_path / "cleaned.csv", tmp_path / "store"
+    write_old_snapshot(csv_path)
+    stages = [Stage("store", [csv_path], [store_dir / DATA_FILE], run_store)]
+
+    def run():
+        return run_pipeline(stages, state_path=tmp_path / "state.json", log=quiet)
+
+    assert run() == {"store": "ran"}
+    ingest(RAW_CSV, csv_path, store_dir, compact=True, update_clusters=False, log=quiet)
+    # Compaction rewrote the Parquet file, so the stage reruns, but must not
+    # rebuild from the older CSV
+    assert run() == {"store": "ran"}
+    manifest = read_manifest(store_dir)
+    assert manifest["deltas"] == [] and manifest["rows"] == len(rainfall_df)
+    assert len(read_store(manifest, store_dir)) == len(rainfall_df)
+    assert run() == {"store": "skipped"}
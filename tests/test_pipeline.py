@@ -0,0 +1,111 @@
+"""Skip and invalidation rules of the pipeline DAG, on toy stages."""
+import pytest
+
+from rainfall.pipeline import Stage, default_stages, run_pipeline, topological_order
+
+
+def upper(stage):
+    with open(stage.inputs[0]) as src, open(stage.outputs[0], "w") as dst:
+        dst.write(src.read().upper() + stage.params.get("suffix", ""))
+
+
+@pytest.fixture
+def dag(tmp_path):
+    (tmp_path / "raw.txt").write_text("a")
+
+    def stages(suffix=""):
+        return [
+            Stage("clean", [tmp_path / "raw.txt"], [tmp_path / "clean.txt"], upper),
+            Stage("report", [tmp_path / "clean.txt"], [tmp_path / "report.txt"], upper,
+                  deps=["clean"], params={"suffix": suffix}),
+        ]
+
+    def run(suffix="", **kwargs):
+        return run_pipeline(stages(suffix), state_path=tmp_path / "state.json",
+                            log=lambda *args: None, **kwargs)
+
+    return tmp_path, run
+
+
+def test_second_run_skips_everything(dag):
+    tmp_path, run = dag
+    assert run() == {"clean": "ran", "report": "ran"}
+    assert (tmp_path / "report.txt").read_text() == "A"
+    assert run() == {"clean": "skipped", "report": "skipped"}
+
+
+def test_changed_input_reruns_stage_and_dependents(dag):
+    tmp_path, run = dag
+    run()
+    (tmp_path / "raw.txt").write_text("b")
+    assert run() == {"clean": "ran", "report": "ran"}
+    assert (tmp_path / "report.txt").read_text() == "B"
+
+
+def test_same_content_rewritten_is_skipped(dag):
+    tmp_path, run = dag
+    run()
+    (tmp_path / "raw.txt").write_text("a")  # new mtime, same hash
+    assert run() == {"clean": "skipped", "report": "skipped"}
+
+
+def test_changed_params_rerun_only_that_stage(dag):
+    tmp_path, run = dag
+    run()
+    assert run(suffix="!") == {"clean": "skipped", "report": "ran"}
+    assert (tmp_path / "report.txt").read_text() == "A!"
+
+
+def test_missing_or_edited_output_reruns(dag):
+    tmp_path, run = dag
+    run()
+    (tmp_path / "report.txt").unlink()
+    assert run()["report"] == "ran"
+    (tmp_path / "clean.txt").write_text("edited")
+    assert run() == {"clean": "ran", "report": "skipped"}
+
+
+def test_force_only_and_dry_run(dag):
+    tmp_path, run = dag
+    # Nothing built yet: report's input does not exist
+    assert run(dry_run=True) == {"clean": "pending", "report": "pending"}
+    assert not (tmp_path / "clean.txt").exists()
+    run()
+    assert run(suffix="!", dry_run=True) == {"clean": "skipped", "report": "pending"}
+    assert (tmp_path / "report.txt").read_text() == "A"
+    assert run(only=["report"], force=True) == {"clean": "skipped", "report": "ran"}
+
+
+def test_dry_run_marks_dependents_of_pending_stages(dag):
+    tmp_path, run = dag
+    run()
+    (tmp_path / "raw.txt").write_text("b")
+    assert run(dry_run=True) == {"clean": "pending", "report": "pending"}
+    assert (tmp_path / "report.txt").read_text() == "A"
+    assert run() == {"clean": "ran", "report": "ran"}
+
+
+def test_topological_order_rejects_unknown_stages_and_cycles():
+    noop = lambda stage: None  # noqa: E731
+    a, b = Stage("a", [], [], noop, deps=["b"]), Stage("b", [], [], noop, deps=["a"])
+    with pytest.raises(ValueError, match="cycle"):
+        topological_order([a, b])
+    with pytest.raises(ValueError, match="Unknown"):
+        topological_order([a, b], only=["c"])
+    c = Stage("c", [], [], noop, deps=["d"])
+    d = Stage("d", [], [], noop)
+    assert [s.name for s in topological_order([c, d])] == ["d", "c"]
+
+
+def test_on_demand_stages_run_only_when_named():
+    noop = lambda stage: None  # noqa: E731
+    stages = [Stage("a", [], [], noop), Stage("b", [], [], noop, deps=["a"], on_demand=True)]
+    assert [s.name for s in topological_order(stages)] == ["a"]
+    assert [s.name for s in topological_order(stages, only=["b"])] == ["a", "b"]
+
+
+def test_region_forecasts_are_not_part_of_a_default_run():
+    names = [s.name for s in topological_order(default_stages())]
+    assert "region_forecasts" not in names and "clusters" in names
+    assert [s.name for s in topological_order(default_stages(), only=["region_forecasts"])] == \
+        ["clean", "region_forecasts"]
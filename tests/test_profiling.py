@@ -0,0 +1,77 @@
+"""Profiling switches and memory-tracing ownership."""
+import tracemalloc
+
+import pytest
+
+from rainfall import profiling
+from rainfall.profiling import (RerunProfiler, profiled_rerun, profiling_enabled, stage,
+                                start_rerun)
+
+
+@pytest.fixture(autouse=True)
+def no_tracing():
+    assert not tracemalloc.is_tracing()
+    yield
+    start_rerun(False)
+    assert not tracemalloc.is_tracing()
+
+
+def test_query_param_needs_the_env_opt_in():
+    assert not profiling_enabled({}, {"profile": "1"})
+    assert not profiling_enabled({"RAINFALL_PROFILE": "0"}, {"profile": "1"})
+    assert not profiling_enabled({"RAINFALL_PROFILE": "url"}, {})
+    assert profiling_enabled({"RAINFALL_PROFILE": "url"}, {"profile": ["1"]})
+    assert profiling_enabled({"RAINFALL_PROFILE": "true"}, None)
+
+
+def test_stages_are_recorded_and_tracing_stops(tmp_path):
+    profiler = start_rerun(True)
+    assert tracemalloc.is_tracing()
+    with stage("outer"):
+        with stage("inner", rows=3):
+            data = [0] * 100_000
+    del data
+    summary = profiler.finish(log_path=tmp_path / "profile.jsonl")
+    assert not tracemalloc.is_tracing()
+    outer, inner = summary["stages"]
+    assert (outer["depth"], inner["depth"], inner["rows"]) == (0, 1, 3)
+    assert inner["peak_kb"] > 500 and outer["peak_kb"] >= inner["peak_kb"]
+    assert (tmp_path / "profile.jsonl").read_text().count("\n") == 1
+    # Off: stage() is a no-op
+    with stage("ignored") as record:
+        assert record is None
+
+
+def test_only_the_first_concurrent_profiler_traces(tmp_path):
+    first, second = RerunProfiler(), RerunProfiler()
+    assert first.trace_memory and not second.trace_memory
+    with second.stage("timed only") as record:
+        pass
+    second.finish(log_path=tmp_path / "profile.jsonl")
+    assert "peak_kb" not in record and tracemalloc.is_tracing()
+    first.finish(log_path=tmp_path / "profile.jsonl")
+    assert not tracemalloc.is_tracing()
+
+
+def test_stale_profiler_is_replaced():
+    stale = start_rerun(True)
+    fresh = start_rerun(True)
+    assert profiling._active.get() is fresh and not stale.trace_memory
+    fresh.deactivate()
+
+
+def test_tracing_stops_when_the_rerun_raises():
+    with pytest.raises(RuntimeError):
+        with profiled_rerun(True) as profiler:
+            with stage("chart"):
+                assert tracemalloc.is_tracing()
+                raise RuntimeError("query failed")
+    assert not tracemalloc.is_tracing() and profiling._active.get() is None
+    assert [r["stage"] for r in profiler.records] == ["chart"]
+
+
+def test_finished_rerun_leaves_the_wrapper_nothing_to_do(tmp_path):
+    with profiled_rerun(True) as profiler:
+        profiler.finish(log_path=tmp_path / "profile.jsonl")
+    with profiled_rerun(False) as off:
+        assert off is None
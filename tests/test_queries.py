@@ -0,0 +1,43 @@
+"""The in-process LRU result cache and the dashboard query keys."""
+import time
+
+from rainfall.cube import build_cube
+from rainfall.queries import LRUCache, canonical_query, dashboard_frames
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+
+
+def test_lru_ttl_and_get_or_compute(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = LRUCache(ttl=10)
+    calls = []
+    assert cache.get_or_compute("k", lambda: calls.append(1) or "v") == "v"
+    assert cache.get_or_compute("k", lambda: calls.append(1) or "v") == "v"
+    now[0] += 11
+    assert cache.get("k") is None
+    assert len(calls) == 1
+
+
+def test_canonical_query_ignores_order_and_duplicates():
+    assert canonical_query(["b", "a", "b"], [2021, 2023.0]) == (("a", "b"), (2021, 2023))
+
+
+def test_dashboard_frames_share_one_entry_per_selection(rainfall_df):
+    cube = build_cube(rainfall_df)
+    cache = LRUCache()
+    first = dashboard_frames(cache, cube, ["BT00101", "BT00102"], (2021, 2022))
+    assert dashboard_frames(cache, cube, ["BT00102", "BT00101"], [2021, 2022]) is first
+    dashboard_frames(cache, cube, ["BT00101"], (2021, 2022))
+    assert len(cache) == 2
+    assert first["row_count"] == cube.row_count(["BT00101", "BT00102"], (2021, 2022))
+    assert first["histogram"]["counts"].sum() == first["row_count"]
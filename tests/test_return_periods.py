@@ -0,0 +1,82 @@
+"""L-moment fits against direct formulas and scipy's distributions."""
+from math import comb
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from rainfall.return_periods import (annual_maxima, build_return_periods, fit_gev,
+                                     fit_gumbel, l_moments, return_level)
+
+
+def direct_l_moments(x):
+    """``(l1, l2, t3)`` from the unbiased probability-weighted moments."""
+    x = np.sort(x[np.isfinite(x)])
+    n = len(x)
+    b = [sum(comb(i, r) / comb(n - 1, r) * x[i] for i in range(n)) / n for r in range(3)]
+    l1, l2, l3 = b[0], 2 * b[1] - b[0], 6 * b[2] - 6 * b[1] + b[0]
+    return l1, l2, l3 / l2
+
+
+def test_l_moments_match_direct_formula():
+    rng = np.random.default_rng(0)
+    samples = rng.gamma(2.0, 30.0, size=(20, 12))
+    samples[rng.random(samples.shape) < 0.2] = np.nan
+    expected = np.array([direct_l_moments(row) for row in samples])
+    np.testing.assert_allclose(np.column_stack(l_moments(samples)), expected, rtol=1e-9)
+
+
+def test_l_moments_need_min_samples():
+    l1, l2, t3 = l_moments(np.array([[1.0, 2.0, np.nan, np.nan]]), min_samples=3)
+    assert np.isnan(l1).all() and np.isnan(l2).all() and np.isnan(t3).all()
+
+
+def test_gev_fit_recovers_parameters():
+    samples = stats.genextreme.rvs(-0.1, loc=100, scale=20, size=(20, 5000),
+                                   random_state=np.random.default_rng(1))
+    loc, scale, shape = fit_gev(*l_moments(samples))
+    assert loc.mean() == pytest.approx(100, rel=0.02)
+    assert scale.mean() == pytest.approx(20, rel=0.03)
+    assert shape.mean() == pytest.approx(-0.1, abs=0.03)
+
+
+def test_return_levels_are_the_distribution_quantiles():
+    periods = [2, 10, 100]
+    probs = 1 - 1 / np.array(periods)
+    # Hosking's shape has the same sign convention as scipy's ``c``
+    params = (np.array([100.0, 50.0]), np.array([20.0, 5.0]), np.array([-0.1, 0.2]))
+    expected = [stats.genextreme.ppf(probs, c, loc=m, scale=s) for m, s, c in zip(*params)]
+    np.testing.assert_allclose(return_level(params, periods), expected, rtol=1e-9)
+
+    gumbel = fit_gumbel(np.array([60.0]), np.array([8.0]))
+    expected = stats.gumbel_r.ppf(probs, loc=gumbel[0][0], scale=gumbel[1][0])
+    np.testing.assert_allclose(return_level(gumbel, periods, "gumbel")[0], expected, rtol=1e-9)
+    with pytest.raises(ValueError):
+        return_level(gumbel, periods, "weibull")
+
+
+def test_annual_maxima_match_pandas(observed):
+    regions, years, maxima = annual_maxima(observed)
+    complete = observed.groupby(["ADM2_PCODE", "year"])["rfh"].agg(["max", "count"])
+    expected = complete["max"].where(complete["count"] >= 33).unstack()
+    expected = expected.reindex(index=regions.astype(str), columns=years)
+    np.testing.assert_allclose(maxima, expected.to_numpy(), rtol=1e-6)
+
+
+def test_gaps_are_not_filled_in_before_taking_maxima(observed):
+    region = observed["ADM2_PCODE"].iloc[0]
+    df = observed[observed["ADM2_PCODE"] == region]
+    # Drop four dekads inside 2023, leaving 32 observed: below MIN_DEKADS
+    gap = df.index[(df["year"] == 2023) & (df["month"] == 6)][:3].append(
+        df.index[(df["year"] == 2023) & (df["month"] == 7)][:1])
+    _, years, maxima = annual_maxima(df.drop(gap))
+    full = annual_maxima(df)[2]
+    assert np.isnan(maxima[0, list(years).index(2023)])
+    others = years != 2023
+    np.testing.assert_array_equal(maxima[0, others], full[0, others])
+
+
+def test_fitted_levels_increase_with_period(rainfall_df):
+    fit = build_return_periods(rainfall_df)
+    levels = fit.levels(fit.regions[:10]).dropna()
+    assert len(levels) and (np.diff(levels.to_numpy(), axis=1) > 0).all()
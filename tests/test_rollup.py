@@ -0,0 +1,64 @@
+"""Rollup series against pandas groupbys, and delta updates against a rebuild."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall.rollup import LEVELS, Rollup, build_rollup
+from rainfall.store import SEASON_OF_MONTH
+
+REGIONS = ["BT00101", "BT00205"]
+
+
+@pytest.fixture(scope="module")
+def rollup(rainfall_df):
+    return build_rollup(rainfall_df)
+
+
+def test_national_monthly_series(rollup, observed):
+    expected = observed.groupby(pd.Grouper(key="date", freq="MS"))["rfh"].mean().dropna()
+    series = rollup.series("month")
+    np.testing.assert_array_equal(series["date"].to_numpy(), expected.index.to_numpy())
+    np.testing.assert_allclose(series["rfh"], expected.to_numpy(), rtol=1e-5)
+
+
+def test_regional_season_year_and_dekad_series(rollup, observed):
+    rows = observed[observed["ADM2_PCODE"].isin(REGIONS)]
+    month = rows["date"].dt.month.to_numpy()
+    # December belongs to the following year's winter season
+    season = (rows["date"].dt.year.to_numpy() + (month == 12)) * 4 + SEASON_OF_MONTH[month - 1]
+    expected = rows.groupby(season)["rfh"].mean()
+    np.testing.assert_allclose(rollup.series("season", REGIONS)["rfh"], expected.to_numpy(), rtol=1e-5)
+
+    in_range = rows[rows["year"].between(2022, 2023)]
+    series = rollup.series("year", REGIONS, (2022, 2023))
+    np.testing.assert_allclose(series["rfh"], in_range.groupby("year")["rfh"].mean().to_numpy(), rtol=1e-5)
+
+    expected = rows.groupby("date")["rfh"].mean()
+    np.testing.assert_allclose(rollup.series("dekad", REGIONS)["rfh"], expected.to_numpy(), rtol=1e-5)
+
+
+def test_unknown_level(rollup):
+    with pytest.raises(ValueError):
+        rollup.series("week")
+
+
+def test_apply_delta_matches_rebuild(rollup, observed):
+    cut = observed["date"].quantile(0.8)
+    before, after = observed[observed["date"] < cut], observed[observed["date"] >= cut]
+    # Rows that the delta replaces: same keys, different values
+    replaced = after[after["date"] == after["date"].min()].head(50).assign(rfh=lambda d: d["rfh"] + 100)
+    updated = build_rollup(pd.concat([before, replaced]))
+    updated.apply_delta(after, removed=replaced)
+    for level in LEVELS:
+        ordinals, count, total = updated.levels[level]
+        expected = rollup.levels[level]
+        np.testing.assert_array_equal(ordinals, expected[0])
+        np.testing.assert_array_equal(count, expected[1])
+        np.testing.assert_allclose(total, expected[2])
+
+
+def test_save_load_round_trip(rollup, tmp_path):
+    rollup.save(tmp_path / "rollup.npz", "v1")
+    loaded, version = Rollup.load(tmp_path / "rollup.npz")
+    assert version == "v1"
+    assert loaded.series("season").equals(rollup.series("season"))
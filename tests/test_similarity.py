@@ -0,0 +1,41 @@
+"""Top-k cosine search over the standardised monthly profiles."""
+import numpy as np
+import pytest
+
+from rainfall.clustering import monthly_profiles
+from rainfall.similarity import SimilarityIndex
+
+
+@pytest.fixture(scope="module")
+def profiles(rainfall_df):
+    return monthly_profiles(rainfall_df)
+
+
+@pytest.fixture(scope="module")
+def index(profiles):
+    return SimilarityIndex.from_profiles(profiles)
+
+
+def brute_force(profiles, region, k):
+    z = (profiles - profiles.mean()) / profiles.std(ddof=0)
+    z.index = z.index.astype(str)
+    target = z.loc[region]
+    cosine = (z @ target) / (np.linalg.norm(z, axis=1) * np.linalg.norm(target))
+    return cosine.drop(region).sort_values(ascending=False).head(k)
+
+
+def test_matches_a_brute_force_search(index, profiles):
+    for region in list(index.regions[:5]):
+        got = index.similar(region, k=8)
+        expected = brute_force(profiles, region, 8)
+        assert region not in set(got["Region"])
+        assert got["Similarity"].is_monotonic_decreasing
+        np.testing.assert_allclose(got["Similarity"], expected.to_numpy(), atol=1e-5)
+        assert list(got["Region"][:3]) == list(expected.index[:3])
+
+
+def test_k_is_clamped_and_unknown_regions_raise(index):
+    assert len(index.similar(index.regions[0], k=10_000)) == len(index) - 1
+    assert index.similar(index.regions[0], k=0).empty
+    with pytest.raises(KeyError):
+        index.similar("BT00000")
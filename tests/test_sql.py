@@ -0,0 +1,76 @@
+"""The DuckDB backend answers the dashboard queries like the aggregate cube."""
+import numpy as np
+import pytest
+
+from rainfall.cube import build_cube
+from rainfall.paths import CLEANED_CSV
+from rainfall.store import build_store
+
+pytest.importorskip("duckdb")
+pytest.importorskip("pyarrow")
+
+YEARS = (2022, 2024)
+
+
+@pytest.fixture(scope="module")
+def queries(tmp_path_factory):
+    from rainfall.sql import DuckDBQueries
+    store_dir = tmp_path_factory.mktemp("store")
+    _, manifest = build_store(CLEANED_CSV, store_dir)
+    return DuckDBQueries(store_dir, manifest)
+
+
+@pytest.fixture(scope="module")
+def cube(rainfall_df):
+    return build_cube(rainfall_df)
+
+
+@pytest.fixture(scope="module")
+def regions(observed):
+    return sorted(observed["ADM2_PCODE"].unique())[:7]
+
+
+def selection(observed, regions):
+    mask = observed["ADM2_PCODE"].isin(regions) & observed["year"].between(*YEARS)
+    return observed.loc[mask, "rfh"].astype("float64")
+
+
+def test_same_regions_years_and_counts(queries, cube, regions):
+    assert list(queries.regions) == list(cube.regions.astype(str))
+    np.testing.assert_array_equal(queries.years, cube.years)
+    assert queries.row_count(regions, YEARS) == cube.row_count(regions, YEARS)
+
+
+def test_region_stats_and_month_profiles(queries, cube, regions):
+    got = queries.region_stats(regions, YEARS)
+    expected = cube.region_stats(regions, YEARS)
+    assert list(got["Region"]) == list(expected["Region"].astype(str))
+    for col in ["Average_Rainfall", "Std_Deviation"]:
+        np.testing.assert_allclose(got[col], expected[col], rtol=1e-5)
+    np.testing.assert_allclose(queries.month_profiles().to_numpy(),
+                               cube.month_profiles().to_numpy(), rtol=1e-5)
+
+
+def test_box_statistics_are_exact(queries, cube, observed, regions):
+    values = selection(observed, regions)
+    stats = queries.distribution(regions, YEARS)
+    assert stats["count"] == len(values) == cube.distribution(regions, YEARS)["count"]
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    np.testing.assert_allclose([stats["q1"], stats["median"], stats["q3"]], [q1, median, q3], rtol=1e-5)
+    np.testing.assert_allclose([stats["mean"], stats["min"], stats["max"]],
+                               [values.mean(), values.min(), values.max()], rtol=1e-5)
+
+    months = queries.month_distribution(regions, YEARS)
+    expected = cube.month_distribution(regions, YEARS)
+    assert list(months["month_name"]) == list(expected["month_name"])
+    np.testing.assert_array_equal(months["count"], expected["count"])
+    np.testing.assert_allclose(months["mean"], expected["mean"], rtol=1e-5)
+
+
+def test_histogram_counts_every_value(queries, observed, regions):
+    values = selection(observed, regions)
+    counts, edges = queries.histogram(regions, YEARS, nbins=20)
+    expected, _ = np.histogram(values, bins=20, range=(values.min(), values.max()))
+    assert counts.sum() == len(values)
+    np.testing.assert_allclose(edges, np.linspace(values.min(), values.max(), 21), rtol=1e-5)
+    assert np.abs(counts - expected).sum() <= 4  # float32 values on a bin edge
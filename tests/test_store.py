@@ -0,0 +1,70 @@
+"""The Parquet store: rebuilt only on CSV change, compact dtypes, chunked writes."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall.paths import CLEANED_CSV
+from rainfall.store import (DATA_FILE, compact_frame, dataset_version, load_rainfall,
+                            month_names, read_manifest, read_store, write_store)
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def csv_copy(tmp_path):
+    path = tmp_path / "cleaned.csv"
+    path.write_bytes(CLEANED_CSV.read_bytes())
+    return path
+
+
+def test_store_reads_back_the_csv(csv_copy, tmp_path, rainfall_df):
+    store_dir = tmp_path / "store"
+    df = load_rainfall(csv_copy, store_dir)
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), rainfall_df.reset_index(drop=True))
+    assert dataset_version(csv_copy, store_dir) == read_manifest(store_dir)["version"]
+
+
+def test_store_is_rebuilt_only_when_the_csv_content_changes(csv_copy, tmp_path):
+    store_dir = tmp_path / "store"
+    load_rainfall(csv_copy, store_dir)
+    parquet = store_dir / DATA_FILE
+    built = parquet.stat().st_mtime_ns
+    version = dataset_version(csv_copy, store_dir)
+
+    os.utime(csv_copy)  # touched, same content
+    load_rainfall(csv_copy, store_dir)
+    assert parquet.stat().st_mtime_ns == built
+
+    lines = csv_copy.read_text().splitlines(keepends=True)
+    csv_copy.write_text("".join(lines[:-10]))
+    assert len(load_rainfall(csv_copy, store_dir)) == len(lines) - 11
+    assert dataset_version(csv_copy, store_dir) != version
+
+
+def test_compact_frame_dtypes_and_values():
+    raw = pd.read_csv(CLEANED_CSV)
+    df = compact_frame(raw.copy())
+    assert "month_name" not in df.columns
+    assert isinstance(df["ADM2_PCODE"].dtype, pd.CategoricalDtype)
+    assert df["ADM2_PCODE"].cat.categories.is_monotonic_increasing
+    assert isinstance(df["version"].dtype, pd.CategoricalDtype)
+    assert (df["year"].dtype, df["month"].dtype, df["day"].dtype) == ("int16", "int8", "int8")
+    assert df["rfh"].dtype == "float32" and df["adm2_id"].dtype == "int32"
+
+    assert (df["ADM2_PCODE"].astype(str) == raw["ADM2_PCODE"]).all()
+    assert (df["date"] == pd.to_datetime(raw["date"])).all()
+    np.testing.assert_allclose(df["rfh"], raw["rfh"], rtol=1e-6)
+    np.testing.assert_array_equal(df["year"], raw["year"])
+    assert (np.asarray(month_names(df["month"])) == raw["month_name"]).all()
+    assert df.memory_usage(deep=True).sum() < raw.memory_usage(deep=True).sum() / 2
+
+
+def test_chunked_write_matches_single_pass(csv_copy, tmp_path):
+    single = write_store(csv_copy, tmp_path / "single", chunksize=10 ** 7)
+    chunked = write_store(csv_copy, tmp_path / "chunked", chunksize=1_000)
+    for key in ("rows", "high_water_mark", "open_rows", "version"):
+        assert chunked[key] == single[key]
+    pd.testing.assert_frame_equal(read_store(chunked, tmp_path / "chunked"),
+                                  read_store(single, tmp_path / "single"))